@@ -2,28 +2,45 @@
 import os
 import re
 import io
+import csv
 import json
+import base64
 import threading
 import math
 from datetime import datetime, date, timedelta, time as dt_time
-from typing import Optional, Dict, Any, Tuple
-from werkzeug.security import generate_password_hash, check_password_hash
+from typing import Optional, Dict, Any, Tuple, NamedTuple
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
 import hashlib
-from collections import OrderedDict
+import secrets
+import zlib
+import heapq
+import socket
+import uuid
+from collections import OrderedDict, deque
 
 # Flask + extensions
 from flask_wtf import FlaskForm, CSRFProtect
 from wtforms import StringField, DateField, SelectField, TimeField, SubmitField, PasswordField
 from wtforms.validators import DataRequired, Optional as WTOptional, Length
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, update, insert, delete, or_
 from sqlalchemy.exc import IntegrityError
 from flask_migrate import Migrate
+from flask.cli import AppGroup
+import click
 from flask_cors import CORS
 from sqlalchemy.exc import IntegrityError
 from flask import (
     Flask, render_template, redirect, url_for, flash, abort, request,
-    jsonify, session, send_from_directory, Response 
+    jsonify, session, send_from_directory, Response, stream_with_context, make_response,
+    g, has_request_context, copy_current_request_context
 )
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from markupsafe import Markup
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from contextlib import contextmanager
+import random
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
 CORS(app)
@@ -33,6 +50,82 @@ app.config['SECRET_KEY'] = ("arham0564")
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL", "sqlite:///DAYSAVVY.db")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['TEMPLATES_AUTO_RELOAD'] = True
+app.config['API_TASKS_PAGE_SIZE'] = int(os.getenv("API_TASKS_PAGE_SIZE", "100"))
+app.config['API_TASKS_MAX_PAGE_SIZE'] = int(os.getenv("API_TASKS_MAX_PAGE_SIZE", "500"))
+app.config['TASK_BATCH_MAX'] = int(os.getenv("TASK_BATCH_MAX", "1000"))
+app.config['TOMBSTONE_RETENTION_DAYS'] = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "30"))
+# Delta-sync cursors never move past now minus this many seconds: covers writes
+# still committing and clock skew between app nodes
+app.config['CHANGES_SETTLE_SECONDS'] = int(os.getenv("CHANGES_SETTLE_SECONDS", "60"))
+app.config['EXPORT_BATCH_SIZE'] = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+app.config['TASK_IMPORT_CHUNK'] = int(os.getenv("TASK_IMPORT_CHUNK", "2000"))
+app.config['IDENTITY_CACHE_TTL'] = float(os.getenv("IDENTITY_CACHE_TTL", "30"))  # seconds; 0 disables
+app.config['IDENTITY_CACHE_SIZE'] = int(os.getenv("IDENTITY_CACHE_SIZE", "4096"))
+# Rendered task cards for the index page, per process; 0 disables
+app.config['FRAGMENT_CACHE_MAX_BYTES'] = int(os.getenv("FRAGMENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Where multi-step voice conversations live: "db" (shared by all workers), "redis",
+# or "memory" (per process; only for a single worker, since turns can land anywhere)
+app.config['VOICE_STATE_STORE'] = os.getenv("VOICE_STATE_STORE", "db")
+app.config['VOICE_STATE_TTL'] = int(os.getenv("VOICE_STATE_TTL", "1800"))  # idle seconds
+app.config['VOICE_STATE_MAX'] = int(os.getenv("VOICE_STATE_MAX", "10000"))  # memory store only
+app.config['REDIS_URL'] = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Memoized LLM results (NLU, emotion, goal decomposition), per process
+app.config['LLM_CACHE_SIZE'] = int(os.getenv("LLM_CACHE_SIZE", "2048"))
+# "combined": one Groq call returns emotion + intent + slots per voice turn;
+# "split": the separate detect_emotion() and nlu_understand() calls
+app.config['VOICE_UNDERSTAND'] = os.getenv("VOICE_UNDERSTAND", "combined")
+# Voice pipeline stages run on a bounded thread pool, each with its own timeout (seconds)
+app.config['VOICE_POOL_SIZE'] = int(os.getenv("VOICE_POOL_SIZE", "8"))
+app.config['VOICE_STAGE_TIMEOUTS'] = {
+    "understand": float(os.getenv("VOICE_TIMEOUT_UNDERSTAND", "8")),
+    "emotion": float(os.getenv("VOICE_TIMEOUT_EMOTION", "6")),
+    "nlu": float(os.getenv("VOICE_TIMEOUT_NLU", "8")),
+    "reschedule": float(os.getenv("VOICE_TIMEOUT_RESCHEDULE", "2")),
+}
+app.config['LLM_CACHE_TTL'] = float(os.getenv("LLM_CACHE_TTL", "3600"))  # seconds; 0 disables
+# Groq calls: overall deadline per call site (seconds, all attempts included),
+# retries for transient errors, and a circuit breaker over all sites
+app.config['LLM_DEADLINES'] = {
+    "nlu": float(os.getenv("LLM_DEADLINE_NLU", "6")),
+    "emotion": float(os.getenv("LLM_DEADLINE_EMOTION", "4")),
+    "understand": float(os.getenv("LLM_DEADLINE_UNDERSTAND", "6")),
+    "decompose": float(os.getenv("LLM_DEADLINE_DECOMPOSE", "10")),
+    "chat": float(os.getenv("LLM_DEADLINE_CHAT", "20")),
+    "fallback": float(os.getenv("LLM_DEADLINE_FALLBACK", "20")),
+}
+app.config['LLM_RETRIES'] = int(os.getenv("LLM_RETRIES", "2"))
+app.config['LLM_BACKOFF'] = float(os.getenv("LLM_BACKOFF", "0.25"))  # seconds; doubled per retry, jittered
+app.config['LLM_BREAKER_FAILURES'] = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # 0 disables the breaker
+app.config['LLM_BREAKER_COOLDOWN'] = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))  # seconds
+# A successful call slower than this fraction of its deadline counts as a breaker failure
+app.config['LLM_SLOW_FRACTION'] = float(os.getenv("LLM_SLOW_FRACTION", "0.75"))
+# Relay chat replies token by token (Server-Sent Events) to clients that ask for text/event-stream
+app.config['VOICE_STREAM'] = os.getenv("VOICE_STREAM", "1") == "1"
+# Response compression (gzip, or brotli when the package is installed)
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))  # bytes; 0 compresses everything
+app.config['COMPRESS_LEVEL'] = int(os.getenv("COMPRESS_LEVEL", "6"))  # gzip 1-9
+app.config['COMPRESS_BR_LEVEL'] = int(os.getenv("COMPRESS_BR_LEVEL", "4"))  # brotli 0-11
+
+# Storage profile: "wal" (default) or "legacy" (SQLite defaults, rollback journal)
+app.config['SQLITE_PROFILE'] = os.getenv("SQLITE_PROFILE", "wal")
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+app.config['SQLITE_CACHE_SIZE_KB'] = int(os.getenv("SQLITE_CACHE_SIZE_KB", "32768"))
+app.config['SQLITE_MMAP_SIZE'] = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Optional read replicas: comma-separated URLs. Opted-in reads go to a replica
+# unless the user wrote within READ_YOUR_WRITES_SECONDS.
+app.config['DATABASE_URL_READ'] = [u.strip() for u in os.getenv("DATABASE_URL_READ", "").split(",") if u.strip()]
+app.config['READ_YOUR_WRITES_SECONDS'] = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+if app.config['DATABASE_URL_READ']:
+    app.config['SQLALCHEMY_BINDS'] = {f"replica{i}": url for i, url in enumerate(app.config['DATABASE_URL_READ'])}
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith("sqlite"):
+    # Postgres/MySQL: size the pool for request workers + the reminder thread.
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
 
 # CSRF protection for forms
 from flask_wtf.csrf import CSRFProtect
@@ -49,9 +142,93 @@ def get_csrf_token():
     return jsonify({"csrf_token": token})
 
 # DB init
-db = SQLAlchemy(app)
+class RoutingSession(FlaskSQLAlchemySession):
+    """
+    Session that sends SELECTs to a read replica when the current request
+    opted in (replica_reads / read_from_replica) and nothing pins it to the
+    primary: a write earlier in the request, or a write by the same user within
+    READ_YOUR_WRITES_SECONDS. Flushes and DML always use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, "is_select", False):
+            engine = replica_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(app, session_options={"class_": RoutingSession})
 migrate = Migrate(app, db)
 
+def replica_engine():
+    """The replica for this request's reads, or None to use the primary."""
+    if not has_request_context() or not g.get("db_replica") or g.get("db_wrote"):
+        return None
+    names = [key for key in db.engines if key and key.startswith("replica")]
+    if not names:
+        return None
+    wrote_at = session.get("db_wrote_at")
+    if wrote_at and time_mod.time() - wrote_at < app.config['READ_YOUR_WRITES_SECONDS']:
+        return None
+    if g.get("db_replica_name") not in names:
+        g.db_replica_name = random.choice(names)  # one replica per request
+    return db.engines[g.db_replica_name]
+
+def replica_reads(view):
+    """Route a view's reads to a replica for the rest of the request."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def read_from_replica():
+    """Route reads inside the block to a replica."""
+    previous = g.get("db_replica", False)
+    g.db_replica = True
+    try:
+        yield
+    finally:
+        g.db_replica = previous
+
+def sqlite_pragmas(profile: str) -> list:
+    """PRAGMAs applied to every new SQLite connection for a storage profile."""
+    if profile == "legacy":
+        return []
+    return [
+        # Readers no longer block the writer (and vice versa), so the reminder
+        # thread and request workers can write without "database is locked".
+        ("journal_mode", "WAL"),
+        # Durable across application crashes; fsync only at checkpoints.
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", app.config['SQLITE_BUSY_TIMEOUT_MS']),
+        ("cache_size", -app.config['SQLITE_CACHE_SIZE_KB']),
+        ("mmap_size", app.config['SQLITE_MMAP_SIZE']),
+        ("temp_store", "MEMORY"),
+        ("foreign_keys", "ON"),
+    ]
+
+def install_sqlite_profile(engine, profile: Optional[str] = None) -> None:
+    """Set the profile's PRAGMAs on each connection the engine opens."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(profile or app.config['SQLITE_PROFILE'])
+    if not pragmas:
+        return
+
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine, "connect", _on_connect)
+
+with app.app_context():
+    for _engine in db.engines.values():
+        install_sqlite_profile(_engine)
+
 # Voice Components
 _groq = None
 try:
@@ -60,10 +237,241 @@ try:
     import importlib
     groq_mod = importlib.import_module("groq")
     Groq = getattr(groq_mod, "Groq", None)
-    _groq = Groq(api_key=os.getenv("GROQ_API_KEY")) if (Groq and os.getenv("GROQ_API_KEY")) else None
+    # Retries are LLMClient's job, so the SDK's own are turned off.
+    _groq = Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0) if (Groq and os.getenv("GROQ_API_KEY")) else None
 except Exception:
     _groq = None
 
+# LLM client
+# Every Groq completion goes through llm.complete(site, ...). Each call site
+# has a deadline (LLM_DEADLINES) that bounds all of its attempts together:
+# timeouts, connection errors, 429s and 5xx are retried with jittered
+# exponential backoff only while the deadline allows. A circuit breaker
+# shared by all sites opens after LLM_BREAKER_FAILURES consecutive failed or
+# slow calls. While it is open, complete() raises LLMUnavailable at once and
+# the callers' existing heuristic fallbacks answer; after
+# LLM_BREAKER_COOLDOWN seconds a single probe call is let through.
+class LLMUnavailable(Exception):
+    """The call was skipped because the breaker is open, or ran out of deadline."""
+
+def _llm_error_retryable(e: Exception) -> bool:
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    name = type(e).__name__.lower()
+    return "timeout" in name or "connection" in name
+
+class CircuitBreaker:
+    def __init__(self, failures: int, cooldown: float):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time_mod.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.threshold <= 0 or self.opened_at is None:
+                return True
+            if self.probing or time_mod.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self.probing = False
+            if ok:
+                if self.opened_at is not None:
+                    print("[LLM] circuit closed")
+                self.failures, self.opened_at = 0, None
+                return
+            self.failures += 1
+            if self.threshold > 0 and (self.opened_at is not None or self.failures >= self.threshold):
+                if self.opened_at is None:
+                    print(f"[LLM] circuit open after {self.failures} failed/slow calls; "
+                          f"using heuristics for {self.cooldown:g}s")
+                self.opened_at = time_mod.monotonic()
+
+class LLMClient:
+    LATENCY_SAMPLES = 512  # per site, for the percentiles in stats()
+
+    def __init__(self, client, deadlines: dict, retries: int, backoff: float,
+                 breaker: CircuitBreaker, slow_fraction: float):
+        self.client = client
+        self.deadlines = deadlines
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker
+        self.slow_fraction = slow_fraction
+        self._sites: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, site: str, **inc) -> None:
+        with self._lock:
+            m = self._sites.setdefault(site, {
+                "calls": 0, "ok": 0, "failed": 0, "timeouts": 0, "retries": 0, "slow": 0,
+                "short_circuited": 0, "latencies": deque(maxlen=self.LATENCY_SAMPLES)})
+            for k, v in inc.items():
+                if k == "latency":
+                    m["latencies"].append(v)
+                else:
+                    m[k] += v
+
+    def _finish(self, site: str, started: float, ok: bool, error: Exception = None,
+                latency: float = None) -> None:
+        elapsed = time_mod.monotonic() - started
+        slow = ok and (elapsed if latency is None else latency) > self.deadlines.get(site, 10.0) * self.slow_fraction
+        timed_out = error is not None and (isinstance(error, LLMUnavailable)
+                                           or "timeout" in type(error).__name__.lower())
+        self._count(site, calls=1, ok=int(ok), failed=int(not ok), timeouts=int(timed_out),
+                    slow=int(slow), latency=elapsed)
+        self.breaker.record(ok and not slow)
+
+    def complete(self, site: str, stream: bool = False, **kwargs):
+        """
+        chat.completions.create() under the site's deadline, retries and the
+        breaker. Raises LLMUnavailable or the last provider error; a stream
+        is returned as an iterator that enforces the same deadline.
+        """
+        if not self.breaker.allow():
+            self._count(site, short_circuited=1)
+            raise LLMUnavailable("circuit open")
+        kwargs.setdefault("model", os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905"))
+        started = time_mod.monotonic()
+        end = started + self.deadlines.get(site, 10.0)
+        attempt = 0
+        while True:
+            remaining = end - time_mod.monotonic()
+            try:
+                if remaining <= 0:
+                    raise LLMUnavailable(f"{site}: deadline exceeded")
+                resp = self.client.chat.completions.create(timeout=remaining, stream=stream, **kwargs)
+            except Exception as e:
+                pause = random.uniform(0, self.backoff * 2 ** attempt)
+                if (attempt < self.retries and _llm_error_retryable(e)
+                        and time_mod.monotonic() + pause < end):
+                    attempt += 1
+                    self._count(site, retries=1)
+                    time_mod.sleep(pause)
+                    continue
+                self._finish(site, started, ok=False, error=e)
+                raise
+            if stream:
+                return self._watch_stream(site, started, end, resp)
+            self._finish(site, started, ok=True)
+            return resp
+
+    def _watch_stream(self, site: str, started: float, end: float, chunks):
+        # Slowness is judged on the wait for the first chunk; the whole
+        # stream still has to finish within the deadline.
+        first = None
+        try:
+            for chunk in chunks:
+                if first is None:
+                    first = time_mod.monotonic() - started
+                if time_mod.monotonic() > end:
+                    raise LLMUnavailable(f"{site}: deadline exceeded")
+                yield chunk
+        except GeneratorExit:  # the consumer stopped reading early
+            self._finish(site, started, ok=True, latency=first)
+            raise
+        except Exception as e:
+            getattr(chunks, "close", lambda: None)()
+            self._finish(site, started, ok=False, error=e)
+            raise
+        self._finish(site, started, ok=True, latency=first)
+
+    def stats(self) -> dict:
+        out = {}
+        with self._lock:
+            for site, m in self._sites.items():
+                lat = sorted(m["latencies"])
+                pct = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1) if lat else None  # noqa: E731
+                out[site] = {k: v for k, v in m.items() if k != "latencies"}
+                out[site].update(p50_ms=pct(0.5), p95_ms=pct(0.95), max_ms=pct(1.0))
+        return out
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._sites.clear()
+
+llm = LLMClient(_groq, app.config['LLM_DEADLINES'], app.config['LLM_RETRIES'], app.config['LLM_BACKOFF'],
+                CircuitBreaker(app.config['LLM_BREAKER_FAILURES'], app.config['LLM_BREAKER_COOLDOWN']),
+                app.config['LLM_SLOW_FRACTION'])
+
+# Keyword matching
+# The heuristic classifiers test a text against many keyword lists.
+# KeywordMatcher compiles all of one classifier's keywords into a single
+# trie-shaped regex, built once at import. match() returns every category that
+# has a keyword in the text in one left-to-right pass; first() returns the
+# first-listed one, for classifiers where earlier rules win. Keywords match
+# anywhere, exactly like `keyword in text`.
+class KeywordMatcher:
+    def __init__(self, rules: Dict[str, Tuple[str, ...]]):
+        self._rules = list(rules.items())
+        categories: Dict[str, set] = {}
+        for category, keywords in self._rules:
+            for kw in keywords:
+                categories.setdefault(kw, set()).add(category)
+        trie: dict = {}
+        for kw in categories:
+            node = trie
+            for ch in kw:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        # At each position the regex reports the longest keyword starting
+        # there; every other keyword that matches at that position is a prefix
+        # of it, so _hits maps it to their categories too.
+        self._regex = re.compile(self._trie_pattern(trie))
+        self._hits: Dict[str, frozenset] = {
+            kw: frozenset().union(*(cats for other, cats in categories.items() if kw.startswith(other)))
+            for kw in categories
+        }
+        order = {category: rank for rank, (category, _) in enumerate(self._rules)}
+        self._rank: Dict[str, int] = {kw: min(order[c] for c in cats) for kw, cats in self._hits.items()}
+
+    @classmethod
+    def _trie_pattern(cls, node: dict) -> str:
+        branches = [re.escape(ch) + cls._trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: prefer the longer keyword when this one also ends here.
+        return f"(?:{body})?" if "" in node else body
+
+    def match(self, text: str) -> set:
+        """The categories with at least one keyword in text."""
+        found = set()
+        # search() rather than finditer(): keywords may overlap, so resume one
+        # character after each match start instead of after its end.
+        m = self._regex.search(text)
+        while m:
+            found |= self._hits[m.group()]
+            m = self._regex.search(text, m.start() + 1)
+        return found
+
+    def first(self, text: str) -> Optional[str]:
+        """The first category, in the order the rules are listed, with a keyword in text; or None."""
+        m = self._regex.search(text)
+        if m is None:
+            return None
+        # Once one keyword is found only the rules listed before it can still win;
+        # checking those directly beats scanning the rest of keyword-dense text.
+        best = self._rank[m.group()]
+        for category, keywords in self._rules[:best]:
+            for kw in keywords:
+                if kw in text:
+                    return category
+        return self._rules[best][0]
+
 def _json_from_text(s: str) -> dict:
     try:
         return json.loads(s or "")
@@ -78,12 +486,76 @@ def _json_from_text(s: str) -> dict:
                 return {}
         return {}
 
+# LLM result cache
+# Repeated utterances ("show my tasks", "add buy milk") get the same answer
+# from the model, so successful Groq results are memoized for LLM_CACHE_TTL
+# seconds in a bounded LRU. Keys hash the normalized text together with the
+# language, model and prompt version; bump LLM_PROMPT_VERSIONS[kind] whenever
+# a prompt changes. Heuristic fallbacks are never cached. Values are stored
+# as JSON so callers always get a fresh copy.
+LLM_PROMPT_VERSIONS = {"nlu": 1, "emotion": 1, "decompose": 1, "understand": 1}
+
+class LLMCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        if self.ttl <= 0:
+            return None
+        now = time_mod.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit and hit[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return json.loads(hit[1])
+            if hit:
+                del self._data[key]
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time_mod.monotonic() + self.ttl, json.dumps(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+llm_cache = LLMCache(app.config['LLM_CACHE_SIZE'], app.config['LLM_CACHE_TTL'])
+
+def llm_cache_key(kind: str, text: str, lang: str = "") -> str:
+    """Cache key for one prompt: case, spacing and end punctuation don't matter."""
+    normalized = " ".join((text or "").casefold().split()).strip(" .,!?")
+    model = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
+    raw = "\x1f".join((kind, str(LLM_PROMPT_VERSIONS[kind]), model, lang, normalized))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
 def nlu_understand(text: str, lang: str = "hinglish") -> dict:
     t = (text or "").strip()
     if not t:
         return {"intent":"unknown","slots":{}}
     # Use Groq if available
     if _groq:
+        key = llm_cache_key("nlu", t, lang)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
         try:
             sys_prompt = (
                 "Extract the user's intent for a task manager.\n"
@@ -91,31 +563,47 @@ def nlu_understand(text: str, lang: str = "hinglish") -> dict:
                 "Slots: task, goal, due, time, category, days.\n"
                 "User may speak English, Hindi, or Hinglish. Return ONLY compact JSON."
             )
-            resp = _groq.chat.completions.create(
-                model=os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905"),
+            resp = llm.complete(
+                "nlu",
                 messages=[{"role":"system","content":sys_prompt},{"role":"user","content":t}],
                 temperature=0.2, max_tokens=200,
             )
             data = _json_from_text(resp.choices[0].message.content)
             if isinstance(data, dict) and data.get("intent"):
+                llm_cache.set(key, data)
                 return data
         except Exception as e:
             print("[NLU][Groq] error:", e)
-    # Heuristic fallback
+    return _nlu_fallback(t)
+
+NLU_KEYWORDS = KeywordMatcher({
+    "decompose": ("break it down","break this down","break down","decompose","subtask","plan this","plan for",
+                  "tordo","tod do","toad do","tode do","toda do"),
+    "add_task": ("add","create","new task","add task","jodo","kaam jodo","task jodo","naya kaam"),
+    "delete_task": ("delete","remove","mitao","hatado","hata do","delete kar do"),
+    "complete_task": ("complete","finish","done","khatam","poora","ho gaya"),
+    "list_tasks": ("list","show","tasks","dikhado","list dikhao","kaam dikhao"),
+    "reschedule": ("reschedule","postpone","move tasks","kal kar do","tomorrow","shift karo"),
+    "smalltalk": ("stressed","anxious","sad","tired","lonely","down","overwhelmed","bura lag"),
+})
+
+def _nlu_fallback(t: str) -> dict:
+    """Keyword intent/slot rules used when Groq is unavailable or fails."""
     tl = t.lower()
-    if any(k in tl for k in ("break it down","break this down","break down","decompose","subtask","plan this","plan for","tordo","tod do","toad do","tode do","tod do","toda do","toda do")):
+    intent = NLU_KEYWORDS.first(tl)
+    if intent == "decompose":
         return {"intent":"decompose","slots":{"goal": t}}
-    if any(k in tl for k in ("add","create","new task","add task","jodo","kaam jodo","task jodo","naya kaam")):
+    if intent == "add_task":
         return {"intent":"add_task","slots":{"task": _title_from_transcript(tl) or t}}
-    if any(k in tl for k in ("delete","remove","mitao","hatado","hata do","delete kar do")):
+    if intent == "delete_task":
         return {"intent":"delete_task","slots":{"task": tl.split("delete",1)[-1].strip() or tl.split("remove",1)[-1].strip()}}
-    if any(k in tl for k in ("complete","finish","done","khatam","poora","ho gaya")):
+    if intent == "complete_task":
         return {"intent":"complete_task","slots":{"task": tl.replace("complete","").replace("finish","").replace("done","").strip()}}
-    if any(k in tl for k in ("list","show","tasks","dikhado","list dikhao","kaam dikhao")):
+    if intent == "list_tasks":
         return {"intent":"list_tasks","slots":{}}
-    if any(k in tl for k in ("reschedule","postpone","move tasks","kal kar do","tomorrow","shift karo")):
+    if intent == "reschedule":
         return {"intent":"reschedule","slots":{"days":"1"}}
-    if any(k in tl for k in ("stressed","anxious","sad","tired","lonely","down","overwhelmed","bura lag")):
+    if intent == "smalltalk":
         return {"intent":"smalltalk","slots":{"mood":"low"}}
     return {"intent":"unknown","slots":{}}
 
@@ -125,9 +613,13 @@ def detect_emotion(text: str) -> tuple:
         return ("neutral", 0.0)
     # Use Groq if available
     if _groq:
+        key = llm_cache_key("emotion", t)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return tuple(cached)
         try:
-            resp = _groq.chat.completions.create(
-                model=os.getenv("GROQ_MODEL","moonshotai/kimi-k2-instruct-0905"),
+            resp = llm.complete(
+                "emotion",
                 messages=[{"role":"system","content":"Classify emotion: stressed, sad, tired, positive, neutral. Return JSON {\"emotion\":\"...\",\"score\":0-1}."},
                           {"role":"user","content": t}],
                 temperature=0.1, max_tokens=40,
@@ -137,34 +629,114 @@ def detect_emotion(text: str) -> tuple:
             score = float(data.get("score", 0.6))
             if emo not in {"stressed","sad","tired","positive","neutral"}:
                 emo = "neutral"
-            return (emo, max(0.0, min(score, 1.0)))
+            result = (emo, max(0.0, min(score, 1.0)))
+            llm_cache.set(key, result)
+            return result
         except Exception as e:
             print("[Emotion][Groq] error:", e)
-    # Lexicon fallback
-    NEG_STRESS = {"overwhelmed","stress","stressed","anxious","panic","pressure","burnout","burned out","busy","too much"}
-    NEG_SAD    = {"sad","down","upset","depressed","cry","lonely","hurt","bad day"}
-    NEG_TIRED  = {"tired","exhausted","fatigued","sleepy","drained","worn out","not well","sick","headache"}
-    POSITIVE   = {"great","good","awesome","amazing","excited","happy","fantastic","love"}
-    if any(w in t for w in NEG_STRESS): return ("stressed", 0.8)
-    if any(w in t for w in NEG_SAD):    return ("sad", 0.8)
-    if any(w in t for w in NEG_TIRED):  return ("tired", 0.8)
-    if any(w in t for w in POSITIVE):   return ("positive", 0.7)
+    return _emotion_fallback(t)
+
+EMOTION_KEYWORDS = KeywordMatcher({
+    "stressed": ("overwhelmed","stress","stressed","anxious","panic","pressure","burnout","burned out","busy","too much"),
+    "sad":      ("sad","down","upset","depressed","cry","lonely","hurt","bad day"),
+    "tired":    ("tired","exhausted","fatigued","sleepy","drained","worn out","not well","sick","headache"),
+    "positive": ("great","good","awesome","amazing","excited","happy","fantastic","love"),
+})
+
+def _emotion_fallback(t: str) -> tuple:
+    """Lexicon emotion rules used when Groq is unavailable or fails; t is lowercased."""
+    found = EMOTION_KEYWORDS.first(t)
+    if found == "stressed": return ("stressed", 0.8)
+    if found == "sad":      return ("sad", 0.8)
+    if found == "tired":    return ("tired", 0.8)
+    if found == "positive": return ("positive", 0.7)
     return ("neutral", 0.5)
 
+# Combined understanding
+# One completion per voice turn for emotion, score, intent and slots instead
+# of detect_emotion() + nlu_understand(). The answer is validated against the
+# same vocabularies the split prompts use; an invalid intent falls back to
+# the keyword rules, an invalid emotion to the lexicon.
+NLU_INTENTS = {"add_task", "complete_task", "delete_task", "list_tasks", "decompose", "reschedule",
+               "smalltalk", "unknown"}
+NLU_SLOTS = {"task", "goal", "due", "time", "category", "days", "mood"}
+EMOTIONS = {"stressed", "sad", "tired", "positive", "neutral"}
+
+def _validate_understanding(data) -> Optional[dict]:
+    """Normalized {emotion, score, intent, slots} from a model answer, or None if unusable."""
+    if not isinstance(data, dict) or data.get("intent") not in NLU_INTENTS:
+        return None
+    slots = data.get("slots") if isinstance(data.get("slots"), dict) else {}
+    out = {"intent": data["intent"],
+           "slots": {k: v for k, v in slots.items()
+                     if k in NLU_SLOTS and isinstance(v, (str, int, float)) and not isinstance(v, bool)}}
+    emo = str(data.get("emotion", "")).lower()
+    try:
+        score = float(data.get("score", 0.6))
+    except (TypeError, ValueError):
+        emo = ""
+    if emo in EMOTIONS:
+        out["emotion"], out["score"] = emo, max(0.0, min(score, 1.0))
+    return out
+
+def understand(text: str, lang: str = "hinglish") -> dict:
+    """Emotion, score, intent and slots for one utterance, per VOICE_UNDERSTAND."""
+    t = (text or "").strip()
+    if app.config['VOICE_UNDERSTAND'] == "split":
+        emotion, score = detect_emotion(t)
+        parsed = nlu_understand(t, lang)
+        return {"emotion": emotion, "score": score, "intent": parsed.get("intent", "unknown"),
+                "slots": parsed.get("slots") if isinstance(parsed.get("slots"), dict) else {}}
+    if not t:
+        return {"emotion": "neutral", "score": 0.0, "intent": "unknown", "slots": {}}
+    result = None
+    if _groq:
+        key = llm_cache_key("understand", t, lang)
+        result = llm_cache.get(key)
+        if result is None:
+            try:
+                sys_prompt = (
+                    "Classify the user's emotion and extract their intent for a task manager.\n"
+                    "Emotions: stressed, sad, tired, positive, neutral, with a score from 0 to 1.\n"
+                    "Intents: add_task, complete_task, delete_task, list_tasks, decompose, reschedule, smalltalk, unknown.\n"
+                    "Slots: task, goal, due, time, category, days.\n"
+                    "User may speak English, Hindi, or Hinglish. Return ONLY compact JSON: "
+                    "{\"emotion\":\"...\",\"score\":0.0,\"intent\":\"...\",\"slots\":{}}"
+                )
+                resp = llm.complete(
+                    "understand",
+                    messages=[{"role":"system","content":sys_prompt},{"role":"user","content":t}],
+                    temperature=0.1, max_tokens=240,
+                )
+                result = _validate_understanding(_json_from_text(resp.choices[0].message.content))
+                if result and "emotion" in result:
+                    llm_cache.set(key, result)
+            except Exception as e:
+                print("[Understand][Groq] error:", e)
+    if result is None:
+        result = dict(_nlu_fallback(t))
+    if "emotion" not in result:
+        result["emotion"], result["score"] = _emotion_fallback(t.lower())
+    return result
+
 def decompose_goal_text(goal_text: str) -> list:
     text = (goal_text or "").strip()
     if not text:
         return []
     # Use Groq if available
     if _groq:
+        key = llm_cache_key("decompose", text)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
         try:
             prompt = (
                 "Break the user's goal into a small, actionable checklist of 3-7 subtasks.\n"
                 "Return ONLY JSON: {\"subtasks\":[{\"name\":\"...\"}, ...]}.\n"
                 f"Goal: {text}"
             )
-            resp = _groq.chat.completions.create(
-                model=os.getenv("GROQ_MODEL","moonshotai/kimi-k2-instruct-0905"),
+            resp = llm.complete(
+                "decompose",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=220,
                 temperature=0.4,
@@ -177,6 +749,7 @@ def decompose_goal_text(goal_text: str) -> list:
                 if name:
                     out.append({"name": name})
             if out:
+                llm_cache.set(key, out)
                 return out
         except Exception as e:
             print("[Decompose][Groq] error:", e)
@@ -216,27 +789,322 @@ def decompose_goal_text(goal_text: str) -> list:
 
 # Background task for reminders
 import time as time_mod
-def reminder_checker():
-    while True:
+
+app.config['REMINDER_HORIZON_HOURS'] = int(os.getenv("REMINDER_HORIZON_HOURS", "24"))
+# Multi-process leasing: every process that runs the scheduler claims a reminder
+# with a conditional UPDATE before firing it. Reminders are split into
+# REMINDER_SHARD_COUNT shards by user_id; REMINDER_SHARDS lists the shards this
+# process owns (default: all of them).
+app.config['REMINDER_SHARD_COUNT'] = max(1, int(os.getenv("REMINDER_SHARD_COUNT", "1")))
+app.config['REMINDER_SHARDS'] = os.getenv("REMINDER_SHARDS", "")
+app.config['REMINDER_LEASE_SECONDS'] = int(os.getenv("REMINDER_LEASE_SECONDS", "60"))
+app.config['REMINDER_RESYNC_SECONDS'] = int(os.getenv("REMINDER_RESYNC_SECONDS", "300"))
+app.config['REMINDER_WORKER_ID'] = os.getenv("REMINDER_WORKER_ID", "")
+app.config['REMINDER_AUTOSTART'] = os.getenv("REMINDER_AUTOSTART", "0") == "1"
+
+class ReminderScheduler:
+    """
+    In-memory timer heap of upcoming reminders.
+
+    Entries are (reminder_time, task_id) pairs. `_pending` maps each task to the
+    deadline it is currently scheduled for, so entries left behind by a
+    reschedule or cancel are skipped lazily when they reach the top of the heap.
+    The worker sleeps until the earliest deadline (or the next resync) and is
+    woken early when a write schedules something sooner.
+
+    Several processes may run a scheduler against the same database. Before
+    firing, a reminder is leased with a conditional UPDATE on
+    reminder_claimed_by/reminder_claim_until, so only one process fires it;
+    a lease left behind by a dead worker expires and the row is picked up by
+    the next resync.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._pending: Dict[int, datetime] = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._loaded_until = None
+        self.worker_id = None
+        self.shard_count = 1
+        self.shards = None
+
+    def start(self):
+        """Start the worker thread once per process."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self.worker_id = app.config['REMINDER_WORKER_ID'] or f"{socket.gethostname()}:{os.getpid()}"
+            self.shard_count = app.config['REMINDER_SHARD_COUNT']
+            owned = [s.strip() for s in app.config['REMINDER_SHARDS'].split(",") if s.strip()]
+            self.shards = {int(s) % self.shard_count for s in owned} or None
+            self._thread = threading.Thread(target=self.run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def owns(self, user_id: Optional[int]) -> bool:
+        """True if this process handles reminders for user_id's shard."""
+        return self.shards is None or ((user_id or 0) % self.shard_count) in self.shards
+
+    def schedule(self, task_id: int, when: Optional[datetime], user_id: Optional[int] = None) -> None:
+        """Schedule (or move) the reminder for task_id. None cancels it."""
+        with self._cond:
+            if self._thread is None:
+                return
+            if when is None or not self.owns(user_id):
+                self._pending.pop(task_id, None)
+                return
+            if self._loaded_until is not None and when > self._loaded_until:
+                # Beyond the loaded window; the next refill picks it up.
+                self._pending.pop(task_id, None)
+                return
+            if self._pending.get(task_id) == when:
+                return
+            self._pending[task_id] = when
+            heapq.heappush(self._heap, (when, task_id))
+            if self._heap[0] == (when, task_id):
+                self._cond.notify()
+
+    def cancel(self, task_id: int) -> None:
+        self.schedule(task_id, None)
+
+    def _refill(self) -> None:
+        """
+        Load reminders due within the horizon for the owned shards (id, user_id
+        and reminder_time columns only). This also picks up reminders written
+        by other processes and rows whose lease expired.
+        """
+        until = datetime.now() + timedelta(hours=app.config['REMINDER_HORIZON_HOURS'])
         with app.app_context():
-            now = datetime.now()
-            tasks = Task.query.filter(
+            query = db.session.query(Task.id, Task.user_id, Task.reminder_time).filter(
                 Task.reminder_time != None,
-                Task.reminder_time <= now,
+                Task.reminder_time <= until,
                 Task.completed == False
-            ).all()
+            )
+            if self.shards is not None:
+                query = query.filter((db.func.coalesce(Task.user_id, 0) % self.shard_count).in_(self.shards))
+            rows = query.all()
+            db.session.remove()
+        with self._cond:
+            self._loaded_until = until
+        for task_id, user_id, when in rows:
+            self.schedule(task_id, when, user_id)
+
+    def _peek(self) -> Optional[datetime]:
+        """Earliest live deadline; caller holds the lock."""
+        while self._heap:
+            when, task_id = self._heap[0]
+            if self._pending.get(task_id) == when:
+                return when
+            heapq.heappop(self._heap)
+        return None
+
+    def _wait_for_due(self, refill_at: datetime) -> list:
+        """Block until something is due or a refill is needed; return due entries."""
+        with self._cond:
+            while True:
+                now = datetime.now()
+                nxt = self._peek()
+                if (nxt is not None and nxt <= now) or now >= refill_at:
+                    break
+                wake_at = refill_at if nxt is None else min(nxt, refill_at)
+                self._cond.wait((wake_at - now).total_seconds())
+            due = []
+            while self._peek() is not None and self._heap[0][0] <= now:
+                when, task_id = heapq.heappop(self._heap)
+                self._pending.pop(task_id, None)
+                due.append((task_id, when))
+            return due
+
+    def _claim(self, task_ids: list) -> Tuple[str, datetime]:
+        """
+        Lease the given reminders for this worker in one atomic UPDATE.
+        Only rows that are still due, incomplete and not leased by a live
+        worker are taken; the returned token identifies this batch's claims.
+        """
+        now = datetime.now()
+        token = f"{self.worker_id}#{uuid.uuid4().hex[:8]}"[-64:]
+        until = now + timedelta(seconds=app.config['REMINDER_LEASE_SECONDS'])
+        db.session.execute(
+            update(Task)
+            .where(
+                Task.id.in_(task_ids),
+                Task.reminder_time != None,
+                Task.reminder_time <= now,
+                Task.completed == False,
+                or_(Task.reminder_claim_until == None, Task.reminder_claim_until < now),
+            )
+            # Leasing is bookkeeping, not a user-visible change: keep updated_at.
+            .values(reminder_claimed_by=token, reminder_claim_until=until, updated_at=Task.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return token, until
+
+    def _fire(self, due: list) -> None:
+        with app.app_context():
+            token, _ = self._claim([task_id for task_id, _ in due])
+            tasks = Task.query.filter(Task.id.in_([task_id for task_id, _ in due]),
+                                      Task.reminder_claimed_by == token).all()
             for t in tasks:
                 print(f"[REMINDER] Task '{t.name}' is due now!")
                 t.reminder_time = None
-                db.session.commit()
-        time_mod.sleep(60)
+                t.reminder_claimed_by = None
+                t.reminder_claim_until = None
+            db.session.commit()
+            db.session.remove()
+
+    def run(self):
+        resync = min(timedelta(hours=app.config['REMINDER_HORIZON_HOURS']) / 2,
+                     timedelta(seconds=app.config['REMINDER_RESYNC_SECONDS']))
+        refill_at = prune_at = datetime.now()
+        while True:
+            try:
+                if datetime.now() >= prune_at:
+                    # Housekeeping rides on this thread so request handlers stay read-only.
+                    with app.app_context():
+                        prune_tombstones()
+                        db.session.remove()
+                    prune_at = datetime.now() + timedelta(hours=1)
+                if datetime.now() >= refill_at:
+                    self._refill()
+                    refill_at = datetime.now() + resync
+                due = self._wait_for_due(refill_at)
+                if due:
+                    self._fire(due)
+            except Exception as e:
+                print("[REMINDER] scheduler error:", e)
+                time_mod.sleep(5)
+
+reminders = ReminderScheduler()
+
+def reminder_checker():
+    """Thread target kept for compatibility; runs the timer-heap scheduler."""
+    reminders.run()
+
+def _collect_reminder_changes(session, flush_context):
+    """Remember reminder changes made in this flush; applied after commit."""
+    changes = session.info.setdefault("reminder_changes", {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Task) and obj.id is not None:
+            changes[obj.id] = (None if obj.completed else obj.reminder_time, obj.user_id)
+    for obj in session.deleted:
+        if isinstance(obj, Task) and obj.id is not None:
+            changes[obj.id] = (None, obj.user_id)
+
+def _apply_reminder_changes(session):
+    for task_id, (when, user_id) in (session.info.pop("reminder_changes", None) or {}).items():
+        reminders.schedule(task_id, when, user_id)
+
+def _discard_reminder_changes(session):
+    session.info.pop("reminder_changes", None)
+
+event.listen(db.session, "after_flush", _collect_reminder_changes)
+event.listen(db.session, "after_commit", _apply_reminder_changes)
+event.listen(db.session, "after_rollback", _discard_reminder_changes)
+
+@app.before_request
+def _autostart_reminders():
+    # Under gunicorn/uwsgi the __main__ block never runs; start per worker process.
+    if app.config['REMINDER_AUTOSTART'] and reminders._thread is None:
+        reminders.start()
+
+# Streaming chat replies
+# Free-form replies (voice_chat and the voice command fallbacks) can take
+# seconds to generate in full. A client that sends "Accept: text/event-stream"
+# gets them as Server-Sent Events instead: one "token" event per text delta
+# as Groq produces it, then a "done" event carrying the same JSON body the
+# non-streaming reply would have had. Everyone else gets that JSON in one go.
+CHAT_SYSTEM_PROMPT = (
+    "You are DaySavvy, the world's first EI (Emotional Intelligence) assistant. "
+    "You support humans emotionally, help with productivity, and keep conversations lively with wit and humor. "
+    "You can assist with any task, break down goals, listen to feelings, and offer encouragement or resets when needed. "
+    "Reply in a warm, human-like, and casual tone. Crack jokes or use playful banter to lighten the mood, especially if the user seems stressed or sad. "
+    "If tasks or goals are mentioned, help organize, plan, or decompose them. Always aim to make the user feel understood, supported, and uplifted."
+)
+FALLBACK_SYSTEM_PROMPT = (
+    "You are DaySavvy, a friendly, helpful, and gentle productivity assistant. "
+    "You can chat about anything, help with tasks, listen to feelings, and keep the conversation going naturally. "
+    "Reply in a warm, human-like, casual tone. If the user seems stressed or sad, offer encouragement or a reset. "
+    "If they mention tasks or goals, you can help break them down or add them."
+)
+
+def wants_event_stream() -> bool:
+    """True when the client explicitly accepts text/event-stream and Groq can stream."""
+    return (bool(_groq) and app.config['VOICE_STREAM']
+            and "text/event-stream" in request.accept_mimetypes.values())
+
+def chat_completion(sys_prompt: str, user_text: str, stream: bool = False, site: str = "chat"):
+    return llm.complete(
+        site,
+        messages=[
+            {"role": "system", "content": sys_prompt},
+            {"role": "user", "content": user_text}
+        ],
+        temperature=0.7,
+        max_tokens=300,
+        stream=stream,
+    )
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_chat_reply(sys_prompt: str, user_text: str, key: str, fallback: str, site: str = "chat", **extra):
+    """
+    Event-stream response relaying a Groq reply as it is generated. The final
+    "done" event holds {key: full reply, **extra} plus time-to-first-token.
+    If Groq fails before the first token, "done" carries `fallback` instead;
+    if it fails midway, the partial reply already sent is kept. Inside a
+    voice turn the timings count from the start of the turn.
+    """
+    pipe = g.get("voice_pipeline")
+    started = pipe.started if pipe is not None else time_mod.perf_counter()
+
+    def events():
+        parts, first_ms = [], None
+        try:
+            for chunk in chat_completion(sys_prompt, user_text, stream=True, site=site):
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first_ms is None:
+                    first_ms = round((time_mod.perf_counter() - started) * 1000, 1)
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+        except Exception as e:
+            print("[Chat][Groq] stream error:", e)
+        reply = "".join(parts).strip() or fallback
+        debug = {"first_token_ms": first_ms,
+                 "total_ms": round((time_mod.perf_counter() - started) * 1000, 1)}
+        if pipe is not None:
+            debug["stages_ms"] = dict(pipe.timings)
+        yield sse_event("done", {key: reply, **extra, "debug": debug})
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def chat_fallback_reply(transcript: str, emotion: str, lang: str):
+    """Final fallback of the voice command handlers: free-form Groq chat, or the local reply."""
+    if _groq:
+        if wants_event_stream():
+            return stream_chat_reply(FALLBACK_SYSTEM_PROMPT, transcript, "message",
+                                     _gen_empathetic_reply_local(transcript, emotion, lang),
+                                     site="fallback", continue_listening=True, task_added=False)
+        try:
+            resp = chat_completion(FALLBACK_SYSTEM_PROMPT, transcript, site="fallback")
+            reply = resp.choices[0].message.content.strip()
+            return jsonify({"message": reply, "continue_listening": True, "task_added": False})
+        except Exception as e:
+            print("[Chat][Groq] error:", e)
+    # If Groq not available, fallback to local
+    msg = _gen_empathetic_reply_local(transcript, emotion, lang)
+    return jsonify({"message": msg, "continue_listening": True, "task_added": False})
 
 # A talk with Emotion
 @app.route("/voice/chat", methods=["POST"])
 def voice_chat():
     """
     Accepts: { "message": "user says something" }
-    Returns: { "reply": "AI's reply" }
+    Returns: { "reply": "AI's reply" }, or an event stream of it (see stream_chat_reply)
     """
     data = request.get_json(force=True, silent=True) or {}
     user_msg = (data.get("message") or "").strip()
@@ -245,24 +1113,11 @@ def voice_chat():
 
     # Use Groq LLM for generative chat
     if _groq:
+        if wants_event_stream():
+            return stream_chat_reply(CHAT_SYSTEM_PROMPT, user_msg, "reply",
+                                     "Sorry, I had trouble thinking of a reply. Try again?")
         try:
-            # You can customize the system prompt for personality
-            sys_prompt = (
-    "You are DaySavvy, the world's first EI (Emotional Intelligence) assistant. "
-    "You support humans emotionally, help with productivity, and keep conversations lively with wit and humor. "
-    "You can assist with any task, break down goals, listen to feelings, and offer encouragement or resets when needed. "
-    "Reply in a warm, human-like, and casual tone. Crack jokes or use playful banter to lighten the mood, especially if the user seems stressed or sad. "
-    "If tasks or goals are mentioned, help organize, plan, or decompose them. Always aim to make the user feel understood, supported, and uplifted."
-)
-            resp = _groq.chat.completions.create(
-                model=os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905"),
-                messages=[
-                    {"role": "system", "content": sys_prompt},
-                    {"role": "user", "content": user_msg}
-                ],
-                temperature=0.7,
-                max_tokens=300,
-            )
+            resp = chat_completion(CHAT_SYSTEM_PROMPT, user_msg)
             reply = resp.choices[0].message.content.strip()
             return jsonify({"reply": reply})
         except Exception as e:
@@ -292,12 +1147,27 @@ class Task(db.Model):
     category = db.Column(db.String(100), default='Other')
     completed = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
     priority = db.Column(db.String(20), default='Normal')
     reminder_time = db.Column(db.DateTime, nullable=True)
+    reminder_claimed_by = db.Column(db.String(64), nullable=True)
+    reminder_claim_until = db.Column(db.DateTime, nullable=True)
     parent_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=True)
     order_index = db.Column(db.Integer, nullable=True)
     subtasks = db.relationship('Task', backref=db.backref('parent', remote_side=[id]), lazy=True)
-    
+
+    # Every hot query filters by user_id first (index, api_get_tasks, voice list,
+    # propose_reschedule_candidates, _recent_goal_candidate); the reminder
+    # scheduler only ever looks at pending reminders.
+    __table_args__ = (
+        db.Index('ix_task_user_status_due', 'user_id', 'completed', 'due_date', 'task_time'),
+        db.Index('ix_task_user_created', 'user_id', 'created_at'),
+        db.Index('ix_task_user_parent', 'user_id', 'parent_id'),
+        db.Index('ix_task_user_updated', 'user_id', 'updated_at'),
+        db.Index('ix_task_reminder_pending', 'reminder_time',
+                 sqlite_where=(completed == False), postgresql_where=(completed == False)),
+    )
+
     def __repr__(self):
         return f"<Task id={self.id} name={self.name!r} completed={self.completed}>"
     
@@ -307,8 +1177,182 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     onboarding_done = db.Column(db.Boolean, default=False)
+    # Bumped in the same transaction as any change to the user's tasks; the
+    # ETags of the task list, delta sync and index page are derived from it.
+    task_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)
     tasks = db.relationship('Task', backref='user', lazy=True) 
 
+# Deleted tasks leave a tombstone so delta sync (/api/tasks/changes) can report them.
+class TaskTombstone(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_task_tombstone_user_deleted', 'user_id', 'deleted_at'),
+    )
+
+def prune_tombstones() -> int:
+    """Delete tombstones past TOMBSTONE_RETENTION_DAYS; no valid delta-sync cursor needs them."""
+    cutoff = datetime.utcnow() - timedelta(days=app.config['TOMBSTONE_RETENTION_DAYS'])
+    count = TaskTombstone.query.filter(TaskTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return count
+
+# Progress of a bulk import; rows_done only advances when a chunk commits, so an
+# interrupted import resumes by skipping that many source records.
+class TaskImport(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    source = db.Column(db.String(255), nullable=True)
+    format = db.Column(db.String(10), nullable=False)
+    status = db.Column(db.String(20), default='running', nullable=False)
+    rows_done = db.Column(db.Integer, default=0, nullable=False)
+    imported = db.Column(db.Integer, default=0, nullable=False)
+    skipped = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Server-side voice conversation state for VOICE_STATE_STORE=db, keyed by the
+# opaque id kept in the session cookie.
+class VoiceConversation(db.Model):
+    sid = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+def _tombstone_deleted_tasks(session, flush_context, instances):
+    """Record a tombstone for every Task deleted through the ORM in this flush."""
+    for obj in list(session.deleted):
+        if isinstance(obj, Task) and obj.id is not None:
+            session.add(TaskTombstone(task_id=obj.id, user_id=obj.user_id))
+
+event.listen(db.session, "before_flush", _tombstone_deleted_tasks)
+
+def bump_task_version(*user_ids, connection=None) -> None:
+    """Increment task_version for users whose tasks changed in this transaction."""
+    ids = sorted({u for u in user_ids if u is not None})
+    if ids:
+        (connection or db.session).execute(
+            update(User.__table__).where(User.__table__.c.id.in_(ids))
+            .values(task_version=User.__table__.c.task_version + 1))
+        g.pop("task_versions", None)
+        task_fragments.forget_users(ids)
+
+def _bump_versions_for_flush(session, flush_context, instances):
+    """ORM writes: bump the owners of every Task added, modified or deleted in this flush."""
+    owners = {obj.user_id for obj in session.new if isinstance(obj, Task)}
+    owners |= {obj.user_id for obj in session.deleted if isinstance(obj, Task)}
+    owners |= {obj.user_id for obj in session.dirty if isinstance(obj, Task) and session.is_modified(obj)}
+    # Core statement on the flush's connection, so it can't trigger autoflush.
+    bump_task_version(*owners, connection=session.connection())
+
+event.listen(db.session, "before_flush", _bump_versions_for_flush)
+
+def delete_tasks_where(*criteria) -> None:
+    """
+    Bulk-delete tasks matching criteria, writing their tombstones with one
+    INSERT ... SELECT first. Use this instead of Query.delete() for tasks.
+    """
+    db.session.execute(insert(TaskTombstone).from_select(
+        ["task_id", "user_id", "deleted_at"],
+        db.select(Task.id, Task.user_id, db.literal(datetime.utcnow(), db.DateTime)).where(*criteria)
+    ))
+    db.session.execute(delete(Task).where(*criteria).execution_options(synchronize_session=False))
+
+# Full-text search over task names
+# On SQLite an external-content FTS5 table mirrors task.name through triggers,
+# so search cost depends on the number of matches rather than the size of a
+# user's history. Other backends (or SQLite builds without FTS5) fall back to
+# a case-insensitive LIKE.
+TASK_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(name, content='task', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF name ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO task_fts(rowid, name) VALUES (new.id, new.name); END",
+)
+_task_fts_available: Dict[str, bool] = {}
+
+def create_task_fts(connection) -> bool:
+    """Create the FTS5 table and sync triggers (SQLite only); rebuild the index if new."""
+    if connection.dialect.name != "sqlite":
+        return False
+    try:
+        existed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='task_fts'").first() is not None
+        for stmt in TASK_FTS_DDL:
+            connection.exec_driver_sql(stmt)
+        if not existed:
+            connection.exec_driver_sql("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+    except Exception as e:
+        print("[Search] FTS5 unavailable, using LIKE:", e)
+        return False
+    _task_fts_available[str(connection.engine.url)] = True
+    return True
+
+def ensure_task_fts() -> bool:
+    """Create task_fts on an existing database (e.g. one made before FTS was added)."""
+    with db.engine.begin() as conn:
+        return create_task_fts(conn)
+
+@event.listens_for(Task.__table__, "after_create")
+def _task_after_create(target, connection, **kw):
+    create_task_fts(connection)
+
+@event.listens_for(Task.__table__, "before_drop")
+def _task_before_drop(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS task_fts")
+
+def task_fts_enabled() -> bool:
+    engine = db.session.get_bind()
+    key = str(engine.url)
+    if key not in _task_fts_available:
+        found = False
+        if engine.dialect.name == "sqlite":
+            found = db.session.execute(db.text(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='task_fts'")).first() is not None
+        _task_fts_available[key] = found
+    return _task_fts_available[key]
+
+def fts_match_expression(q: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+    "quoted words" become phrase queries; every other word becomes a prefix
+    term, and all terms must match. Returns None when nothing searchable is left.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', q or ""):
+        tokens = re.findall(r'\w+', phrase if phrase else word)
+        if not tokens:
+            continue
+        if phrase:
+            terms.append('"' + " ".join(tokens) + '"')
+        else:
+            terms.extend(f'"{tok}"*' for tok in tokens)
+    return " ".join(terms) or None
+
+def apply_task_search(query, q: str, ranked: bool = False):
+    """Restrict a Task query to names matching q; ranked=True orders by relevance (bm25)."""
+    q = (q or "").strip()
+    if not q:
+        return query
+    match = fts_match_expression(q) if task_fts_enabled() else None
+    if match is None:
+        return query.filter(Task.name.icontains(q.strip('"'), autoescape=True))
+    hits = db.text(
+        "SELECT rowid AS id, bm25(task_fts) AS rank FROM task_fts WHERE task_fts MATCH :match"
+    ).bindparams(match=match).columns(id=db.Integer, rank=db.Float).subquery("task_fts_hits")
+    query = query.join(hits, hits.c.id == Task.id)
+    if ranked:
+        query = query.order_by(hits.c.rank)
+    return query
+
 # Text-to-Speech Endpoint using gTTS
 from gtts import gTTS
 import tempfile
@@ -373,6 +1417,32 @@ class EmotionEvent(db.Model):
     score = db.Column(db.Float, default=0.0)            
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_emotion_event_user_created', 'user_id', 'created_at'),
+    )
+
+# Read-your-writes: a request that wrote reads from the primary from then on,
+# and the user's next requests do too for READ_YOUR_WRITES_SECONDS. The emotion
+# log is append-only and never read back on replica paths, so it doesn't count.
+def _note_flush_write(session_, flush_context, instances):
+    if has_request_context() and any(not isinstance(o, EmotionEvent)
+                                     for o in (*session_.new, *session_.dirty, *session_.deleted)):
+        g.db_wrote = True
+
+def _note_bulk_write(orm_execute_state):
+    if has_request_context() and (orm_execute_state.is_insert or orm_execute_state.is_update
+                                  or orm_execute_state.is_delete):
+        g.db_wrote = True
+
+event.listen(db.session, "before_flush", _note_flush_write)
+event.listen(db.session, "do_orm_execute", _note_bulk_write)
+
+@app.after_request
+def _remember_write_time(response):
+    if g.get("db_wrote") and app.config['DATABASE_URL_READ']:
+        session["db_wrote_at"] = time_mod.time()
+    return response
+
 @app.route("/register", methods=["GET", "POST"])
 def register():
     form = RegisterForm()
@@ -418,11 +1488,68 @@ def logout():
     flash("Logged out.", "info")
     return redirect(url_for("login"))   
 
+# Identity
+# The signed-in user is resolved once per request into g.user, a small
+# read-only Identity (or None). Rows are cached process-wide for
+# IDENTITY_CACHE_TTL seconds; writes to the cached columns must call
+# forget_identity(), and other processes see the change once the TTL expires.
+class Identity(NamedTuple):
+    id: int
+    username: str
+    onboarding_done: bool
+
+_identity_cache: "OrderedDict[int, Tuple[float, Identity]]" = OrderedDict()
+_identity_lock = threading.Lock()
+
+def load_identity(uid: Optional[int]) -> Optional[Identity]:
+    if not uid:
+        return None
+    ttl = app.config['IDENTITY_CACHE_TTL']
+    now = time_mod.monotonic()
+    if ttl > 0:
+        with _identity_lock:
+            hit = _identity_cache.get(uid)
+            if hit and hit[0] > now:
+                _identity_cache.move_to_end(uid)
+                return hit[1]
+    row = db.session.query(User.id, User.username, User.onboarding_done).filter(User.id == uid).first()
+    if row is None:
+        return None
+    ident = Identity(row.id, row.username, bool(row.onboarding_done))
+    if ttl > 0:
+        with _identity_lock:
+            _identity_cache[uid] = (now + ttl, ident)
+            _identity_cache.move_to_end(uid)
+            while len(_identity_cache) > app.config['IDENTITY_CACHE_SIZE']:
+                _identity_cache.popitem(last=False)
+    return ident
+
+def forget_identity(uid: int) -> None:
+    with _identity_lock:
+        _identity_cache.pop(uid, None)
+
+@app.before_request
+def _load_current_user():
+    # Per-request memos; g outlives the request when an app context was
+    # already pushed (CLI, test clients).
+    g.pop("task_versions", None)
+    g.pop("page_build_id", None)
+    g.user = load_identity(session.get("user_id"))
+
+def login_required(view):
+    """401 JSON for API/voice routes, a redirect to the login page otherwise."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if g.get("user") is None:
+            if request.path.startswith(("/api/", "/voice/")):
+                return jsonify({"error": "Unauthorized"}), 401
+            return redirect(url_for("login"))
+        return view(*args, **kwargs)
+    return wrapper
+
 @app.context_processor
 def inject_current_user():
-    uid = session.get("user_id")
-    user = db.session.get(User, uid) if uid else None
-    return {"current_user": user}
+    return {"current_user": g.get("user")}
 
 # Forms
 class RegisterForm(FlaskForm):
@@ -446,8 +1573,41 @@ class TaskForm(FlaskForm):
     submit = SubmitField('Add Task')
 
 # Helper utilities
-def task_to_dict(t: Task) -> Dict[str, Any]:
-    """Serialize Task model to JSON-serializable dict for APIs and voice responses."""
+def subtask_stats(user_id: Optional[int], task_ids) -> Dict[int, Tuple[int, int]]:
+    """
+    (subtask_count, completed_subtask_count) for each parent in task_ids,
+    computed with one GROUP BY query per 500 ids instead of a lazy load per task.
+    """
+    ids = [i for i in task_ids if i is not None]
+    stats: Dict[int, Tuple[int, int]] = {}
+    for start in range(0, len(ids), 500):
+        rows = db.session.query(
+            Task.parent_id,
+            db.func.count(Task.id),
+            db.func.sum(db.case((Task.completed == True, 1), else_=0)),
+        ).filter(
+            Task.user_id == user_id,
+            Task.parent_id.in_(ids[start:start + 500])
+        ).group_by(Task.parent_id).all()
+        for parent_id, count, done in rows:
+            stats[parent_id] = (int(count), int(done or 0))
+    return stats
+
+def tasks_to_dicts(tasks: list) -> list:
+    """Serialize a batch of tasks (same owner) with one subtask aggregate query."""
+    if not tasks:
+        return []
+    stats = subtask_stats(tasks[0].user_id, [t.id for t in tasks])
+    return [task_to_dict(t, stats) for t in tasks]
+
+def task_to_dict(t: Task, stats: Optional[Dict[int, Tuple[int, int]]] = None) -> Dict[str, Any]:
+    """
+    Serialize Task model to JSON-serializable dict for APIs and voice responses.
+    Pass `stats` from subtask_stats() when serializing many tasks.
+    """
+    if stats is None:
+        stats = subtask_stats(t.user_id, [t.id])
+    subtask_count, completed_subtasks = stats.get(t.id, (0, 0))
     return {
        "id": t.id,
         "name": t.name,
@@ -456,112 +1616,332 @@ def task_to_dict(t: Task) -> Dict[str, Any]:
         "task_time": t.task_time.strftime("%H:%M:%S") if t.task_time else None,
         "category": t.category,
         "created_at": t.created_at.isoformat() if t.created_at else None,
+        "updated_at": t.updated_at.isoformat() if t.updated_at else None,
         "priority": t.priority,
         "reminder_time": t.reminder_time.isoformat() if t.reminder_time else None,
         "user_id": t.user_id,
         "parent_id": t.parent_id,
         "order_index": t.order_index,
-        "has_subtasks": bool(t.subtasks),
+        "has_subtasks": subtask_count > 0,
+        "subtask_count": subtask_count,
+        "completed_subtask_count": completed_subtasks,
     }
 
-def parse_time_from_text(text: str) -> Optional[dt_time]:
+# Column projection for GET /api/tasks: field -> (SQL expression, formatter).
+# Rows are selected as plain tuples, so only the requested columns are read and
+# no ORM objects are built. Output matches task_to_dict for the same fields.
+# Subtask columns are correlated subqueries on (user_id, parent_id), which the
+# ix_task_user_parent index answers directly.
+_iso = lambda v: v.isoformat()
+_SubtaskAlias = db.aliased(Task)
+_subtask_of_row = db.and_(_SubtaskAlias.user_id == Task.user_id, _SubtaskAlias.parent_id == Task.id)
+TASK_API_FIELDS = {
+    "id": (Task.id, None),
+    "name": (Task.name, None),
+    "completed": (Task.completed, None),
+    "due_date": (Task.due_date, lambda v: v.strftime("%Y-%m-%d")),
+    "task_time": (Task.task_time, lambda v: v.strftime("%H:%M:%S")),
+    "category": (Task.category, None),
+    "created_at": (Task.created_at, _iso),
+    "updated_at": (Task.updated_at, _iso),
+    "priority": (Task.priority, None),
+    "reminder_time": (Task.reminder_time, _iso),
+    "user_id": (Task.user_id, None),
+    "parent_id": (Task.parent_id, None),
+    "order_index": (Task.order_index, None),
+    "has_subtasks": (db.exists().where(_subtask_of_row), None),
+    "subtask_count": (
+        db.select(db.func.count(_SubtaskAlias.id)).where(_subtask_of_row).scalar_subquery(), None),
+    "completed_subtask_count": (
+        db.select(db.func.count(_SubtaskAlias.id))
+        .where(_subtask_of_row, _SubtaskAlias.completed == True).scalar_subquery(), None),
+}
+
+def task_rows_to_dicts(rows, fields: list) -> list:
+    """Format projected rows (mappings labelled by field name) like task_to_dict."""
+    out = []
+    for r in rows:
+        item = {}
+        for f in fields:
+            v = r[f]
+            fmt = TASK_API_FIELDS[f][1]
+            item[f] = fmt(v) if (fmt and v is not None) else v
+        out.append(item)
+    return out
+
+def parse_task_fields(raw: Optional[str]) -> list:
+    """Validate a comma-separated `fields=` value; all fields when empty."""
+    if not raw:
+        return list(TASK_API_FIELDS)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in TASK_API_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+    return fields
+
+def encode_task_cursor(created_at: Optional[datetime], task_id: int) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, task_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_task_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        created, task_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (datetime.fromisoformat(created) if created else None, int(task_id))
+    except Exception:
+        raise ValueError("invalid cursor")
+
+def encode_changes_cursor(changed_after: tuple, deleted_after: tuple) -> str:
+    """Opaque delta-sync cursor: last seen (updated_at, id) and (deleted_at, tombstone id)."""
+    raw = json.dumps([[v.isoformat() if isinstance(v, datetime) else v for v in changed_after],
+                      [v.isoformat() if isinstance(v, datetime) else v for v in deleted_after]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_changes_cursor(cursor: Optional[str]) -> Tuple[tuple, tuple]:
+    if not cursor:
+        return (None, 0), (None, 0)
+    try:
+        changed, deleted = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return ((datetime.fromisoformat(changed[0]) if changed[0] else None, int(changed[1])),
+                (datetime.fromisoformat(deleted[0]) if deleted[0] else None, int(deleted[1])))
+    except Exception:
+        raise ValueError("invalid cursor")
+
+def filter_tasks(query, args):
     """
-    Try to extract a time-of-day from the given text.
-    Supports patterns like:
-      - "at 5 pm", "at 5pm", "5pm"
-      - "at 17:30", "17:30"
-      - "at 7:15 a.m.", "7:15 am"
-    Returns a datetime.time or None.
-    Note: This is a relatively simple parser (regex-based) and not as robust
-    as dateutil/parsedatetime; it's designed to cover common voice phrases.
+    Apply the task-list filters shared by the web UI and GET /api/tasks:
+    q, status (incomplete|completed|overdue), category, priority,
+    due_from/due_to (YYYY-MM-DD) and parent_id (an id, or "none" for top level).
+    Works on both Task.query and select() statements. Raises ValueError on bad input.
     """
-    text = text.lower()
-    # Common patterns
-    # 1) hh:mm (24h or 12h)
-    m = re.search(r'(\b[01]?\d|2[0-3]):([0-5]\d)\b', text)
-    if m:
-        hh = int(m.group(1))
-        mm = int(m.group(2))
-        return dt_time(hour=hh, minute=mm)
-
-    # 2) hh am/pm (with optional "at")
-    m2 = re.search(r'\b(?:at\s*)?([1-9]|1[0-2])(?:[:.]\s*([0-5]\d))?\s*(am|pm|a\.m\.|p\.m\.)?\b', text)
-    if m2:
-        hour = int(m2.group(1))
-        minute = int(m2.group(2)) if m2.group(2) else 0
-        ampm = m2.group(3)
-        if ampm:
-            ampm = ampm.replace('.', '')
-            if 'p' in ampm:
-                if hour != 12:
-                    hour += 12
-            else:
-                if hour == 12:
-                    hour = 0
-        return dt_time(hour=hour % 24, minute=minute)
-
-    # 3) words like "noon", "midnight", "morning/evening" heuristics
-    if 'noon' in text:
-        return dt_time(hour=12, minute=0)
-    if 'midnight' in text:
-        return dt_time(hour=0, minute=0)
-    if 'morning' in text:
-        return dt_time(hour=9, minute=0)
-    if 'evening' in text or 'night' in text:
-        return dt_time(hour=19, minute=0)
+    q = (args.get("q") or "").strip()
+    if q:
+        query = apply_task_search(query, q)
+    status = (args.get("status") or "").strip()
+    if status == "incomplete":
+        query = query.filter(Task.completed == False)
+    elif status == "completed":
+        query = query.filter(Task.completed == True)
+    elif status == "overdue":
+        query = query.filter(Task.completed == False, Task.due_date != None, Task.due_date < date.today())
+    if args.get("category"):
+        query = query.filter(db.func.lower(Task.category) == args["category"].strip().lower())
+    if args.get("priority"):
+        query = query.filter(db.func.lower(Task.priority) == args["priority"].strip().lower())
+    if args.get("due_from"):
+        query = query.filter(Task.due_date >= datetime.strptime(args["due_from"], "%Y-%m-%d").date())
+    if args.get("due_to"):
+        query = query.filter(Task.due_date <= datetime.strptime(args["due_to"], "%Y-%m-%d").date())
+    parent = (args.get("parent_id") or "").strip().lower()
+    if parent in ("none", "null", "root"):
+        query = query.filter(Task.parent_id.is_(None))
+    elif parent:
+        query = query.filter(Task.parent_id == int(parent))
+    return query
+
+# Date/time extraction
+# One engine for due dates and times of day in free text (voice transcripts,
+# answers to "when is it due?", "what time?"). Patterns are compiled once and
+# month/weekday names come from lookup tables; each find_* returns the value
+# and the span it was read from, so callers can cut the phrase out of a title.
+class Found(NamedTuple):
+    value: Any
+    start: int
+    end: int
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+WEEKDAYS = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6}
+RELATIVE_DAYS = {"today": 0, "tonight": 0, "aaj": 0, "tomorrow": 1, "kal": 1,
+                 "day after tomorrow": 2, "parso": 2}
+# Times of day named by a word, and the words that put an hour in the afternoon/evening
+DAYPART_TIMES = {"noon": 12, "midday": 12, "midnight": 0, "morning": 9, "subah": 9,
+                 "afternoon": 15, "dopahar": 15, "evening": 19, "shaam": 19, "night": 19,
+                 "tonight": 19, "raat": 19}
+PM_DAYPARTS = {"afternoon", "dopahar", "evening", "shaam", "night", "tonight", "raat"}
+
+def _alternation(words) -> str:
+    return "|".join(re.escape(w).replace(r"\ ", r"\s+") for w in sorted(words, key=len, reverse=True))
+
+_MONTH_ALT = _alternation(MONTHS)
+# Every date phrase has a digit or one of these words in it; text without any skips the full scan.
+_DATE_HINT_RE = re.compile("|".join([*"0123456789", "day", "tomorrow", "tonight", "kal", "aaj", "parso"]))
+_DATE_RE = re.compile(rf"""
+    \b(?:
+        (?=\d)(?:
+          (?P<iy>\d{{4}})[-/](?P<im>\d{{1,2}})[-/](?P<id>\d{{1,2}})\b
+        | (?P<na>\d{{1,2}})[-/](?P<nb>\d{{1,2}})(?:[-/](?P<ny>\d{{4}}|\d{{2}}))?\b
+        | (?P<dd>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<dm>{_MONTH_ALT})\b\.?(?:,?\s+(?P<dy>\d{{4}})\b)?
+        )
+      | (?P<rel>{_alternation(RELATIVE_DAYS)})\b
+      | in\s+(?P<n>\d{{1,3}})\s+(?P<unit>days?|weeks?)\b
+      | (?:(?:next|this|coming)\s+)?(?P<wd>{_alternation(WEEKDAYS)})\b
+      | (?P<mm>{_MONTH_ALT})\.?\s+(?P<md>\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(?P<my>\d{{4}})\b)?
+    )""", re.X)
+# Last group of each phrase that is a date whatever the numbers ("feb 30" is not)
+_ALWAYS_DATE_GROUPS = {_DATE_RE.groupindex[g] for g in ("rel", "unit", "wd")}
+# An hour with optional minutes, am/pm and "baje"/"o'clock". A bare number
+# ("at 5") is only taken after "at"/"by"/"around"; _scan_time checks that.
+_TIME_RE = re.compile(r"(\d\d?)(?:[:.]([0-5]\d))?(?!\d)(?:\s*([ap])\.?\s?m\b\.?)?(\s*(?:baje|o'?\s?clock)\b)?")
+# Word patterns leave out the leading \b so the scan can skip ahead by first letter; _word_search checks it.
+_DAYPART_RE = re.compile(rf"(?:{_alternation(DAYPART_TIMES)})\b")
+# A preposition just before a date/time phrase belongs to its span.
+DATE_PREPOSITIONS = ("on", "by", "before", "until", "till", "due")
+TIME_PREPOSITIONS = ("at", "by", "around")
+_PM_DAYPART_RE = re.compile(rf"(?:{_alternation(PM_DAYPARTS)})\b")
+_AM_DAYPART_RE = re.compile(r"(?:morning|subah)\b")
+
+def _future_date(year: Optional[int], month: int, day: int, today: date) -> Optional[date]:
+    """date(year, month, day); without a year, the next such day from today on."""
+    try:
+        if year is not None:
+            return date(year + 2000 if year < 100 else year, month, day)
+        d = date(today.year, month, day)
+        return d if d >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
 
+def _date_from_match(m, today: date) -> Optional[date]:
+    iy, im, id_, na, nb, ny, dd, dm, dy, rel, n, unit, wd, mm, md, my = m.groups()
+    if iy:
+        return _future_date(int(iy), int(im), int(id_), today)
+    if na:
+        a, b = int(na), int(nb)
+        # Same reading as the strptime parsers this replaced: day first with a
+        # four-digit year (05/09/2026 is 5 Sep), otherwise month first (5/9 is
+        # 9 May). The other order is used only when the first is not a date (25/12).
+        if ny and len(ny) == 4:
+            return _future_date(int(ny), b, a, today) or _future_date(int(ny), a, b, today)
+        year = int(ny) if ny else None
+        return _future_date(year, a, b, today) or _future_date(year, b, a, today)
+    if dd:
+        return _future_date(int(dy) if dy else None, MONTHS[dm], int(dd), today)
+    if rel:
+        return today + timedelta(days=RELATIVE_DAYS[rel if rel in RELATIVE_DAYS else " ".join(rel.split())])
+    if n:
+        return today + timedelta(days=int(n) * 7 if unit.startswith("week") else int(n))
+    if wd:
+        ahead = (WEEKDAYS[wd] - today.weekday()) % 7
+        return today + timedelta(days=ahead or 7)
+    return _future_date(int(my) if my else None, MONTHS[mm], int(md), today)
+
+def _word_search(pattern, text: str):
+    """pattern.search(text), but only for a match that starts a word."""
+    m = pattern.search(text)
+    while m and m.start() and text[m.start() - 1].isalnum():
+        m = pattern.search(text, m.start() + 1)
+    return m
+
+def _span_start(prepositions, text: str, start: int) -> int:
+    """start moved back over a preposition directly before it ("at 5"), if there is one."""
+    before = text[:start].rstrip()
+    if len(before) < start and before.endswith(prepositions):
+        word = before.rsplit(None, 1)[-1]
+        if word in prepositions:
+            return len(before) - len(word)
+    return start
+
+def _scan_date(text: str, today: Optional[date], span_only: bool = False):
+    """
+    (value, start, end) of the first due date in text, or None; see find_date.
+    span_only is for callers that just cut the phrase out: phrases that always
+    name a day ("kal", "next monday") get value True instead of a date.
+    """
+    hint = _DATE_HINT_RE.search(text)
+    if hint is None:
+        return None
+    # A phrase starts at most one word before its first digit or day word ("next monday", "sep 5").
+    pos = text.rfind(" ", 0, hint.start())
+    pos = text.rfind(" ", 0, len(text[:pos].rstrip())) + 1 if pos > 0 else 0
+    m = _DATE_RE.search(text, pos)
+    while m:
+        if span_only and m.lastindex in _ALWAYS_DATE_GROUPS:
+            value = True
+        else:
+            today = today or date.today()
+            value = _date_from_match(m, today)
+        if value is not None:
+            return value, _span_start(DATE_PREPOSITIONS, text, m.start()), m.end()
+        m = _DATE_RE.search(text, m.end())
+    return None
+
+def find_date(text: str, today: Optional[date] = None) -> Optional[Found]:
+    """The first due-date phrase in text (lowercase) with its span, or None."""
+    hit = _scan_date(text, today)
+    return Found(*hit) if hit else None
+
+def _clock(hour: int, minute: int, meridiem: Optional[str], text: str) -> Optional[dt_time]:
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    elif hour < 12 and text and _word_search(_PM_DAYPART_RE, text) and not _word_search(_AM_DAYPART_RE, text):
+        hour += 12  # "5 baje shaam", "7:30 in the evening"
+    return dt_time(hour, minute) if hour <= 23 else None
+
+def _scan_time(text: str, bare_hour: bool, dayparts: bool):
+    """(value, start, end) of the first time of day in text, or None; see find_time."""
+    m = _TIME_RE.search(text)
+    while m:
+        hour, minute, meridiem, word = m.groups()
+        start, end = m.span()
+        # Only the rest of the text can name a daypart; an answer like "7:30" has none.
+        context = text if start or end < len(text) else ""
+        if start and text[start - 1].isdigit():
+            pass
+        elif minute or meridiem or word:
+            value = _clock(int(hour), int(minute or 0), meridiem, context)
+            if value is not None:
+                return value, _span_start(TIME_PREPOSITIONS, text, start) if start else 0, end
+        # A bare number counts when it is the whole answer to "what time?", or
+        # after at/by/around and not part of a longer token ("5th", "5/9").
+        elif bare_hour and not context:
+            value = _clock(int(hour), 0, None, context)
+            if value is not None:
+                return value, start, end
+        else:
+            nxt = text[end:end + 1]
+            if not (nxt.isalnum() or (nxt in ("-", "/", ":", ".") and text[end + 1:end + 2].isdigit())):
+                prep_start = _span_start(TIME_PREPOSITIONS, text, start)
+                if prep_start < start:
+                    value = _clock(int(hour), 0, None, context)
+                    if value is not None:
+                        return value, prep_start, end
+        m = _TIME_RE.search(text, end)
+    if dayparts:
+        m = _word_search(_DAYPART_RE, text)
+        if m:
+            return dt_time(DAYPART_TIMES[m.group()], 0), m.start(), m.end()
     return None
 
-def parse_due_date_from_text(text: str) -> Optional[date]:
+def find_time(text: str, bare_hour: bool = False, dayparts: bool = True) -> Optional[Found]:
     """
-    Parse simple date references:
-      - "today", "tomorrow"
-      - "on YYYY-MM-DD" (explicit)
-      - "on July 20" is not robustly parsed here (would require dateparser)
-    This keeps the parser small and deterministic.
+    The first time-of-day phrase in text (lowercase) with its span, or None.
+    bare_hour also accepts a lone number ("5", "17"), for answers to "what time?";
+    dayparts=False skips words like "noon" or "evening" that name a time.
     """
-    text = text.lower()
-    if 'today' in text:
-        return date.today()
-    if 'tomorrow' in text:
-        return date.today() + timedelta(days=1)
-
-    # ISO date like 2025-08-28 or 2025/08/28
-    m = re.search(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', text)
-    if m:
-        try:
-            y = int(m.group(1)); mo = int(m.group(2)); d = int(m.group(3))
-            return date(y, mo, d)
-        except Exception:
-            return None
+    hit = _scan_time(text, bare_hour, dayparts)
+    return Found(*hit) if hit else None
 
-    # Friendly fallback: try month-day like "july 20" (limited)
-    m2 = re.search(r'([a-zA-Z]+)\s+([0-3]?\d)', text)
-    if m2:
-        # Map month name -> month number
-        try:
-            mon_name = m2.group(1)
-            day = int(m2.group(2))
-            mon = datetime.strptime(mon_name, '%B').month
-            year = date.today().year
-            # If date already passed this year, assume next year
-            dt_candidate = date(year, mon, day)
-            if dt_candidate < date.today():
-                dt_candidate = date(year+1, mon, day)
-            return dt_candidate
-        except Exception:
-            try:
-                mon = datetime.strptime(mon_name, '%b').month
-                day = int(m2.group(2))
-                year = date.today().year
-                dt_candidate = date(year, mon, day)
-                if dt_candidate < date.today():
-                    dt_candidate = date(year+1, mon, day)
-                return dt_candidate
-            except Exception:
-                return None
+def parse_due_date(text: str) -> Optional[date]:
+    """
+    A due date from an answer like 'tomorrow', 'in 3 days', 'next monday', '2025-09-05', '5/9', 'Sep 5'.
+    Numeric dates are month first ('5/9' is 9 May) unless they carry a four-digit year ('05/09/2026' is 5 Sep).
+    """
+    if not text:
+        return None
+    hit = _scan_date(text.lower(), None)
+    return hit[0] if hit else None
 
-    return None
+def parse_task_time(text: str) -> Optional[dt_time]:
+    """A time of day from an answer like '5 pm', '17:30', '7:00 a.m.', 'noon', '5'."""
+    if not text:
+        return None
+    hit = _scan_time(text.lower().strip(), True, True)
+    return hit[0] if hit else None
 
 def normalize_task_name(s: str) -> str:
     """Cleanup task name text (strip, collapse spaces)."""
@@ -649,18 +2029,18 @@ def create_goal_with_subtasks(uid: int, goal_text: str, final_due: Optional[date
         created.append(st)
 
     db.session.commit()  # move commit here (after loop)
+    stats = subtask_stats(uid, [parent.id] + [c.id for c in created])
     return {
         "parent_id": parent.id,
         "count": len(created),
-        "children": [task_to_dict(c) for c in created],
-        "parent": task_to_dict(parent),
+        "children": [task_to_dict(c, stats) for c in created],
+        "parent": task_to_dict(parent, stats),
     }
 
 @app.route("/api/tasks/decompose", methods=["POST"])
+@login_required
 def api_decompose_goal():
-    uid = session.get("user_id")
-    if not uid:
-        return jsonify({"error": "Unauthorized"}), 401
+    uid = g.user.id
 
     data = request.get_json(silent=True) or {}
     goal_text = (data.get("goal") or "").strip()
@@ -717,24 +2097,169 @@ def api_decompose_goal():
         })
     return jsonify({"created": False, "goal": goal_text, "subtasks": out})
 
+# Static assets
+# static_url() links to /assets/<name>.<hash>.<ext>, where hash is a digest of
+# the file's content, so those URLs can be cached for a year and change
+# whenever the file does.
+ASSET_MAX_AGE = 365 * 24 * 3600
+_HASHED_ASSET_RE = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<ext>\.[^./]+)$")
+_asset_digests: Dict[str, Tuple[float, str]] = {}
+
+def asset_digest(filename: str) -> Optional[str]:
+    """Content digest of a file under static/, recomputed when its mtime changes."""
+    path = safe_join(app.static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path) if path else None
+    except OSError:
+        mtime = None
+    if mtime is None:
+        return None
+    cached = _asset_digests.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()[:12]
+    _asset_digests[filename] = (mtime, digest)
+    return digest
+
+@app.template_global()
+def static_url(filename: str) -> str:
+    """url_for('static', ...) with the content hash in the file name."""
+    digest = asset_digest(filename)
+    if digest is None:
+        return url_for("static", filename=filename)
+    stem, ext = os.path.splitext(filename)
+    return url_for("hashed_static", filename=f"{stem}.{digest}{ext}")
+
+@app.route("/assets/<path:filename>")
+def hashed_static(filename):
+    m = _HASHED_ASSET_RE.match(filename)
+    if not m:
+        abort(404)
+    real = m.group("stem") + m.group("ext")
+    current = asset_digest(real)
+    if current is None:
+        abort(404)
+    if current != m.group("digest"):
+        # A page rendered before the file changed: point it at the current version.
+        return redirect(static_url(real))
+    response = send_from_directory(app.static_folder, real, max_age=ASSET_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
+
 # Web UI Routes (Flask)
+DYNAMIC_MIMETYPES = ("text/html", "application/json", "application/x-ndjson", "text/csv")
+
 @app.after_request
 def add_no_cache_headers(response):
     """
-    Prevent caching so the browser always shows latest DB state.
-    You had this in your original code; it's preserved.
+    Dynamic pages and API responses always show the latest DB state. Static
+    files keep their own caching, and views that set Cache-Control themselves
+    are left alone.
     """
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+    if response.mimetype in DYNAMIC_MIMETYPES and 'Cache-Control' not in response.headers:
+        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '0'
+    return response
+
+# Response compression
+# Text responses are gzip- or brotli-encoded when the client accepts it.
+# Streamed bodies (export, SSE) are compressed chunk by chunk with a sync
+# flush after each one, so every row/event still reaches the client as soon
+# as it is produced. Static files are left alone: send_file streams them from
+# disk and hashed assets are cached by the browser for a year anyway.
+try:
+    import brotli  # optional dependency
+except ImportError:
+    brotli = None
+
+COMPRESS_MIMETYPES = DYNAMIC_MIMETYPES + ("text/event-stream", "text/plain")
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._z.compress(data) + self._z.flush()
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        self._b = brotli.Compressor(quality=level)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._b.process(data) + self._b.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._b.process(data) + self._b.finish()
+
+def make_compressor(encoding: str):
+    if encoding == "br":
+        return _BrotliCompressor(app.config['COMPRESS_BR_LEVEL'])
+    return _GzipCompressor(app.config['COMPRESS_LEVEL'])
+
+def negotiate_encoding() -> Optional[str]:
+    """The best encoding from Accept-Encoding we can produce, or None."""
+    offers = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offers)
+
+def _compressed_stream(chunks, compressor):
+    try:
+        for data in chunks:
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            if data:
+                yield compressor.chunk(data)
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+@app.after_request
+def compress_response(response):
+    if response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or "Content-Encoding" in response.headers
+            or request.method == "HEAD"):
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = _compressed_stream(response.response, make_compressor(encoding))
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        body = make_compressor(encoding).finish(data)
+        if len(body) >= len(data):
+            return response
+        response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The encoded body is a different byte sequence than the identity one.
+        response.set_etag(etag, weak=True)
     return response
 
 
 @app.route("/", methods=["GET", "POST"])
+@replica_reads
 def index():
-    user_id = session.get("user_id")
-    user = db.session.get(User, user_id) if user_id else None
+    user = g.user
+    user_id = user.id if user else None
     show_onboarding = not user.onboarding_done if user else True
+    etag = index_etag(user) if (user and request.method == "GET") else None
+    if etag:
+        cached = not_modified(etag)
+        if cached:
+            return cached
     form = TaskForm()
     
     if form.validate_on_submit():
@@ -761,71 +2286,37 @@ def index():
         flash("Task added!", "success")
         return redirect(url_for("index"))
 
-    q = request.args.get("q", "").strip()
-    status = request.args.get("status", "").strip()
-    query = Task.query.filter_by(user_id=user_id)
-    if q:
-        query = query.filter(Task.name.contains(q))
-    if status == "incomplete":
-        query = query.filter(Task.completed == False)
-    elif status == "completed":
-        query = query.filter(Task.completed == True)
-    elif status == "overdue":
-        query = query.filter(Task.completed == False, Task.due_date != None, Task.due_date < date.today())
-
-    tasks_filtered = query.order_by(Task.created_at.desc()).all()
-    incomplete_tasks = [t for t in tasks_filtered if not t.completed]
-    completed_tasks = [t for t in tasks_filtered if t.completed]
-
- # Build parent -> subtasks mapping for hierarchical UI
-    parents = [t for t in tasks_filtered if t.parent_id is None]
-    children_map: Dict[int, list[Task]] = {}
-    for t in tasks_filtered:
-        if t.parent_id:
-            children_map.setdefault(t.parent_id, []).append(t)
-
-# Sort subtasks: incomplete first, then order_index, then date/time, then id
-    for pid, lst in children_map.items():
-        lst.sort(key=lambda x: (
-            x.completed,  # False first
-            x.order_index if x.order_index is not None else 9999,
-            x.due_date or date.max,
-            x.task_time or dt_time(23, 59),
-            x.id
-        ))
-
-    parents_incomplete = [p for p in parents if not p.completed]
-    parents_completed  = [p for p in parents if p.completed]
-
-    return render_template(
+    filter_key = request.query_string.decode()
+    try:
+        query = filter_tasks(Task.query.filter_by(user_id=user_id), request.args)
+    except ValueError:
+        flash("Invalid filter.", "warning")
+        etag = None
+        filter_key = ""
+        query = Task.query.filter_by(user_id=user_id)
+
+    page = render_template(
         "index.html",
         form=form,
-        tasks=tasks_filtered,
         show_onboarding=show_onboarding,
-        incomplete_tasks=incomplete_tasks,
-        completed_tasks=completed_tasks,
-        parents_incomplete=parents_incomplete,
-        parents_completed=parents_completed,
-        children_map=children_map,
+        task_cards=render_task_cards(user_id, query, filter_key),
         current_date=date.today()
     )
+    return with_etag(make_response(page), etag) if etag else page
 
 # API to mark onboarding as done
 @app.route("/api/onboarding_done", methods=["POST"])
+@login_required
 def api_onboarding_done():
-    uid = session.get("user_id")
-    if not uid:
-        return jsonify({"error": "Unauthorized"}), 401
-    user = db.session.get(User, uid)
-    if user:
-        user.onboarding_done = True
-        db.session.commit()
+    db.session.execute(update(User).where(User.id == g.user.id).values(onboarding_done=True))
+    db.session.commit()
+    forget_identity(g.user.id)
     return jsonify({"ok": True})
 
 @app.route("/edit/<int:task_id>", methods=["GET", "POST"])
+@login_required
 def edit_task(task_id):
-    if "user_id" not in session: return redirect(url_for("login"))
-    task = Task.query.filter_by(id=task_id, user_id=session["user_id"]).first_or_404()
+    task = Task.query.filter_by(id=task_id, user_id=g.user.id).first_or_404()
     """
     Edit an existing task via web form; pre-populates fields.
     """
@@ -836,6 +2327,7 @@ def edit_task(task_id):
         task.task_time = form.task_time.data
         task.category = form.category.data
         task.priority = classify_priority(form.task.data)
+        task.reminder_time = datetime.combine(task.due_date, task.task_time) if (task.due_date and task.task_time) else None
         db.session.commit()
         flash("Task updated!", "success")
         return redirect(url_for("index"))
@@ -848,15 +2340,14 @@ def edit_task(task_id):
     return render_template("edit_task.html", form=form, task=task)
 
 @app.route("/delete/<int:task_id>", methods=["POST"])
+@login_required
 def delete_task(task_id):
-    if "user_id" not in session:
-        return redirect(url_for("login"))
-    uid = session["user_id"]
+    uid = g.user.id
 
     task = Task.query.filter_by(id=task_id, user_id=uid).first_or_404()
 
     if task.parent_id is None:
-        Task.query.filter_by(user_id=uid, parent_id=task.id).delete(synchronize_session=False)
+        delete_tasks_where(Task.user_id == uid, Task.parent_id == task.id)
 
     db.session.delete(task)
     db.session.commit()
@@ -864,10 +2355,9 @@ def delete_task(task_id):
     return redirect(url_for("index"))
 
 @app.route("/complete/<int:task_id>", methods=["POST"])
+@login_required
 def complete_task(task_id):
-    if "user_id" not in session:
-        return redirect(url_for("login"))
-    uid = session["user_id"]
+    uid = g.user.id
     task = Task.query.filter_by(id=task_id, user_id=uid).first_or_404()
     # Mark parent and all its subtasks complete
     task.completed = True
@@ -880,20 +2370,672 @@ def complete_task(task_id):
     flash("Task marked as completed!", "success")
     return redirect(url_for("index"))
 
+# Conditional GET
+# Task listings carry a strong ETag built from the user's task_version and
+# whatever else shapes the response. It is checked before any task query or
+# template render, and such responses use no-cache (revalidate) instead of
+# no-store so browsers keep them and send If-None-Match.
+def task_version(uid: int) -> int:
+    """The user's task_version, read at most once per request."""
+    versions = g.setdefault("task_versions", {})
+    if uid not in versions:
+        versions[uid] = db.session.query(User.task_version).filter(User.id == uid).scalar() or 0
+    return versions[uid]
+
+def task_etag(uid: int, *parts) -> str:
+    raw = "\x1f".join(str(p) for p in (uid, task_version(uid), *parts))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def not_modified(etag: str) -> Optional[Response]:
+    """A 304 for etag if the request already has it, else None."""
+    # Weak comparison: compress_response() weakens the ETag of encoded bodies.
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(Response(status=304), etag)
+    return None
+
+def with_etag(response, etag: str):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def page_build_id() -> str:
+    """Changes whenever a template or page asset on disk changes."""
+    if "page_build_id" in g:
+        return g.page_build_id
+    stamps = []
+    for folder in (app.template_folder, os.path.join("static", "css"), os.path.join("static", "js")):
+        root = os.path.join(app.root_path, folder)
+        for name in sorted(os.listdir(root)) if os.path.isdir(root) else ():
+            st = os.stat(os.path.join(root, name))
+            stamps.append(f"{folder}/{name}:{st.st_mtime_ns}:{st.st_size}")
+    g.page_build_id = hashlib.sha1("|".join(stamps).encode()).hexdigest()
+    return g.page_build_id
+
+def index_etag(user: "Identity") -> Optional[str]:
+    """
+    ETag for the task page, or None when it must be rendered: flashed messages
+    are pending, or the session has no CSRF token yet. The embedded CSRF tokens
+    expire, so the tag also turns over every half WTF_CSRF_TIME_LIMIT.
+    """
+    if "_flashes" in session or not session.get("csrf_token"):
+        return None
+    limit = app.config.get("WTF_CSRF_TIME_LIMIT", 3600) or 0
+    csrf_bucket = int(time_mod.time() // (limit / 2)) if limit else 0
+    return task_etag(user.id, page_build_id(), date.today(), user.username, user.onboarding_done,
+                     request.query_string.decode(), session["csrf_token"], csrf_bucket)
+
+# Fragment cache
+# The task cards on the index page are rendered once per (user, task_version,
+# build, day, filter) and kept in a process-wide LRU bounded by total size.
+# Keys carry the version, so a stale entry can never be served; writes also
+# drop the user's entries right away to free the memory. The cached HTML has
+# a placeholder where the CSRF token goes, filled in per request.
+CSRF_PLACEHOLDER = f"__csrf_{secrets.token_hex(8)}__"
+
+class FragmentCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[tuple, Tuple[int, str]]" = OrderedDict()
+        self._by_user: Dict[int, set] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            self._data.move_to_end(key)
+            return hit[1]
+
+    def set(self, key: tuple, html: str) -> None:
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._data[key] = (size, html)
+            self._by_user.setdefault(key[0], set()).add(key)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._discard(next(iter(self._data)))
+
+    def forget_users(self, user_ids) -> None:
+        with self._lock:
+            for uid in user_ids:
+                for key in list(self._by_user.get(uid, ())):
+                    self._discard(key)
+
+    def _discard(self, key: tuple) -> None:
+        hit = self._data.pop(key, None)
+        if hit is None:
+            return
+        self._size -= hit[0]
+        keys = self._by_user[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._by_user[key[0]]
+
+task_fragments = FragmentCache(app.config['FRAGMENT_CACHE_MAX_BYTES'])
+
+def render_task_cards(uid: Optional[int], query, filter_key: str) -> Markup:
+    """The parent/subtask cards for query, from the fragment cache when possible."""
+    key = (uid, task_version(uid), page_build_id(), date.today(), filter_key) if uid else None
+    html = task_fragments.get(key) if key else None
+    if html is None:
+        tasks = query.order_by(Task.created_at.desc()).all()
+        parents = [t for t in tasks if t.parent_id is None]
+        children_map: Dict[int, list] = {}
+        for t in tasks:
+            if t.parent_id:
+                children_map.setdefault(t.parent_id, []).append(t)
+        # Subtasks: incomplete first, then order_index, then date/time, then id
+        for lst in children_map.values():
+            lst.sort(key=lambda x: (
+                x.completed,
+                x.order_index if x.order_index is not None else 9999,
+                x.due_date or date.max,
+                x.task_time or dt_time(23, 59),
+                x.id
+            ))
+        html = render_template(
+            "_task_cards.html",
+            parents_incomplete=[p for p in parents if not p.completed],
+            parents_completed=[p for p in parents if p.completed],
+            children_map=children_map,
+            csrf_placeholder=CSRF_PLACEHOLDER,
+        )
+        if key:
+            task_fragments.set(key, html)
+    return Markup(html.replace(CSRF_PLACEHOLDER, generate_csrf()))
+
 # API endpoints for AJAX or external access
 @app.route("/api/tasks", methods=["GET"])
+@replica_reads
+@login_required
 def api_get_tasks():
-    uid = session.get("user_id")
-    if not uid:
-        return jsonify({"error": "Unauthorized"}), 401
-    tasks_q = Task.query.filter_by(user_id=uid).order_by(Task.created_at.desc()).all()
-    return jsonify([task_to_dict(t) for t in tasks_q])
+    """
+    One page of the user's tasks, newest first, as a JSON array.
+    Query params: the filter_tasks() filters, fields=a,b,c, limit=N and
+    cursor=<X-Next-Cursor of the previous page>. When more rows exist the
+    response carries X-Next-Cursor and a Link rel="next" header.
+    """
+    uid = g.user.id
+    args = request.args
+    try:
+        fields = parse_task_fields(args.get("fields"))
+        limit = int(args.get("limit") or app.config['API_TASKS_PAGE_SIZE'])
+        limit = max(1, min(limit, app.config['API_TASKS_MAX_PAGE_SIZE']))
+        cols = [TASK_API_FIELDS[f][0].label(f) for f in fields]
+        stmt = db.select(*cols, Task.created_at.label("_cursor_created"), Task.id.label("_cursor_id")) \
+            .where(Task.user_id == uid)
+        stmt = filter_tasks(stmt, args)
+        if args.get("cursor"):
+            c_created, c_id = decode_task_cursor(args["cursor"])
+            stmt = stmt.where(db.or_(Task.created_at < c_created,
+                                     db.and_(Task.created_at == c_created, Task.id < c_id)))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+
+    # Results of relative filters (status=overdue) move with the date.
+    etag = task_etag(uid, date.today(), request.query_string.decode())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    stmt = stmt.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+    rows = db.session.execute(stmt).mappings().all()
+    page = rows[:limit]
+    resp = with_etag(jsonify(task_rows_to_dicts(page, fields)), etag)
+    if len(rows) > limit:
+        last = page[-1]
+        nxt = encode_task_cursor(last["_cursor_created"], last["_cursor_id"])
+        resp.headers["X-Next-Cursor"] = nxt
+        resp.headers["Link"] = f'<{url_for("api_get_tasks", **{**args.to_dict(), "cursor": nxt})}>; rel="next"'
+    return resp
+
+def _settled_cursor(last: Optional[tuple], current: tuple, settled: datetime) -> Tuple[tuple, bool]:
+    """
+    Next (timestamp, id) position for one half of a delta-sync cursor, and
+    whether it was held back. A page that reaches into the settle window
+    stops the cursor at the window's start: a row stamped earlier may still
+    be committing there, so the rows after it are sent again on the next
+    poll and clients de-duplicate them by id.
+    """
+    if last is not None and last[0] is not None and last[0] < settled:
+        return last, False
+    if current[0] is None or current[0] < settled:
+        current = (settled, 0)
+    return current, last is not None
+
+@app.route("/api/tasks/changes", methods=["GET"])
+@login_required
+def api_task_changes():
+    """
+    Delta sync: tasks created/updated and ids deleted since `since`.
+    Omit `since` for a full snapshot, then pass back `next_cursor` on every
+    poll; keep polling while `has_more` is true. Accepts fields= and limit=
+    like GET /api/tasks. A cursor older than the tombstone retention window
+    gets 410 and the client must resync from scratch.
+    """
+    uid = g.user.id
+    args = request.args
+    cutoff = datetime.utcnow() - timedelta(days=app.config['TOMBSTONE_RETENTION_DAYS'])
+    try:
+        fields = parse_task_fields(args.get("fields"))
+        limit = int(args.get("limit") or app.config['API_TASKS_PAGE_SIZE'])
+        limit = max(1, min(limit, app.config['API_TASKS_MAX_PAGE_SIZE']))
+        changed_after, deleted_after = decode_changes_cursor(args.get("since"))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    if args.get("since") and deleted_after[0] is not None and deleted_after[0] < cutoff:
+        return jsonify({"error": "Cursor expired; resync without since"}), 410
+
+    # The day is part of the tag so an idle client still gets a fresh
+    # next_cursor daily instead of drifting towards the 410 above.
+    etag = task_etag(uid, date.today(), request.query_string.decode())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+
+    cols = [TASK_API_FIELDS[f][0].label(f) for f in fields]
+    stmt = db.select(*cols, Task.updated_at.label("_cursor_updated"), Task.id.label("_cursor_id")) \
+        .where(Task.user_id == uid)
+    if changed_after[0] is not None:
+        stmt = stmt.where(db.or_(Task.updated_at > changed_after[0],
+                                 db.and_(Task.updated_at == changed_after[0], Task.id > changed_after[1])))
+    stmt = stmt.order_by(Task.updated_at.asc(), Task.id.asc()).limit(limit + 1)
+    rows = db.session.execute(stmt).mappings().all()
+
+    # A snapshot (no since) has nothing to delete on the client side.
+    tombs = []
+    if deleted_after[0] is not None:
+        tombs = TaskTombstone.query.filter(
+            TaskTombstone.user_id == uid,
+            db.or_(TaskTombstone.deleted_at > deleted_after[0],
+                   db.and_(TaskTombstone.deleted_at == deleted_after[0], TaskTombstone.id > deleted_after[1]))
+        ).order_by(TaskTombstone.deleted_at.asc(), TaskTombstone.id.asc()).limit(limit + 1).all()
+
+    page, tomb_page = rows[:limit], tombs[:limit]
+    # An empty half still moves forward to the settle window, so only clients
+    # that stay away longer than the retention window expire. Rows past a
+    # held-back cursor come once they settle, so has_more ignores them.
+    settled = datetime.utcnow() - timedelta(seconds=app.config['CHANGES_SETTLE_SECONDS'])
+    changed_after, changed_held = _settled_cursor(
+        (page[-1]["_cursor_updated"], page[-1]["_cursor_id"]) if page else None, changed_after, settled)
+    deleted_after, deleted_held = _settled_cursor(
+        (tomb_page[-1].deleted_at, tomb_page[-1].id) if tomb_page else None, deleted_after, settled)
+    return with_etag(jsonify({
+        "changed": task_rows_to_dicts(page, fields),
+        "deleted": [t.task_id for t in tomb_page],
+        "next_cursor": encode_changes_cursor(changed_after, deleted_after),
+        "has_more": (len(rows) > limit and not changed_held) or (len(tombs) > limit and not deleted_held),
+    }), etag)
+
+# Streaming export
+# Rows come from a server-side cursor in EXPORT_BATCH_SIZE partitions and are
+# written straight to the response, so memory use does not depend on how many
+# tasks a user has.
+EXPORT_TASK_FIELDS = [f for f in TASK_API_FIELDS
+                      if f not in ("has_subtasks", "subtask_count", "completed_subtask_count")]
+EXPORT_EMOTION_FIELDS = ["id", "emotion", "score", "created_at"]
+
+def _stream_partitions(stmt):
+    result = db.session.execute(stmt.execution_options(yield_per=app.config['EXPORT_BATCH_SIZE']))
+    for part in result.mappings().partitions():
+        yield part
+
+def _export_task_batches(uid: int, subtasks: str):
+    cols = [TASK_API_FIELDS[f][0].label(f) for f in EXPORT_TASK_FIELDS]
+    stmt = db.select(*cols).where(Task.user_id == uid)
+    if subtasks == "none":
+        stmt = stmt.where(Task.parent_id.is_(None)).order_by(Task.id)
+    elif subtasks == "nested":
+        # Each top-level task directly followed by its subtasks.
+        stmt = stmt.order_by(db.func.coalesce(Task.parent_id, Task.id), Task.parent_id.isnot(None),
+                             Task.order_index, Task.id)
+    else:
+        stmt = stmt.order_by(Task.id)
+    for part in _stream_partitions(stmt):
+        yield task_rows_to_dicts(part, EXPORT_TASK_FIELDS)
+
+def _export_emotion_batches(uid: int):
+    stmt = db.select(EmotionEvent.id, EmotionEvent.emotion, EmotionEvent.score, EmotionEvent.created_at) \
+        .where(EmotionEvent.user_id == uid).order_by(EmotionEvent.id)
+    for part in _stream_partitions(stmt):
+        yield [{**r, "created_at": r["created_at"].isoformat() if r["created_at"] else None} for r in part]
+
+def _ndjson_export(uid: int, dataset: str, subtasks: str):
+    tag = dataset == "all"
+    if dataset in ("tasks", "all"):
+        group = None
+        for batch in _export_task_batches(uid, subtasks):
+            lines = []
+            for d in batch:
+                if tag:
+                    d = {"type": "task", **d}
+                if subtasks != "nested":
+                    lines.append(json.dumps(d))
+                elif group is not None and d["parent_id"] == group["id"]:
+                    group["subtasks"].append(d)
+                else:
+                    if group is not None:
+                        lines.append(json.dumps(group))
+                    group = {**d, "subtasks": []} if d["parent_id"] is None else None
+                    if group is None:
+                        lines.append(json.dumps(d))  # orphaned subtask
+            if lines:
+                yield "\n".join(lines) + "\n"
+        if group is not None:
+            yield json.dumps(group) + "\n"
+    if dataset in ("emotions", "all"):
+        for batch in _export_emotion_batches(uid):
+            yield "".join(json.dumps({"type": "emotion", **d} if tag else d) + "\n" for d in batch)
+
+def _csv_export(uid: int, dataset: str, subtasks: str):
+    fields = EXPORT_EMOTION_FIELDS if dataset == "emotions" else EXPORT_TASK_FIELDS
+    batches = _export_emotion_batches(uid) if dataset == "emotions" else _export_task_batches(uid, subtasks)
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields)
+    writer.writeheader()
+    yield buf.getvalue()
+    for batch in batches:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(batch)
+        yield buf.getvalue()
+
+@app.route("/api/tasks/export", methods=["GET"])
+@replica_reads
+@login_required
+def api_export_tasks():
+    """
+    Stream the user's data. format=ndjson|csv; dataset=tasks|emotions|all
+    (all is NDJSON only, each line tagged with "type"); subtasks=flat|nested|none
+    (nested is NDJSON only: subtasks are embedded in their parent's line).
+    """
+    uid = g.user.id
+    fmt = (request.args.get("format") or "ndjson").lower()
+    dataset = (request.args.get("dataset") or "tasks").lower()
+    subtasks = (request.args.get("subtasks") or "flat").lower()
+    if fmt not in ("ndjson", "csv") or dataset not in ("tasks", "emotions", "all") \
+            or subtasks not in ("flat", "nested", "none"):
+        return jsonify({"error": "Invalid format, dataset or subtasks option"}), 400
+    if fmt == "csv" and (dataset == "all" or subtasks == "nested"):
+        return jsonify({"error": "dataset=all and subtasks=nested need format=ndjson"}), 400
+
+    if fmt == "csv":
+        body, mimetype = _csv_export(uid, dataset, subtasks), "text/csv"
+    else:
+        body, mimetype = _ndjson_export(uid, dataset, subtasks), "application/x-ndjson"
+    filename = f"daysavvy-{dataset}-{date.today().isoformat()}.{fmt}"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+# Bulk import
+# Source records are parsed lazily from the upload, normalized and inserted
+# TASK_IMPORT_CHUNK at a time, one transaction per chunk (the TaskImport
+# progress row is updated in the same transaction).
+IMPORT_FORMATS = ("csv", "ndjson", "ics")
+TASK_PRIORITIES = ("Urgent", "High", "Normal", "Low")
+
+def guess_import_format(filename: str) -> Optional[str]:
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson", "ics": "ics", "ical": "ics"}.get(ext)
+
+def _ical_unescape(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+def _iter_ical_records(lines):
+    """Yield one record per VTODO/VEVENT, unfolding continuation lines as it goes."""
+    current, logical = None, None
+
+    def handle(line):
+        nonlocal current
+        name, _, value = line.partition(":")
+        name, _, params = name.partition(";")
+        name = name.upper()
+        if name == "BEGIN" and value.strip().upper() in ("VTODO", "VEVENT"):
+            current = {}
+        elif name == "END" and value.strip().upper() in ("VTODO", "VEVENT"):
+            rec, current = current, None
+            return rec
+        elif current is not None:
+            if name == "SUMMARY":
+                current["name"] = _ical_unescape(value)
+            elif name in ("DUE", "DTSTART") and not (name == "DTSTART" and "due" in current):
+                # 20261017, 20261017T100000 or 20261017T100000Z (kept as wall-clock time)
+                m = re.match(r"(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2})(\d{2})?)?", value.strip())
+                if m:
+                    current["due_date"] = f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+                    current["task_time"] = f"{m.group(4)}:{m.group(5)}" if m.group(4) else None
+                    current["due"] = name == "DUE"
+            elif name == "STATUS":
+                current["completed"] = value.strip().upper() == "COMPLETED"
+            elif name == "COMPLETED":
+                current["completed"] = True
+            elif name == "CATEGORIES":
+                current["category"] = _ical_unescape(value.split(",")[0])
+        return None
+
+    for raw in lines:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and logical is not None:
+            logical += raw[1:]
+            continue
+        if logical is not None:
+            rec = handle(logical)
+            if rec is not None:
+                yield rec
+        logical = raw
+    if logical is not None:
+        rec = handle(logical)
+        if rec is not None:
+            yield rec
+
+def iter_import_records(stream, fmt: str):
+    """
+    Yield source records (dicts, or None for unparseable ones) from a binary
+    stream without reading it all into memory.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for row in csv.DictReader(text):
+            yield {(k or "").strip().lower(): v for k, v in row.items()}
+    elif fmt == "ndjson":
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                rec = None
+            yield rec if isinstance(rec, dict) else None
+    else:
+        yield from _iter_ical_records(text)
+
+def _import_flag(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y", "x", "done", "completed")
+    return bool(value)
+
+def _import_row(uid: int, rec) -> Optional[dict]:
+    """Map a source record onto Task columns; None if it has no usable name or a field won't convert."""
+    if not isinstance(rec, dict):
+        return None
+    try:
+        return _import_row_fields(uid, rec)
+    except (TypeError, ValueError, AttributeError) as e:
+        print("[IMPORT] skipped record:", e)
+        return None
+
+def _import_row_fields(uid: int, rec: dict) -> Optional[dict]:
+    name = normalize_task_name(str(rec.get("name") or rec.get("task") or rec.get("title") or ""))[:300]
+    if not name:
+        return None
+    due_date = _parse_api_date(rec.get("due_date"))
+    task_time = _parse_api_time(rec.get("task_time"))
+    completed = _import_flag(rec.get("completed"))
+    priority = str(rec.get("priority") or "")
+    return {
+        "user_id": uid,
+        "name": name,
+        "due_date": due_date,
+        "task_time": task_time,
+        "category": str(rec.get("category") or "Other")[:100],
+        "priority": priority if priority in TASK_PRIORITIES else classify_priority(name),
+        "reminder_time": datetime.combine(due_date, task_time) if (due_date and task_time) else None,
+        "completed": completed,
+        "parent_id": None,
+        "order_index": None,
+        # NDJSON exported with subtasks=nested carries its children inline.
+        "_subtasks": rec.get("subtasks") if isinstance(rec.get("subtasks"), list) else [],
+    }
+
+def _insert_import_rows(rows: list, returning: bool = True) -> list:
+    if not rows:
+        return []
+    payload = [{k: v for k, v in r.items() if k != "_subtasks"} for r in rows]
+    if not returning:
+        db.session.execute(insert(Task), payload)
+        return []
+    return db.session.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), payload).all()
+
+def _commit_import_chunk(job: "TaskImport", records: list) -> None:
+    rows = [r for r in (_import_row(job.user_id, rec) for rec in records) if r is not None]
+    skipped = len(records) - len(rows)
+    # Ids are only needed to attach subtasks or hand soon-due reminders to the
+    # scheduler; everything else goes through a plain executemany, which is
+    # noticeably cheaper than INSERT ... RETURNING.
+    soon = datetime.now() + timedelta(hours=app.config['REMINDER_HORIZON_HOURS'])
+    def needs_id(row):
+        return row["_subtasks"] or (row["reminder_time"] and not row["completed"] and row["reminder_time"] <= soon)
+    parents = [r for r in rows if needs_id(r)]
+    _insert_import_rows([r for r in rows if not needs_id(r)], returning=False)
+    parent_ids = _insert_import_rows(parents)
+    children = []
+    for pid, row in zip(parent_ids, parents):
+        for pos, rec in enumerate(row["_subtasks"]):
+            child = _import_row(job.user_id, rec)
+            if child is None:
+                skipped += 1
+                continue
+            order_index = rec.get("order_index")
+            if not isinstance(order_index, int) or isinstance(order_index, bool):
+                order_index = pos
+            child.update(parent_id=pid, order_index=order_index, _subtasks=[])
+            children.append(child)
+    child_ids = _insert_import_rows(children)
+
+    job.rows_done += len(records)
+    job.imported += len(rows) + len(children)
+    job.skipped += skipped
+    if rows:
+        bump_task_version(job.user_id)
+    db.session.commit()
+
+    now = datetime.now()
+    for task_id, row in zip(list(parent_ids) + list(child_ids), parents + children):
+        if row["reminder_time"] and not row["completed"] and row["reminder_time"] > now:
+            reminders.schedule(task_id, row["reminder_time"], job.user_id)
+
+def import_tasks(job: "TaskImport", records, chunk_size: Optional[int] = None, progress=None) -> "TaskImport":
+    """
+    Import records for job.user_id, committing every chunk_size records.
+    Records already counted in job.rows_done are skipped, which is how an
+    interrupted import resumes. progress(job) is called after each commit.
+    """
+    chunk_size = chunk_size or app.config['TASK_IMPORT_CHUNK']
+    resume_at = job.rows_done
+    job.status, job.error = "running", None
+    db.session.commit()
+    chunk = []
+    try:
+        for n, rec in enumerate(records):
+            if n < resume_at:
+                continue
+            chunk.append(rec)
+            if len(chunk) >= chunk_size:
+                _commit_import_chunk(job, chunk)
+                chunk = []
+                if progress:
+                    progress(job)
+        if chunk:
+            _commit_import_chunk(job, chunk)
+            if progress:
+                progress(job)
+        job.status = "done"
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        job.status, job.error = "failed", str(e)[:500]
+        db.session.commit()
+        raise
+    return job
+
+def import_to_dict(job: "TaskImport") -> Dict[str, Any]:
+    return {
+        "import_id": job.id,
+        "source": job.source,
+        "format": job.format,
+        "status": job.status,
+        "rows_done": job.rows_done,
+        "imported": job.imported,
+        "skipped": job.skipped,
+        "error": job.error,
+    }
+
+@app.route("/api/tasks/import", methods=["POST"])
+@login_required
+def api_import_tasks():
+    """
+    Import tasks from a multipart "file" upload (or the raw request body).
+    format=csv|ndjson|ics defaults to the file extension. Pass import_id to
+    resume a failed import with the same file; progress can be polled from
+    GET /api/tasks/import/<import_id> while the upload is being processed.
+    """
+    uid = g.user.id
+    upload = request.files.get("file")
+    filename = upload.filename if upload else None
+    fmt = (request.values.get("format") or guess_import_format(filename) or "").lower()
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": "format must be csv, ndjson or ics"}), 400
+
+    import_id = request.values.get("import_id")
+    if import_id:
+        job = TaskImport.query.filter_by(id=import_id, user_id=uid).first_or_404()
+        if job.status == "done":
+            return jsonify(import_to_dict(job))
+    else:
+        job = TaskImport(user_id=uid, source=(filename or "upload")[:255], format=fmt)
+        db.session.add(job)
+        db.session.commit()
+
+    try:
+        import_tasks(job, iter_import_records(upload.stream if upload else request.stream, fmt))
+    except Exception as e:
+        print(f"[IMPORT] import {job.id} failed after {job.rows_done} rows: {e}")
+        return jsonify({"error": "Import failed; retry with import_id to resume", **import_to_dict(job)}), 500
+    return jsonify(import_to_dict(job))
+
+@app.route("/api/tasks/import/<int:import_id>", methods=["GET"])
+@login_required
+def api_import_status(import_id):
+    uid = g.user.id
+    return jsonify(import_to_dict(TaskImport.query.filter_by(id=import_id, user_id=uid).first_or_404()))
+
+tasks_cli = AppGroup("tasks", help="Task maintenance commands.")
+
+@tasks_cli.command("prune-tombstones")
+def prune_tombstones_command():
+    """Delete tombstones of deleted tasks older than TOMBSTONE_RETENTION_DAYS."""
+    click.echo(f"Pruned {prune_tombstones()} tombstones")
+
+@tasks_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--user", "username", required=True, help="Username to import the tasks for.")
+@click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS), help="Defaults to the file extension.")
+@click.option("--chunk-size", type=int, default=None, help="Rows per transaction (TASK_IMPORT_CHUNK).")
+@click.option("--restart", is_flag=True, help="Start over instead of resuming an unfinished import of PATH.")
+def import_tasks_command(path, username, fmt, chunk_size, restart):
+    """Import tasks from a CSV, NDJSON or iCalendar file."""
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise click.ClickException(f"No such user: {username}")
+    fmt = fmt or guess_import_format(path)
+    if fmt not in IMPORT_FORMATS:
+        raise click.ClickException("Cannot tell the format from the file name; pass --format")
+    source = os.path.abspath(path)[-255:]
+    job = None
+    if not restart:
+        job = TaskImport.query.filter(TaskImport.user_id == user.id, TaskImport.source == source,
+                                      TaskImport.status != "done").order_by(TaskImport.id.desc()).first()
+    if job:
+        click.echo(f"Resuming import {job.id} after {job.rows_done} rows")
+    else:
+        job = TaskImport(user_id=user.id, source=source, format=fmt)
+        db.session.add(job)
+        db.session.commit()
+
+    started = time_mod.perf_counter()
+    def report(j):
+        click.echo(f"  {j.rows_done} rows read, {j.imported} imported, {j.skipped} skipped "
+                   f"({time_mod.perf_counter() - started:.1f}s)")
+    with open(path, "rb") as fh:
+        try:
+            import_tasks(job, iter_import_records(fh, fmt), chunk_size=chunk_size, progress=report)
+        except Exception as e:
+            raise click.ClickException(f"Import {job.id} failed after {job.rows_done} rows ({e}); "
+                                       f"run the same command again to resume")
+    click.echo(f"Import {job.id} done: {job.imported} tasks imported, {job.skipped} skipped")
+
+app.cli.add_command(tasks_cli)
 
 @app.route("/api/tasks", methods=["POST"])
+@login_required
 def api_add_task():
-    uid = session.get("user_id")
-    if not uid:
-        return jsonify({"error": "Unauthorized"}), 401
+    uid = g.user.id
     data = request.get_json() or {}
     name = data.get("name") or data.get("task") or ""
     if not name.strip():
@@ -930,10 +3072,9 @@ def api_add_task():
     return jsonify(task_to_dict(t)), 201
 
 @app.route("/api/tasks/<int:task_id>", methods=["PUT"])
+@login_required
 def api_update_task(task_id):
-    uid = session.get("user_id")
-    if not uid:
-        return jsonify({"error": "Unauthorized"}), 401
+    uid = g.user.id
     t = Task.query.filter_by(id=task_id, user_id=uid).first_or_404()
     data = request.get_json() or {}
     if "name" in data:
@@ -959,27 +3100,234 @@ def api_update_task(task_id):
     db.session.commit()
     return jsonify(task_to_dict(t))
 
+PRIORITY_KEYWORDS = KeywordMatcher({
+    "Urgent": ("urgent", "asap", "immediately", "now", "today"),
+    "High": ("important", "priority", "soon", "high"),
+    "Low": ("later", "someday", "eventually", "low"),
+})
+
 def classify_priority(task_name: str) -> str:
     """Classify priority based on keywords in the task name."""
-    name = task_name.lower()
-    if any(word in name for word in ["urgent", "asap", "immediately", "now", "today"]):
-        return "Urgent"
-    if any(word in name for word in ["important", "priority", "soon", "high"]):
-        return "High"
-    if any(word in name for word in ["later", "someday", "eventually", "low"]):
-        return "Low"
-    return "Normal"
+    return PRIORITY_KEYWORDS.first(task_name.lower()) or "Normal"
 
 @app.route("/api/tasks/<int:task_id>", methods=["DELETE"])
+@login_required
 def api_delete_task(task_id):
-    uid = session.get("user_id")
-    if not uid:
-        return jsonify({"error": "Unauthorized"}), 401
+    uid = g.user.id
     t = Task.query.filter_by(id=task_id, user_id=uid).first_or_404()
     db.session.delete(t)
     db.session.commit()
     return jsonify({"message": "Task deleted"})
 
+def _parse_api_date(value) -> Optional[date]:
+    if isinstance(value, str) and len(value) == 10:
+        try:
+            return date.fromisoformat(value)  # fast path for bulk imports
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+    except Exception:
+        return None
+
+def _parse_api_time(value) -> Optional[dt_time]:
+    if isinstance(value, str) and len(value) in (5, 8):
+        try:
+            return dt_time.fromisoformat(value)
+        except ValueError:
+            pass
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.strptime(value, fmt).time() if value else None
+        except Exception:
+            continue
+    return None
+
+def _chunks(seq: list, size: int = 500):
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
+def _batch_op_error(op: dict) -> Optional[str]:
+    """Type check of a create/update op's fields; the error message, or None if they are usable."""
+    for field in ("name", "task", "category"):
+        if op.get(field) is not None and not isinstance(op[field], str):
+            return f"{field} must be a string"
+    for field in ("order_index", "parent_id"):
+        value = op.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            return f"{field} must be an integer"
+    if op.get("completed") is not None and not isinstance(op["completed"], bool):
+        return "completed must be true or false"
+    # Empty clears the field; anything else has to parse rather than silently becoming None.
+    if op.get("due_date") not in (None, "") and _parse_api_date(op["due_date"]) is None:
+        return "due_date must be YYYY-MM-DD"
+    if op.get("task_time") not in (None, "") and _parse_api_time(op["task_time"]) is None:
+        return "task_time must be HH:MM or HH:MM:SS"
+    return None
+
+@app.route("/api/tasks/batch", methods=["POST"])
+@login_required
+def api_batch_tasks():
+    """
+    Apply many task mutations in one transaction.
+    Body: {"operations": [{"op": "create"|"update"|"delete"|"complete", ...}, ...]}
+    (a bare list is accepted too). create/update take the same fields as
+    POST/PUT /api/tasks; update/delete/complete need "id". Ops are applied as
+    bulk statements in the order creates, updates, completes, deletes, and
+    the response lists a result per operation in request order.
+    """
+    uid = g.user.id
+    data = request.get_json(silent=True)
+    ops = data.get("operations") if isinstance(data, dict) else data
+    if not isinstance(ops, list):
+        return jsonify({"error": "operations must be a list"}), 400
+    if len(ops) > app.config['TASK_BATCH_MAX']:
+        return jsonify({"error": f"Batch too large (max {app.config['TASK_BATCH_MAX']} operations)"}), 413
+
+    results: list = [None] * len(ops)
+    creates, updates, completes, deletes = [], [], [], []
+    referenced = set()
+    for i, op in enumerate(ops):
+        kind = op.get("op") if isinstance(op, dict) else None
+        results[i] = {"index": i, "op": kind, "ok": False}
+        error = _batch_op_error(op) if kind in ("create", "update") else None
+        if error:
+            results[i]["error"] = error
+            continue
+        if kind == "create":
+            name = normalize_task_name(op.get("name") or op.get("task") or "")
+            if not name:
+                results[i]["error"] = "Task name is required"
+                continue
+            creates.append((i, op, name))
+            if op.get("parent_id") is not None:
+                referenced.add(op.get("parent_id"))
+        elif kind in ("update", "complete", "delete"):
+            try:
+                task_id = int(op.get("id"))
+            except (TypeError, ValueError):
+                results[i]["error"] = "id is required"
+                continue
+            results[i]["id"] = task_id
+            referenced.add(task_id)
+            {"update": updates, "complete": completes, "delete": deletes}[kind].append((i, op, task_id))
+        else:
+            results[i]["error"] = "op must be create, update, delete or complete"
+
+    # One ownership/lookup query for every id the batch touches.
+    existing: Dict[int, Any] = {}
+    ids = [i for i in referenced if isinstance(i, int)]
+    for chunk in _chunks(ids):
+        for row in db.session.query(Task.id, Task.due_date, Task.task_time, Task.parent_id) \
+                .filter(Task.user_id == uid, Task.id.in_(chunk)):
+            existing[row.id] = row
+
+    scheduled: Dict[int, Optional[datetime]] = {}
+    try:
+        # Creates: one executemany INSERT ... RETURNING id
+        insert_rows, insert_slots = [], []
+        for i, op, name in creates:
+            parent_id = op.get("parent_id")
+            if parent_id is not None and parent_id not in existing:
+                results[i]["error"] = "parent not found"
+                continue
+            due_date = _parse_api_date(op.get("due_date"))
+            task_time = _parse_api_time(op.get("task_time"))
+            insert_rows.append({
+                "user_id": uid,
+                "name": name,
+                "due_date": due_date,
+                "task_time": task_time,
+                "category": op.get("category") or "Other",
+                "priority": classify_priority(name),
+                "reminder_time": datetime.combine(due_date, task_time) if (due_date and task_time) else None,
+                "parent_id": parent_id,
+                "order_index": op.get("order_index"),
+                "completed": bool(op.get("completed", False)),
+            })
+            insert_slots.append(i)
+        if insert_rows:
+            new_ids = db.session.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), insert_rows).all()
+            for i, task_id, row in zip(insert_slots, new_ids, insert_rows):
+                results[i].update(ok=True, id=task_id)
+                scheduled[task_id] = None if row["completed"] else row["reminder_time"]
+
+        # Updates + completes: one bulk UPDATE by primary key
+        update_rows = []
+        for i, op, task_id in updates:
+            cur = existing.get(task_id)
+            if cur is None:
+                results[i]["error"] = "not found"
+                continue
+            row = {"id": task_id}
+            if "name" in op:
+                row["name"] = normalize_task_name(op["name"] or "")
+                row["priority"] = classify_priority(row["name"])
+            due_date = _parse_api_date(op.get("due_date")) if "due_date" in op else cur.due_date
+            task_time = _parse_api_time(op.get("task_time")) if "task_time" in op else cur.task_time
+            row["due_date"], row["task_time"] = due_date, task_time
+            row["reminder_time"] = datetime.combine(due_date, task_time) if (due_date and task_time) else None
+            if "category" in op:
+                row["category"] = op.get("category")
+            if "completed" in op:
+                row["completed"] = bool(op.get("completed"))
+            update_rows.append(row)
+            scheduled[task_id] = None if row.get("completed") else row["reminder_time"]
+            results[i]["ok"] = True
+        complete_parents = []
+        for i, op, task_id in completes:
+            cur = existing.get(task_id)
+            if cur is None:
+                results[i]["error"] = "not found"
+                continue
+            update_rows.append({"id": task_id, "completed": True})
+            if cur.parent_id is None:
+                complete_parents.append(task_id)
+            scheduled[task_id] = None
+            results[i]["ok"] = True
+        if update_rows:
+            db.session.execute(update(Task), update_rows)
+        for chunk in _chunks(complete_parents):
+            db.session.execute(update(Task).where(Task.user_id == uid, Task.parent_id.in_(chunk))
+                               .values(completed=True).execution_options(synchronize_session=False))
+
+        # Deletes: top-level tasks take their subtasks with them, like the web UI
+        delete_ids, delete_parents = [], []
+        for i, op, task_id in deletes:
+            cur = existing.get(task_id)
+            if cur is None:
+                results[i]["error"] = "not found"
+                continue
+            delete_ids.append(task_id)
+            if cur.parent_id is None:
+                delete_parents.append(task_id)
+            scheduled[task_id] = None
+            results[i]["ok"] = True
+        for chunk in _chunks(delete_parents):
+            delete_tasks_where(Task.user_id == uid, Task.parent_id.in_(chunk))
+        for chunk in _chunks(delete_ids):
+            delete_tasks_where(Task.user_id == uid, Task.id.in_(chunk))
+        if any(r["ok"] for r in results):
+            bump_task_version(uid)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print("[Batch] failed:", e)
+        return jsonify({"error": "Batch failed; no changes were applied"}), 500
+
+    # Bulk statements bypass the session flush hooks, so update the reminder heap here.
+    for task_id, when in scheduled.items():
+        reminders.schedule(task_id, when, uid)
+    ok = [r for r in results if r["ok"]]
+    return jsonify({
+        "results": results,
+        "created": sum(1 for r in ok if r["op"] == "create"),
+        "updated": sum(1 for r in ok if r["op"] == "update"),
+        "completed": sum(1 for r in ok if r["op"] == "complete"),
+        "deleted": sum(1 for r in ok if r["op"] == "delete"),
+        "failed": len(results) - len(ok),
+    })
+
 # Helper function to safely parse JSON 
 def parse_request_json(req):
     """
@@ -1018,18 +3366,27 @@ def voice_welcome():
         "continue_listening": True
     })
 
+# Reply keywords for both voice handlers, matched once per turn.
+VOICE_REPLY_KEYWORDS = KeywordMatcher({
+    "cancel": ("stop","cancel","exit","quit","bas","ruko"),
+    "yes": ("yes","yeah","yup","sure","ok","okay"),
+    "confirm": ("do it","confirm"),
+    "no": ("no","nah","nope","cancel"),
+})
+
 @app.route("/voice/command-legacy", methods=["POST"])
 def voice_command_legacy():
     try:
         data = request.get_json(force=True, silent=True) or {}
         transcript = (data.get("transcript") or "").strip()
         tl = transcript.lower()
-        uid = session.get("user_id")
+        said = VOICE_REPLY_KEYWORDS.match(tl)
+        uid = g.user.id if g.user else None
         prefs = get_voice_prefs()
         lang = prefs.get("lang", "hinglish")
 
         # Cancel / Empty
-        if any(k in tl for k in ("stop","cancel","exit","quit","bas","ruko")):
+        if "cancel" in said:
             _clear_flow()
             return jsonify({"message": tr("Okay, cancelled.","Theek hai, cancel kiya.","Theek hai, cancel kiya."),
                             "continue_listening": False, "task_added": False})
@@ -1039,11 +3396,18 @@ def voice_command_legacy():
                                           "Samajh nahi aaya. Phir bolo?"),
                             "continue_listening": True, "task_added": False})
 
-        # Emotion + proactive reschedule
-        emotion, emo_score = detect_emotion(transcript)
-        if uid: log_emotion(uid, emotion, emo_score)
-        if uid and not _get_flow().get("mode") and emotion in {"stressed","sad","tired"}:
-            todays = propose_reschedule_candidates(uid)
+        # Emotion, intent and slots (one LLM call unless VOICE_UNDERSTAND=split),
+        # with today's reschedule candidates fetched alongside
+        pipe = VoicePipeline()
+        start_understanding(pipe, transcript, lang)
+        may_offer = bool(uid) and not _get_flow().get("mode")
+        if may_offer:
+            pipe.submit("reschedule", _reschedule_candidates_from_replica, uid)
+        parsed = finish_understanding(pipe, transcript)
+        emotion, emo_score = parsed["emotion"], parsed["score"]
+        if uid: pipe.fire("log_emotion", log_emotion, uid, emotion, emo_score)
+        if may_offer and emotion in {"stressed","sad","tired"}:
+            todays = pipe.result("reschedule", list)
             if todays:
                 _save_flow({"mode": "reschedule_offer", "step": "confirm", "payload": {"days": 1}})
                 return jsonify({"message": tr(
@@ -1054,7 +3418,6 @@ def voice_command_legacy():
                                 "continue_listening": True, "task_added": False})
 
         # NLU
-        parsed = nlu_understand(transcript, lang)
         intent = parsed.get("intent","unknown")
         slots = parsed.get("slots") if isinstance(parsed.get("slots"), dict) else {}
 
@@ -1080,7 +3443,8 @@ def voice_command_legacy():
                                 "continue_listening": True, "task_added": False})
 
         if intent == "list_tasks" and uid:
-            tasks = Task.query.filter_by(user_id=uid).order_by(Task.completed.asc(), Task.id.desc()).all()
+            with read_from_replica():
+                tasks = Task.query.filter_by(user_id=uid).order_by(Task.completed.asc(), Task.id.desc()).all()
             if not tasks:
                 return jsonify({"message": tr("You have no tasks.","Aapke paas abhi koi tasks nahi hain.","Koi tasks nahi hain."),
                                 "continue_listening": False, "task_added": False})
@@ -1095,7 +3459,7 @@ def voice_command_legacy():
 
         if intent == "complete_task" and uid and slots.get("task"):
             q = normalize_task_name(slots["task"])
-            cand = Task.query.filter(Task.user_id==uid, Task.name.ilike(f"%{q}%"), Task.completed == False).first()
+            cand = apply_task_search(Task.query.filter(Task.user_id==uid, Task.completed == False), q, ranked=True).first()
             if cand:
                 cand.completed = True; db.session.commit(); _clear_flow()
                 return jsonify({"message": tr(f"Marked ‘{cand.name}’ complete.",
@@ -1105,11 +3469,11 @@ def voice_command_legacy():
 
         if intent == "delete_task" and uid and slots.get("task"):
             q = normalize_task_name(slots["task"])
-            cand = Task.query.filter(Task.user_id==uid, Task.name.ilike(f"%{q}%")).first()
+            cand = apply_task_search(Task.query.filter(Task.user_id==uid), q, ranked=True).first()
             if cand:
                 title = cand.name
                 if cand.parent_id is None:
-                    Task.query.filter_by(user_id=uid, parent_id=cand.id).delete(synchronize_session=False)
+                    delete_tasks_where(Task.user_id == uid, Task.parent_id == cand.id)
                 db.session.delete(cand); db.session.commit(); _clear_flow()
                 return jsonify({"message": tr(f"Deleted ‘{title}’.",
                                               f"‘{title}’ delete kar diya.",
@@ -1143,7 +3507,7 @@ def voice_command_legacy():
 
         # RESCHEDULE OFFER confirm
         if mode == "reschedule_offer" and step == "confirm" and uid:
-            if any(w in tl for w in ("yes","yeah","yup","sure","ok","okay")):
+            if "yes" in said:
                 days = int(flow.get("payload",{}).get("days",1)); moved = apply_reschedule(uid, days=days); _clear_flow()
                 return jsonify({"message": tr(
                                     f"Done. I moved {moved} task(s) to tomorrow. Anything else?" if moved else
@@ -1154,7 +3518,7 @@ def voice_command_legacy():
                                     "Aaj shift karne ko kuch nahi mila."
                                 ),
                                 "continue_listening": True, "task_added": False, "reload_page": bool(moved)})
-            if any(w in tl for w in ("no","nah","nope","cancel")):
+            if "no" in said:
                 _clear_flow()
                 return jsonify({"message": tr("Okay. I’m here if you need anything.",
                                               "Theek hai. Jab zaroorat ho batao.",
@@ -1256,7 +3620,7 @@ def voice_command_legacy():
                                               f"Suggestion: {', '.join(names)}{more}. Bana du?"),
                                 "continue_listening": True, "task_added": False})
             if step == "confirm":
-                if any(w in tl for w in ("yes","yeah","yup","sure","ok","okay","do it","confirm")):
+                if "yes" in said or "confirm" in said:
                     payload = flow.get("payload", {})
                     goal = payload.get("goal", ""); due = parse_due_date(payload.get("due_text") or ""); ttm = parse_task_time(payload.get("time_text") or "")
                     result = create_goal_with_subtasks(uid, goal, due, ttm, category="Other")
@@ -1270,7 +3634,7 @@ def voice_command_legacy():
                                                   "Subtasks nahi ban paaye.",
                                                   "Subtasks nahi ban paaye."),
                                     "continue_listening": False, "task_added": False})
-                if any(w in tl for w in ("no","nah","nope","cancel")):
+                if "no" in said:
                     _clear_flow()
                     return jsonify({"message": tr("Cancelled.","Cancel kiya.","Cancel kiya."),
                                     "continue_listening": False, "task_added": False})
@@ -1279,30 +3643,7 @@ def voice_command_legacy():
                                               "Bana du? Haan ya na bolo."),
                                 "continue_listening": True, "task_added": False})
         # Unknown → gentle fallback
-        if _groq:
-            try:
-                sys_prompt = (
-                    "You are DaySavvy, a friendly, helpful, and gentle productivity assistant. "
-                    "You can chat about anything, help with tasks, listen to feelings, and keep the conversation going naturally. "
-                    "Reply in a warm, human-like, casual tone. If the user seems stressed or sad, offer encouragement or a reset. "
-                    "If they mention tasks or goals, you can help break them down or add them."
-                )
-                resp = _groq.chat.completions.create(
-                    model=os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905"),
-                    messages=[
-                        {"role": "system", "content": sys_prompt},
-                        {"role": "user", "content": transcript}
-                    ],
-                    temperature=0.7,
-                    max_tokens=300,
-                )
-                reply = resp.choices[0].message.content.strip()
-                return jsonify({"message": reply, "continue_listening": True, "task_added": False})
-            except Exception as e:
-                print("[Chat][Groq] error:", e)
-        # If Groq not available, fallback to local
-        msg = _gen_empathetic_reply_local(transcript, emotion, lang)
-        return jsonify({"message": msg, "continue_listening": True, "task_added": False})
+        return chat_fallback_reply(transcript, emotion, lang)
 
     except Exception as e:
         print("[VOICE ERROR]", e)
@@ -1315,16 +3656,240 @@ def voice_command_legacy():
 YES_WORDS = {"yes", "yeah", "yup", "sure", "correct", "save", "affirmative"}
 NO_WORDS = {"no", "nah", "nope", "don't", "dont", "do not", "cancel"}
 
+# Conversation state stores
+# The voice state machine's flow lives server-side; the cookie only carries an
+# opaque id. Every store expires a conversation VOICE_STATE_TTL seconds after
+# its last write.
+class MemoryConversationStore:
+    """
+    Per-process LRU with TTL. Conversations are not shared across workers.
+    Values are kept serialized so callers can't mutate the stored copy.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid: str) -> Optional[dict]:
+        with self._lock:
+            hit = self._data.get(sid)
+            if hit is None:
+                return None
+            if hit[0] <= time_mod.monotonic():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return json.loads(hit[1])
+
+    def set(self, sid: str, data: dict) -> None:
+        with self._lock:
+            self._data[sid] = (time_mod.monotonic() + self.ttl, json.dumps(data))
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._data.pop(sid, None)
+
+class DbConversationStore:
+    """voice_conversation table on the primary database; shared by all workers."""
+
+    def __init__(self, ttl: int, purge_every: int = 60):
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._purged_at = 0.0
+
+    def get(self, sid: str) -> Optional[dict]:
+        with db.engine.connect() as conn:
+            raw = conn.execute(db.select(VoiceConversation.data).where(
+                VoiceConversation.sid == sid, VoiceConversation.expires_at > datetime.utcnow())).scalar()
+        return json.loads(raw) if raw else None
+
+    def set(self, sid: str, data: dict) -> None:
+        values = {"data": json.dumps(data), "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl)}
+        with db.engine.begin() as conn:
+            if not conn.execute(update(VoiceConversation).where(VoiceConversation.sid == sid).values(**values)).rowcount:
+                conn.execute(insert(VoiceConversation).values(sid=sid, **values))
+            if time_mod.monotonic() - self._purged_at > self.purge_every:
+                self._purged_at = time_mod.monotonic()
+                conn.execute(delete(VoiceConversation).where(VoiceConversation.expires_at <= datetime.utcnow()))
+
+    def delete(self, sid: str) -> None:
+        with db.engine.begin() as conn:
+            conn.execute(delete(VoiceConversation).where(VoiceConversation.sid == sid))
+
+class RedisConversationStore:
+    """Redis (or any server speaking its protocol) with SETEX expiry."""
+
+    def __init__(self, url: str, ttl: int, prefix: str = "daysavvy:voice:"):
+        import redis  # optional dependency, only needed for this store
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, sid: str) -> Optional[dict]:
+        raw = self.client.get(self.prefix + sid)
+        return json.loads(raw) if raw else None
+
+    def set(self, sid: str, data: dict) -> None:
+        self.client.setex(self.prefix + sid, self.ttl, json.dumps(data))
+
+    def delete(self, sid: str) -> None:
+        self.client.delete(self.prefix + sid)
+
+def make_conversation_store():
+    kind = app.config['VOICE_STATE_STORE']
+    ttl = app.config['VOICE_STATE_TTL']
+    if kind == "redis":
+        try:
+            return RedisConversationStore(app.config['REDIS_URL'], ttl)
+        except Exception as e:
+            print(f"[VOICE] Redis store unavailable ({e}); using the database store")
+    elif kind == "memory":
+        return MemoryConversationStore(ttl, app.config['VOICE_STATE_MAX'])
+    return DbConversationStore(ttl)
+
+conversations = make_conversation_store()
+
+_EMPTY_FLOW = {"mode": None, "step": None, "task": {}}
+
+def _voice_sid(create: bool = False) -> Optional[str]:
+    sid = session.get("voice_sid")
+    if sid is None and create:
+        sid = session["voice_sid"] = uuid.uuid4().hex
+    return sid
+
 def _get_flow():
-    return session.get("voice_flow", {"mode": None, "step": None, "task": {}})
+    """The current conversation flow, loaded from the store once per request."""
+    if "voice_flow" not in g:
+        flow = None
+        if "voice_flow" in session:
+            # Flow saved in the cookie by an older version: move it server-side.
+            flow = session.pop("voice_flow")
+            _save_flow(flow)
+        elif _voice_sid():
+            try:
+                flow = conversations.get(_voice_sid())
+            except Exception as e:
+                print("[VOICE] conversation store read failed:", e)
+        g.voice_flow = flow
+    return g.voice_flow or dict(_EMPTY_FLOW)
 
 def _save_flow(flow):
-    session["voice_flow"] = flow
-    session.modified = True
+    # Written back once in after_request, after the view's own commit.
+    g.voice_flow = flow
+    g.voice_flow_dirty = True
 
 def _clear_flow():
-    session.pop("voice_flow", None)
-    session.modified = True
+    _save_flow(None)
+
+@app.after_request
+def _persist_voice_flow(response):
+    if g.pop("voice_flow_dirty", False):
+        flow = g.get("voice_flow")
+        try:
+            if flow:
+                conversations.set(_voice_sid(create=True), flow)
+            elif _voice_sid():
+                conversations.delete(_voice_sid())
+        except Exception as e:
+            print("[VOICE] conversation store write failed:", e)
+    return response
+
+# Voice pipeline
+# The independent stages of a voice turn (LLM understanding, the reschedule
+# candidate lookup) run concurrently on voice_executor, each in a copy of the
+# request context and with its own deadline; a stage that times out or fails
+# yields its fallback instead. Emotion logging is fire-and-forget. Stage
+# timings are returned in the response's "debug" field.
+voice_executor = ThreadPoolExecutor(max_workers=app.config['VOICE_POOL_SIZE'], thread_name_prefix="voice")
+
+class VoicePipeline:
+    def __init__(self):
+        self.started = time_mod.perf_counter()
+        self.timings: Dict[str, Any] = {}
+        self._futures: Dict[str, tuple] = {}
+        g.voice_pipeline = self
+
+    def _timed(self, name, fn, args):
+        def run():
+            t0 = time_mod.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.timings.setdefault(name, round((time_mod.perf_counter() - t0) * 1000, 1))
+        return copy_current_request_context(run)
+
+    def submit(self, name: str, fn, *args) -> None:
+        deadline = time_mod.monotonic() + app.config['VOICE_STAGE_TIMEOUTS'][name]
+        self._futures[name] = (deadline, voice_executor.submit(self._timed(name, fn, args)))
+
+    def fire(self, name: str, fn, *args) -> None:
+        """Run fn in the background; nothing waits for it."""
+        self.timings[name] = "queued"
+        voice_executor.submit(copy_current_request_context(fn), *args)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._futures
+
+    def result(self, name: str, fallback):
+        """The stage's value, or fallback() if it timed out or raised."""
+        deadline, future = self._futures[name]
+        try:
+            return future.result(timeout=max(0.0, deadline - time_mod.monotonic()))
+        except FuturesTimeout:
+            self.timings[name] = "timeout"
+            print(f"[VOICE] stage {name} timed out")
+        except Exception as e:
+            self.timings[name] = "error"
+            print(f"[VOICE] stage {name} failed:", e)
+        return fallback()
+
+def start_understanding(pipe: VoicePipeline, text: str, lang: str) -> None:
+    if app.config['VOICE_UNDERSTAND'] == "split":
+        pipe.submit("emotion", detect_emotion, text)
+        pipe.submit("nlu", nlu_understand, text, lang)
+    else:
+        pipe.submit("understand", understand, text, lang)
+
+def finish_understanding(pipe: VoicePipeline, text: str) -> dict:
+    """understand()'s result from the stages start_understanding() submitted."""
+    if "understand" in pipe:
+        def fallback():
+            out = dict(_nlu_fallback(text))
+            out["emotion"], out["score"] = _emotion_fallback(text.lower())
+            return out
+        return pipe.result("understand", fallback)
+    emotion, score = pipe.result("emotion", lambda: _emotion_fallback(text.lower()))
+    parsed = pipe.result("nlu", lambda: _nlu_fallback(text))
+    return {"emotion": emotion, "score": score, "intent": parsed.get("intent", "unknown"),
+            "slots": parsed.get("slots") if isinstance(parsed.get("slots"), dict) else {}}
+
+def _reschedule_candidates_from_replica(uid: int):
+    with read_from_replica():
+        return propose_reschedule_candidates(uid)
+
+@app.after_request
+def _attach_voice_debug(response):
+    pipe = g.pop("voice_pipeline", None)
+    if pipe is not None and response.is_json:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body["debug"] = {"stages_ms": dict(pipe.timings),
+                             "total_ms": round((time_mod.perf_counter() - pipe.started) * 1000, 1)}
+            response.set_data(app.json.dumps(body))
+    return response
+
+@app.route("/api/llm/stats", methods=["GET"])
+@login_required
+def llm_stats():
+    """Per-call-site LLM metrics, breaker state and cache counters for this process."""
+    return jsonify({"sites": llm.stats(), "breaker": llm.breaker.state, "cache": llm_cache.stats()})
+
+_TITLE_START_RE = re.compile(r'\b(?:add|create|new task|i want to add)\b\s*(.+)')
 
 def _title_from_transcript(tl: str):
     """
@@ -1332,85 +3897,23 @@ def _title_from_transcript(tl: str):
     "add buy milk tomorrow at 5" -> returns "buy milk"
     If nothing convincing found, return None.
     """
-    tl = tl.strip()
-    # Find after "add" or "create" or "new task"
-    m = re.search(r'\b(?:add|create|new task|i want to add)\b\s*(.+)', tl)
+    m = _TITLE_START_RE.search(tl.strip())
     if not m:
         return None
     candidate = m.group(1).strip()
 
-    # Remove trailing date/time phrases
-    candidate = re.sub(r'\b(?:today|tomorrow|tonight|next\s+\w+|in\s+\d+\s+days|on\s+\w+\s*\d{1,2})\b.*$', '', candidate)
-    # Remove "at 5 pm" style
-    candidate = re.sub(r'\bat\s+\d{1,2}(:\d{2})?\s*(am|pm)?\b', '', candidate)
-    candidate = re.sub(r'\b\d{1,2}(:\d{2})\s*(am|pm)?\b', '', candidate)
-    candidate = candidate.strip(" ,.")
+    # Drop the due-date phrase and whatever follows it, then a clock time
+    # ("at 5 pm"); words like "evening" may be part of the name and stay.
+    # Only the span is used, so any fixed "today" will do for telling "feb 30" from a date.
+    found = _scan_date(candidate, date.min, span_only=True)
+    if found and candidate[:found[1]].strip(" ,."):
+        candidate = candidate[:found[1]]
+    found = _scan_time(candidate, False, False)
+    if found:
+        candidate = candidate[:found[1]] + candidate[found[2]:]
+    candidate = " ".join(candidate.split()).strip(" ,.")
     return candidate or None
 
-def parse_due_date(text: str):
-    """Return a datetime.date or None. Accepts 'today','tomorrow','in N days','next monday','YYYY-MM-DD','DD/MM/YYYY', 'Sep 5' etc."""
-    if not text:
-        return None
-    t = text.lower().strip()
-
-    today = date.today()
-    if "today" in t:
-        return today
-    if "tomorrow" in t:
-        return today + timedelta(days=1)
-
-    # in N days
-    m = re.search(r'in\s+(\d+)\s+days?', t)
-    if m:
-        return today + timedelta(days=int(m.group(1)))
-
-    # next <weekday>
-    days = {
-        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-        "friday": 4, "saturday": 5, "sunday": 6
-    }
-    m = re.search(r'next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', t)
-    if m:
-        target = days[m.group(1)]
-        days_ahead = (target - today.weekday() + 7) % 7
-        days_ahead = days_ahead if days_ahead != 0 else 7
-        return today + timedelta(days=days_ahead)
-
-    # Try explicit formats (with and without year)
-    formats = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y", "%B %d %Y", "%b %d %Y", "%B %d", "%b %d"]
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(t, fmt)
-            # if format didn't include year, strptime will fill current year for "%B %d" patterns -> handle:
-            if fmt in ("%B %d", "%b %d"):
-                return date(date.today().year, dt.month, dt.day)
-            return dt.date()
-        except Exception:
-            continue
-
-    # Last-ditch: search for something like "05/09" -> assume current year, or "5 september"
-    m = re.search(r'(\d{1,2})[\/\-\s](\d{1,2})(?:[\/\-\s](\d{2,4}))?', t)
-    if m:
-        d1 = int(m.group(1)); d2 = int(m.group(2)); y = m.group(3)
-        if y:
-            y = int(y)
-            if y < 100: y += 2000
-        else:
-            y = today.year
-        # guess order: if d1 > 12 treat as day first (d/m), else assume d/m
-        if d1 > 12:
-            try:
-                return date(y, d2, d1)
-            except Exception:
-                pass
-        else:
-            try:
-                return date(y, d1, d2)
-            except Exception:
-                pass
-
-    return None
-
 # Voice helpers for decomposition
 def _extract_goal_from_transcript(tl: str) -> Optional[str]:
     """
@@ -1442,43 +3945,6 @@ def _recent_goal_candidate(uid: int) -> Optional[Task]:
         Task.parent_id.is_(None)
     ).order_by(Task.created_at.desc()).first()
 
-def parse_task_time(text: str):
-    """Return datetime.time or None. Accepts '5 pm', '17:30', '7:00 a.m.', 'noon'."""
-    if not text:
-        return None
-    t = text.lower().strip().replace(".", "")
-    if "noon" in t:
-        return time(12, 0)
-    if "midnight" in t:
-        return time(0, 0)
-
-    # Find hh:mm am/pm or hh am/pm or hh:mm (24h)
-    m = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', t)
-    if not m:
-        return None
-    hour = int(m.group(1))
-    minute = int(m.group(2) or 0)
-    ampm = m.group(3)
-
-    if ampm:
-        ampm = ampm.lower()
-        if ampm == "pm" and hour != 12:
-            hour = hour + 12
-        if ampm == "am" and hour == 12:
-            hour = 0
-    else:
-        # no am/pm -> treat as 24h if reasonable
-        if hour <= 23:
-            pass
-        else:
-            # fallback: invalid hour
-            return None
-
-    try:
-        return time(hour % 24, minute)
-    except Exception:
-        return None
-
 def _fmt_date_for_user(d):
     if d is None:
         return "none"
@@ -1501,7 +3967,8 @@ def voice_command():
         data = request.get_json(force=True, silent=True) or {}
         transcript = (data.get("transcript") or "").strip()
         tl = transcript.lower()
-        uid = session.get("user_id")
+        said = VOICE_REPLY_KEYWORDS.match(tl)
+        uid = g.user.id if g.user else None
         prefs = get_voice_prefs()
         lang = prefs.get("lang", "hinglish")
 
@@ -1510,7 +3977,7 @@ def voice_command():
         emo_score = 0.5
 
         # Cancel / empty
-        if any(k in tl for k in ("stop","cancel","exit","quit","bas","ruko")):
+        if "cancel" in said:
             _clear_flow()
             return jsonify({"message": tr("Okay, cancelled.","Theek hai, cancel kiya.","Theek hai, cancel kiya."),
                             "continue_listening": False, "task_added": False})
@@ -1520,13 +3987,18 @@ def voice_command():
                                           "Samajh nahi aaya. Phir bolo?"),
                             "continue_listening": True, "task_added": False})
 
-        # Emotion (never crash)
+        # Emotion (never crash), with today's reschedule candidates fetched alongside
         try:
-            emotion, emo_score = detect_emotion(transcript)
+            pipe = VoicePipeline()
+            pipe.submit("emotion", detect_emotion, transcript)
+            may_offer = bool(uid) and not _get_flow().get("mode")
+            if may_offer:
+                pipe.submit("reschedule", _reschedule_candidates_from_replica, uid)
+            emotion, emo_score = pipe.result("emotion", lambda: _emotion_fallback(tl))
             if uid:
-                log_emotion(uid, emotion, emo_score)
-            if uid and not _get_flow().get("mode") and emotion in {"stressed","sad","tired"}:
-                todays = propose_reschedule_candidates(uid)
+                pipe.fire("log_emotion", log_emotion, uid, emotion, emo_score)
+            if may_offer and emotion in {"stressed","sad","tired"}:
+                todays = pipe.result("reschedule", list)
                 if todays:
                     _save_flow({"mode":"reschedule_offer","step":"confirm","payload":{"days":1}})
                     return jsonify({"message": tr(
@@ -1545,7 +4017,7 @@ def voice_command():
         task = flow.get("task") or {}
 
         if mode == "reschedule_offer" and step == "confirm" and uid:
-            if any(w in tl for w in ("yes","yeah","yup","sure","ok","okay")):
+            if "yes" in said:
                 days = int(flow.get("payload",{}).get("days",1))
                 moved = apply_reschedule(uid, days=days)
                 _clear_flow()
@@ -1558,7 +4030,7 @@ def voice_command():
                                     "Aaj shift karne ko kuch nahi mila."
                                 ),
                                 "continue_listening": True, "task_added": False, "reload_page": bool(moved)})
-            if any(w in tl for w in ("no","nah","nope","cancel")):
+            if "no" in said:
                 _clear_flow()
                 return jsonify({"message": tr("Okay. I’m here if you need anything.",
                                               "Theek hai. Jab zaroorat ho batao.",
@@ -1676,7 +4148,7 @@ def voice_command():
                                               f"Suggestion: {', '.join(names)}{more}. Bana du?"),
                                 "continue_listening": True, "task_added": False})
             if step == "confirm":
-                if any(w in tl for w in ("yes","yeah","yup","sure","ok","okay","do it","confirm")):
+                if "yes" in said or "confirm" in said:
                     payload = flow.get("payload", {})
                     goal = payload.get("goal", "")
                     due = parse_due_date(payload.get("due_text") or "")
@@ -1693,7 +4165,7 @@ def voice_command():
                                                   "Subtasks nahi ban paaye.",
                                                   "Subtasks nahi ban paaye."),
                                     "continue_listening": False, "task_added": False})
-                if any(w in tl for w in ("no","nah","nope","cancel")):
+                if "no" in said:
                     _clear_flow()
                     return jsonify({"message": tr("Cancelled.","Cancel kiya.","Cancel kiya."),
                                     "continue_listening": False, "task_added": False})
@@ -1703,30 +4175,7 @@ def voice_command():
                                 "continue_listening": True, "task_added": False})
 
 # Final fallback (always)
-        if _groq:
-            try:
-                sys_prompt = (
-                    "You are DaySavvy, a friendly, helpful, and gentle productivity assistant. "
-                    "You can chat about anything, help with tasks, listen to feelings, and keep the conversation going naturally. "
-                    "Reply in a warm, human-like, casual tone. If the user seems stressed or sad, offer encouragement or a reset. "
-                    "If they mention tasks or goals, you can help break them down or add them."
-                )
-                resp = _groq.chat.completions.create(
-                    model=os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905"),
-                    messages=[
-                        {"role": "system", "content": sys_prompt},
-                        {"role": "user", "content": transcript}
-                    ],
-                    temperature=0.7,
-                    max_tokens=300,
-                )
-                reply = resp.choices[0].message.content.strip()
-                return jsonify({"message": reply, "continue_listening": True, "task_added": False})
-            except Exception as e:
-                print("[Chat][Groq] error:", e)
-        # If Groq not available, fallback to local
-        msg = _gen_empathetic_reply_local(transcript, emotion, lang)
-        return jsonify({"message": msg, "continue_listening": True, "task_added": False})
+        return chat_fallback_reply(transcript, emotion, lang)
 
     except Exception as e:
         print("[VOICE ERROR]", e)
@@ -1828,5 +4277,6 @@ if __name__ == "__main__":
     # Ensure DB created
     with app.app_context():
         db.create_all()
-        threading.Thread(target=reminder_checker, daemon=True).start()
+        ensure_task_fts()
+    reminders.start()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,97 @@
+"""
+Bytes-on-the-wire and CPU cost of response compression.
+
+Seeds tasks, fetches the real responses (GET /api/tasks at several page
+sizes, the index page, a streamed NDJSON export) and, for each, reports the
+identity size and the compressed size and per-response compression time at
+the gzip levels (and brotli qualities, if the brotli package is installed)
+compress_response() can be configured with. The last column is the time
+through the full stack with the configured defaults.
+
+    python bench/bench_compression.py            # 500 tasks
+    python bench/bench_compression.py 2000
+"""
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import app as daysavvy  # noqa: E402
+from app import db, Task, User  # noqa: E402
+
+REPEAT = 20
+
+
+def seed(user_id, n):
+    db.session.add_all(Task(user_id=user_id, name=f"task {i}: follow up on the quarterly report draft",
+                            category=("Work", "Personal", "Study", "Other")[i % 4],
+                            priority=("Urgent", "High", "Normal", "Low")[i % 4])
+                       for i in range(n))
+    db.session.commit()
+
+
+def per_call(fn, repeat=REPEAT):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def codecs():
+    out = [(f"gzip-{lvl}", lambda data, lvl=lvl: daysavvy._GzipCompressor(lvl).finish(data)) for lvl in (1, 6, 9)]
+    if daysavvy.brotli is not None:
+        out += [(f"br-{q}", lambda data, q=q: daysavvy._BrotliCompressor(q).finish(data)) for q in (4, 6, 11)]
+    return out
+
+
+def streamed_gzip(chunks, level):
+    c = daysavvy._GzipCompressor(level)
+    return b"".join([c.chunk(ch) for ch in chunks] + [c.finish()])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    daysavvy.app.config["WTF_CSRF_ENABLED"] = False
+    with daysavvy.app.app_context():
+        db.create_all()
+        user = User(username="bench", password="x", onboarding_done=True)
+        db.session.add(user)
+        db.session.commit()
+        seed(user.id, n)
+        client = daysavvy.app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user.id
+
+        urls = [f"/api/tasks?limit={k}" for k in (1, 10, 100, 500) if k <= n] + ["/"]
+        names = [name for name, _ in codecs()]
+        print(f"{'response':<22}{'identity':>10}  " + "".join(f"{name:>18}" for name in names)
+              + f"{'end-to-end':>22}")
+        for url in urls:
+            body = client.get(url).data
+            row = f"{url:<22}{len(body):>10}  "
+            for _, fn in codecs():
+                out, secs = per_call(lambda: fn(body))
+                row += f"{len(out):>8} {secs * 1000:6.2f}ms  "
+            _, plain = per_call(lambda: client.get(url))
+            resp, packed = per_call(lambda: client.get(url, headers={"Accept-Encoding": "gzip, br"}))
+            row += f"{plain * 1000:7.2f} -> {packed * 1000:6.2f}ms {resp.headers.get('Content-Encoding') or '-'}"
+            print(row)
+
+        # Streamed export: per-chunk sync flushes cost some ratio versus one shot.
+        resp = client.get("/api/tasks/export?format=ndjson", buffered=False)
+        chunks = list(resp.response)
+        resp.close()
+        whole = b"".join(chunks)
+        lvl = daysavvy.app.config["COMPRESS_LEVEL"]
+        one_shot = daysavvy._GzipCompressor(lvl).finish(whole)
+        streamed, secs = per_call(lambda: streamed_gzip(chunks, lvl))
+        assert zlib.decompress(streamed, 31) == whole
+        print(f"\nexport ndjson: {len(whole)} bytes in {len(chunks)} chunks -> gzip-{lvl} "
+              f"one-shot {len(one_shot)}, streamed {len(streamed)} ({secs * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Accuracy check and micro-benchmark for the date/time extraction engine.
+
+Runs a labelled corpus of due-date answers, time answers and "add ..."
+transcripts through parse_due_date/find_date, parse_task_time/find_time and
+_title_from_transcript, and through reference copies of the strptime-probing
+parsers they replaced, against a fixed "today". Prints the accuracy of both
+and exits non-zero if the engine misses any case, then times both per call.
+
+    python bench/bench_datetime.py
+"""
+import os
+import re
+import sys
+import timeit
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import app as daysavvy  # noqa: E402
+
+TODAY = date(2026, 3, 11)  # a Wednesday
+D = lambda m, d, y=2026: date(y, m, d)  # noqa: E731
+
+DATES = [
+    ("today", D(3, 11)), ("Today", D(3, 11)), ("tomorrow", D(3, 12)), ("aaj", D(3, 11)), ("kal", D(3, 12)),
+    ("parso", D(3, 13)), ("day after tomorrow", D(3, 13)), ("in 3 days", D(3, 14)), ("in 1 day", D(3, 12)),
+    ("in 2 weeks", D(3, 25)), ("next monday", D(3, 16)), ("next wednesday", D(3, 18)), ("friday", D(3, 13)),
+    ("on friday", D(3, 13)), ("this saturday", D(3, 14)), ("2026-04-05", D(4, 5)), ("2026/4/5", D(4, 5)),
+    ("on 2026-08-28", D(8, 28)), ("05/09/2026", D(9, 5)), ("5-9-2026", D(9, 5)), ("12/25/2026", D(12, 25)),
+    # Numeric dates: day first with a four-digit year, month first otherwise, the other order if that fails
+    ("25/12/26", D(12, 25)), ("5/9", D(5, 9)), ("5/9/26", D(5, 9)), ("10/11", D(10, 11)), ("25/12", D(12, 25)),
+    ("1/2", D(1, 2, 2027)),
+    ("sep 5", D(9, 5)), ("September 5", D(9, 5)), ("sept 5th", D(9, 5)), ("5 september", D(9, 5)),
+    ("5th of sep", D(9, 5)), ("september 5 2027", D(9, 5, 2027)), ("jan 3", D(1, 3, 2027)),
+    ("march 11", D(3, 11)), ("dec 31, 2026", D(12, 31)), ("due by jun 1", D(6, 1)),
+    ("skip", None), ("no due date", None), ("", None), ("5 pm", None), ("may be later", None), ("feb 30", None),
+]
+TIMES = [
+    ("5 pm", time(17)), ("5pm", time(17)), ("5 p.m.", time(17)), ("7:15 a.m.", time(7, 15)),
+    ("7:15 am", time(7, 15)), ("12 am", time(0)), ("12 pm", time(12)), ("17:30", time(17, 30)),
+    ("at 17:30", time(17, 30)), ("9:05", time(9, 5)), ("8.30 pm", time(20, 30)), ("noon", time(12)),
+    ("midnight", time(0)), ("5", time(5)), ("17", time(17)), ("at 5", time(5)), ("5 baje", time(5)),
+    ("shaam 5 baje", time(17)), ("5 baje shaam", time(17)), ("7:30 in the evening", time(19, 30)),
+    ("6 o'clock", time(6)), ("morning", time(9)), ("evening", time(19)), ("in the morning at 8", time(8)),
+    ("12:30pm", time(12, 30)), ("10am", time(10)), ("at 9:45", time(9, 45)), ("105 pm", None),
+    ("skip", None), ("25", None), ("13 pm", None), ("", None), ("none", None),
+]
+TITLES = [
+    ("add buy milk tomorrow at 5", "buy milk"), ("add buy milk", "buy milk"), ("add call mom at 5 pm", "call mom"),
+    ("add pay rent due friday", "pay rent"), ("add submit report by 2026-04-05", "submit report"),
+    ("add dentist appointment on sep 5 at 10:30 am", "dentist appointment"), ("add evening yoga", "evening yoga"),
+    ("add monday meeting", "monday meeting"), ("create team sync next tuesday", "team sync"),
+    ("add groceries kal", "groceries"), ("add book flights in 3 days", "book flights"),
+    ("new task water plants at 7:30", "water plants"), ("hello there", None),
+]
+
+
+# Reference copies of the parsers before the engine, with "today" injectable.
+def old_parse_due_date(text, today):
+    if not text:
+        return None
+    t = text.lower().strip()
+    if "today" in t:
+        return today
+    if "tomorrow" in t:
+        return today + timedelta(days=1)
+    m = re.search(r'in\s+(\d+)\s+days?', t)
+    if m:
+        return today + timedelta(days=int(m.group(1)))
+    days = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6}
+    m = re.search(r'next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', t)
+    if m:
+        days_ahead = (days[m.group(1)] - today.weekday() + 7) % 7
+        return today + timedelta(days=days_ahead if days_ahead != 0 else 7)
+    for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y", "%B %d %Y", "%b %d %Y", "%B %d", "%b %d"]:
+        try:
+            dt = datetime.strptime(t, fmt)
+            if fmt in ("%B %d", "%b %d"):
+                return date(today.year, dt.month, dt.day)
+            return dt.date()
+        except Exception:
+            continue
+    m = re.search(r'(\d{1,2})[\/\-\s](\d{1,2})(?:[\/\-\s](\d{2,4}))?', t)
+    if m:
+        d1 = int(m.group(1)); d2 = int(m.group(2)); y = m.group(3)
+        y = (int(y) + 2000 if int(y) < 100 else int(y)) if y else today.year
+        try:
+            return date(y, d2, d1) if d1 > 12 else date(y, d1, d2)
+        except Exception:
+            pass
+    return None
+
+
+def old_parse_task_time(text):
+    if not text:
+        return None
+    t = text.lower().strip().replace(".", "")
+    if "noon" in t:
+        return time(12, 0)
+    if "midnight" in t:
+        return time(0, 0)
+    m = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', t)
+    if not m:
+        return None
+    hour = int(m.group(1)); minute = int(m.group(2) or 0); ampm = m.group(3)
+    if ampm:
+        if ampm == "pm" and hour != 12:
+            hour += 12
+        if ampm == "am" and hour == 12:
+            hour = 0
+    elif hour > 23:
+        return None
+    try:
+        return time(hour % 24, minute)
+    except Exception:
+        return None
+
+
+def old_title_from_transcript(tl):
+    tl = tl.strip()
+    m = re.search(r'\b(?:add|create|new task|i want to add)\b\s*(.+)', tl)
+    if not m:
+        return None
+    candidate = m.group(1).strip()
+    candidate = re.sub(r'\b(?:today|tomorrow|tonight|next\s+\w+|in\s+\d+\s+days|on\s+\w+\s*\d{1,2})\b.*$', '', candidate)
+    candidate = re.sub(r'\bat\s+\d{1,2}(:\d{2})?\s*(am|pm)?\b', '', candidate)
+    candidate = re.sub(r'\b\d{1,2}(:\d{2})\s*(am|pm)?\b', '', candidate)
+    candidate = candidate.strip(" ,.")
+    return candidate or None
+
+
+def new_parse_due_date(text):
+    found = daysavvy.find_date(text.lower(), today=TODAY)
+    return found.value if found else None
+
+
+def safe(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:  # the old parsers raise on some inputs
+        return f"raised {type(e).__name__}"
+
+
+SUITES = [
+    ("due dates", DATES, lambda t: safe(old_parse_due_date, t, TODAY), new_parse_due_date),
+    ("times", TIMES, lambda t: safe(old_parse_task_time, t), daysavvy.parse_task_time),
+    ("titles", TITLES, lambda t: safe(old_title_from_transcript, t), daysavvy._title_from_transcript),
+]
+
+
+def main():
+    failed = False
+    for name, cases, old, new in SUITES:
+        old_ok = sum(old(text) == want for text, want in cases)
+        misses = [(text, want, new(text)) for text, want in cases if new(text) != want]
+        failed |= bool(misses)
+        print(f"{name:<10} old parsers {old_ok:>2}/{len(cases)}   engine {len(cases) - len(misses):>2}/{len(cases)}")
+        for text, want, got in misses:
+            print(f"    {text!r}: expected {want!r}, got {got!r}")
+
+    print()
+    for name, cases, old, new in SUITES:
+        texts = [text for text, _ in cases] * 50
+        # Alternate the two so a noisy neighbour slows both alike; keep the best run of each.
+        runs = [(timeit.timeit(lambda: [old(t) for t in texts], number=1),
+                 timeit.timeit(lambda: [new(t) for t in texts], number=1)) for _ in range(9)]
+        t_old = min(r[0] for r in runs) / len(texts)
+        t_new = min(r[1] for r in runs) / len(texts)
+        print(f"{name:<10} old {t_old * 1e6:6.2f} us/call   engine {t_new * 1e6:6.2f} us/call")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
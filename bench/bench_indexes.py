@@ -0,0 +1,113 @@
+"""
+Query-plan and latency benchmark for the Task indexes.
+
+Builds a throwaway SQLite database with N tasks (default 1,000,000) spread
+over a few thousand users, runs the hot queries from app.py without the
+secondary indexes, then creates the indexes declared on the models and runs
+them again.
+
+    python bench/bench_indexes.py            # 1M rows
+    python bench/bench_indexes.py 200000     # smaller run
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.dialects import sqlite as sqlite_dialect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app import Task, User  # noqa: E402
+
+USERS = 5000
+TODAY = date.today()
+NOW = datetime.now()
+
+# (label, sql, params) mirroring the ORM queries in app.py
+QUERIES = [
+    ("index(): all tasks, newest first",
+     "SELECT * FROM task WHERE user_id = ? ORDER BY created_at DESC", (42,)),
+    ("index(): status=incomplete",
+     "SELECT * FROM task WHERE user_id = ? AND completed = 0 ORDER BY created_at DESC", (42,)),
+    ("index(): status=overdue",
+     "SELECT * FROM task WHERE user_id = ? AND completed = 0 AND due_date IS NOT NULL AND due_date < ? "
+     "ORDER BY created_at DESC", (42, TODAY.isoformat())),
+    ("propose_reschedule_candidates",
+     "SELECT * FROM task WHERE user_id = ? AND completed = 0 AND due_date = ? "
+     "ORDER BY task_time IS NULL, task_time, id", (42, TODAY.isoformat())),
+    ("_recent_goal_candidate",
+     "SELECT * FROM task WHERE user_id = ? AND parent_id IS NULL ORDER BY created_at DESC LIMIT 1", (42,)),
+    ("subtasks of a parent",
+     "SELECT * FROM task WHERE user_id = ? AND parent_id = ?", (42, 1234)),
+    ("reminder scheduler refill",
+     "SELECT id, user_id, reminder_time FROM task WHERE reminder_time IS NOT NULL AND reminder_time <= ? "
+     "AND completed = 0", ((NOW + timedelta(hours=24)).isoformat(sep=" "),)),
+]
+
+
+def ddl(element):
+    return str(element.compile(dialect=sqlite_dialect.dialect()))
+
+
+def populate(conn, n):
+    conn.execute(ddl(CreateTable(User.__table__)))
+    conn.execute(ddl(CreateTable(Task.__table__)))
+    rnd = random.Random(7)
+    conn.executemany("INSERT INTO user (id, username, password, onboarding_done) VALUES (?, ?, 'x', 1)",
+                     ((i, f"user{i}") for i in range(1, USERS + 1)))
+
+    def rows():
+        for i in range(1, n + 1):
+            created = NOW - timedelta(minutes=rnd.randrange(0, 525600))
+            due = TODAY + timedelta(days=rnd.randrange(-60, 60)) if rnd.random() < 0.7 else None
+            at = datetime.min.time().replace(hour=rnd.randrange(8, 20)) if due else None
+            completed = rnd.random() < 0.6
+            # Past reminders have already fired and been cleared.
+            reminder = datetime.combine(due, at) if (due and at and not completed and due >= TODAY) else None
+            parent = rnd.randrange(1, i) if (i > 1 and rnd.random() < 0.3) else None
+            yield (i, rnd.randrange(1, USERS + 1), f"task {i}", due and due.isoformat(),
+                   at and at.isoformat(), "Other", completed, created.isoformat(sep=" "), "Normal",
+                   reminder and reminder.isoformat(sep=" "), parent)
+
+    conn.executemany(
+        "INSERT INTO task (id, user_id, name, due_date, task_time, category, completed, created_at, "
+        "priority, reminder_time, parent_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows())
+    conn.commit()
+
+
+def run(conn, label):
+    print(f"\n== {label} ==")
+    for name, sql, params in QUERIES:
+        plan = "; ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        best = float("inf")
+        for _ in range(5):
+            t0 = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - t0)
+        print(f"{name:<36} {best * 1000:9.3f} ms   {plan}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        t0 = time.perf_counter()
+        populate(conn, n)
+        print(f"populated {n:,} tasks in {time.perf_counter() - t0:.1f}s")
+        run(conn, "primary key only")
+        for ix in Task.__table__.indexes:
+            conn.execute(ddl(CreateIndex(ix)))
+        conn.execute("ANALYZE")
+        conn.commit()
+        run(conn, "with model indexes")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Golden check and micro-benchmark for the compiled keyword matchers.
+
+Replays a corpus through the KeywordMatcher-based classifiers in app.py
+(_nlu_fallback, _emotion_fallback, classify_priority, every NLU category
+from match() and the voice reply keywords) and through reference copies of the substring rules they replaced,
+and exits non-zero if any classification differs. The corpus is every
+keyword on its own, inside other words and in pairs, the voice transcripts
+and random mixes. Then it times both versions per call.
+
+    python bench/bench_keywords.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import app as daysavvy  # noqa: E402
+
+# Reference rules, as they were before KeywordMatcher.
+NLU_RULES = [
+    ("decompose", ("break it down","break this down","break down","decompose","subtask","plan this","plan for","tordo","tod do","toad do","tode do","tod do","toda do","toda do")),
+    ("add_task", ("add","create","new task","add task","jodo","kaam jodo","task jodo","naya kaam")),
+    ("delete_task", ("delete","remove","mitao","hatado","hata do","delete kar do")),
+    ("complete_task", ("complete","finish","done","khatam","poora","ho gaya")),
+    ("list_tasks", ("list","show","tasks","dikhado","list dikhao","kaam dikhao")),
+    ("reschedule", ("reschedule","postpone","move tasks","kal kar do","tomorrow","shift karo")),
+    ("smalltalk", ("stressed","anxious","sad","tired","lonely","down","overwhelmed","bura lag")),
+]
+EMOTION_RULES = [
+    (("stressed", 0.8), {"overwhelmed","stress","stressed","anxious","panic","pressure","burnout","burned out","busy","too much"}),
+    (("sad", 0.8), {"sad","down","upset","depressed","cry","lonely","hurt","bad day"}),
+    (("tired", 0.8), {"tired","exhausted","fatigued","sleepy","drained","worn out","not well","sick","headache"}),
+    (("positive", 0.7), {"great","good","awesome","amazing","excited","happy","fantastic","love"}),
+]
+PRIORITY_RULES = [
+    ("Urgent", ["urgent", "asap", "immediately", "now", "today"]),
+    ("High", ["important", "priority", "soon", "high"]),
+    ("Low", ["later", "someday", "eventually", "low"]),
+]
+VOICE_RULES = {
+    "cancel": ("stop","cancel","exit","quit","bas","ruko"),
+    "yes": ("yes","yeah","yup","sure","ok","okay"),
+    "yes_or_confirm": ("yes","yeah","yup","sure","ok","okay","do it","confirm"),
+    "no": ("no","nah","nope","cancel"),
+}
+
+
+def ref_intent(text):
+    tl = text.lower()
+    for intent, keywords in NLU_RULES:
+        if any(k in tl for k in keywords):
+            return intent
+    return "unknown"
+
+
+def ref_emotion(text):
+    t = text.lower()
+    for result, keywords in EMOTION_RULES:
+        if any(w in t for w in keywords):
+            return result
+    return ("neutral", 0.5)
+
+
+def ref_priority(text):
+    name = text.lower()
+    for level, keywords in PRIORITY_RULES:
+        if any(word in name for word in keywords):
+            return level
+    return "Normal"
+
+
+def ref_voice(text):
+    tl = text.lower()
+    return {name: any(k in tl for k in keywords) for name, keywords in VOICE_RULES.items()}
+
+
+def ref_all_intents(text):
+    tl = text.lower()
+    return {intent for intent, keywords in NLU_RULES if any(k in tl for k in keywords)}
+
+
+def new_voice(text):
+    said = daysavvy.VOICE_REPLY_KEYWORDS.match(text.lower())
+    return {"cancel": "cancel" in said, "yes": "yes" in said,
+            "yes_or_confirm": "yes" in said or "confirm" in said, "no": "no" in said}
+
+
+def transcripts():
+    path = os.path.join(os.path.dirname(__file__), "voice_transcripts.txt")
+    with open(path, encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+
+
+def corpus():
+    keywords = sorted({k for _, ks in NLU_RULES for k in ks} | {k for _, ks in EMOTION_RULES for k in ks}
+                      | {k for _, ks in PRIORITY_RULES for k in ks} | {k for ks in VOICE_RULES.values() for k in ks})
+    texts = ["", "hello", "what can you do"]
+    texts += keywords
+    texts += [f"x{k}y" for k in keywords] + [k.upper() for k in keywords]
+    texts += [f"{a} {b}" for a in keywords for b in keywords]
+    texts += [f"{a}{b}" for a in keywords for b in keywords]
+    texts += transcripts()
+    rnd = random.Random(22)
+    filler = ["please", "the", "report", "my", "kal", "meeting", "ko", "and", "groceries", "now?"]
+    texts += [" ".join(rnd.choice(keywords + filler * 3) for _ in range(rnd.randint(1, 12))) for _ in range(5000)]
+    return texts
+
+
+def new_intent_only(text):
+    return daysavvy.NLU_KEYWORDS.first(text.lower()) or "unknown"
+
+
+CHECKS = [
+    ("intent", ref_intent, lambda t: daysavvy._nlu_fallback(t)["intent"]),
+    ("all intents", ref_all_intents, lambda t: daysavvy.NLU_KEYWORDS.match(t.lower())),
+    ("emotion", ref_emotion, lambda t: daysavvy._emotion_fallback(t.lower())),
+    ("priority", ref_priority, daysavvy.classify_priority),
+    ("voice replies", ref_voice, new_voice),
+]
+
+
+def main():
+    texts = corpus()
+    failed = False
+    with daysavvy.app.app_context():
+        for name, ref, new in CHECKS:
+            diffs = [t for t in texts if ref(t) != new(t)]
+            failed |= bool(diffs)
+            print(f"{name:<14} {len(texts) - len(diffs)}/{len(texts)} match" + ("" if not diffs else "   MISMATCH"))
+            for t in diffs[:10]:
+                print(f"    {t!r}: reference {ref(t)!r}, matcher {new(t)!r}")
+
+        # Intent is timed without _nlu_fallback's slot extraction.
+        timed = [("intent", ref_intent, new_intent_only)] + CHECKS[2:]
+        samples = [("voice transcripts", transcripts() * 200), ("keyword-dense mixes", texts[-5000:])]
+        for label, sample in samples:
+            print(f"\n{label} ({len(sample)} calls)")
+            for name, ref, new in timed:
+                # Alternate the two so a noisy neighbour slows both alike; keep the best run of each.
+                runs = [(timeit.timeit(lambda: [ref(t) for t in sample], number=1),
+                         timeit.timeit(lambda: [new(t) for t in sample], number=1)) for _ in range(7)]
+                t_ref = min(r[0] for r in runs) / len(sample)
+                t_new = min(r[1] for r in runs) / len(sample)
+                print(f"  {name:<14} substring loops {t_ref * 1e6:6.2f} us/call   matcher {t_new * 1e6:6.2f} us/call")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Voice-turn latency with a degraded LLM upstream.
+
+Replays recorded transcripts through POST /voice/command-legacy while the
+Groq client is replaced by a simulated upstream in one of several states:
+
+  healthy  answers after UPSTREAM_LATENCY
+  flaky    every third call fails with a 503, the rest are healthy
+  slow     takes far longer than any deadline (the client's timeout fires)
+  down     refuses every connection at once
+
+and reports turn latency, what llm.stats() recorded per call site, and the
+breaker state. Deadlines are scaled down so the run takes seconds. No turn may
+take longer than the deadlines of the LLM calls it makes plus SLACK; the
+script exits non-zero if one does.
+
+    python bench/bench_llm_degraded.py [transcripts.txt]
+"""
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import app as daysavvy  # noqa: E402
+from app import db, User  # noqa: E402
+
+DEFAULT_TRANSCRIPTS = os.path.join(os.path.dirname(__file__), "voice_transcripts.txt")
+DEADLINE = 0.3          # seconds, every call site
+UPSTREAM_LATENCY = 0.02
+SLACK = 0.25
+ANSWER = '{"emotion":"neutral","score":0.5,"intent":"smalltalk","slots":{}}'
+
+
+class UpstreamError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class SimulatedCompletions:
+    def __init__(self):
+        self.mode = "healthy"
+        self.calls = 0
+
+    def create(self, timeout=None, stream=False, **kwargs):
+        self.calls += 1
+        if self.mode == "down":
+            raise APIConnectionError("connection refused")
+        if self.mode == "slow":
+            time.sleep(timeout)
+            raise APITimeoutError("request timed out")
+        if self.mode == "flaky" and self.calls % 3 == 0:
+            raise UpstreamError(503)
+        time.sleep(UPSTREAM_LATENCY)
+        message = types.SimpleNamespace(content=ANSWER)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def load_transcripts(path):
+    with open(path, encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+
+
+def run_mode(mode, upstream, transcripts, user_id):
+    upstream.mode = mode
+    daysavvy.llm_cache.clear()
+    daysavvy.llm.reset_stats()
+    daysavvy.llm.breaker.record(True)
+    latencies = []
+    for text in transcripts:
+        client = daysavvy.app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user_id
+        t0 = time.perf_counter()
+        resp = client.post("/voice/command-legacy", json={"transcript": text})
+        latencies.append(time.perf_counter() - t0)
+        assert resp.status_code == 200, resp.data
+    return sorted(latencies)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TRANSCRIPTS
+    transcripts = load_transcripts(path)
+    upstream = SimulatedCompletions()
+    fake = types.SimpleNamespace(chat=types.SimpleNamespace(completions=upstream))
+    daysavvy._groq = daysavvy.llm.client = fake
+    daysavvy.app.config["WTF_CSRF_ENABLED"] = False
+    daysavvy.app.config["VOICE_UNDERSTAND"] = "combined"
+    for site in daysavvy.llm.deadlines:
+        daysavvy.llm.deadlines[site] = DEADLINE
+    # A turn makes at most two sequential LLM calls: understand, then the chat fallback.
+    bound = 2 * DEADLINE + SLACK
+
+    with daysavvy.app.app_context():
+        db.create_all()
+        user = User(username="bench", password="x", onboarding_done=True)
+        db.session.add(user)
+        db.session.commit()
+
+        print(f"{len(transcripts)} transcripts, deadline {DEADLINE * 1000:.0f} ms per call, "
+              f"turn bound {bound * 1000:.0f} ms")
+        failed = False
+        for mode in ("healthy", "flaky", "slow", "down"):
+            lat = run_mode(mode, upstream, transcripts, user.id)
+            stats = daysavvy.llm.stats()
+            calls = sum(s["calls"] for s in stats.values())
+            skipped = sum(s["short_circuited"] for s in stats.values())
+            retries = sum(s["retries"] for s in stats.values())
+            status = "ok" if lat[-1] <= bound else "OVER BUDGET"
+            failed |= lat[-1] > bound
+            print(f"{mode:<8} turn p50 {lat[len(lat) // 2] * 1000:7.1f} ms  p95 "
+                  f"{lat[int(0.95 * (len(lat) - 1))] * 1000:7.1f} ms  max {lat[-1] * 1000:7.1f} ms   "
+                  f"LLM calls {calls:3d}  retries {retries:3d}  short-circuited {skipped:3d}  "
+                  f"breaker {daysavvy.llm.breaker.state:<9} {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Concurrent-writer benchmark for the SQLite storage profiles.
+
+Runs the same mixed workload against a file database once with the "legacy"
+profile (SQLite defaults: rollback journal, synchronous=FULL) and once with
+the "wal" profile app.py installs by default:
+
+  - writer threads, like request workers: INSERT a task and UPDATE another
+    in one transaction
+  - a reminder thread: scan pending reminders, then claim one with an UPDATE
+  - reader threads, like the task list: SELECT a user's newest tasks
+
+and reports write throughput, write latency and "database is locked" errors.
+
+    python bench/bench_sqlite_writers.py                 # 10s per profile
+    python bench/bench_sqlite_writers.py 5 16            # 5s, 16 writers
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+import app as daysavvy  # noqa: E402
+from app import db  # noqa: E402
+
+USERS = 50
+SEED_TASKS = 50_000
+READERS = 4
+
+
+def seed(engine):
+    db.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO user (id, username, password, onboarding_done) VALUES (:id, :u, 'x', 1)"),
+                     [{"id": i, "u": f"user{i}"} for i in range(1, USERS + 1)])
+        conn.execute(text("INSERT INTO task (user_id, name, category, completed, created_at, priority, "
+                          "reminder_time) VALUES (:u, :n, 'Other', 0, :c, 'Normal', :r)"),
+                     [{"u": i % USERS + 1, "n": f"seed task {i}", "c": now - timedelta(minutes=i),
+                       "r": now + timedelta(minutes=i % 600) if i % 5 == 0 else None}
+                      for i in range(SEED_TASKS)])
+
+
+def run_profile(profile, seconds, writers):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", pool_size=writers + READERS + 2)
+        daysavvy.install_sqlite_profile(engine, profile)
+        seed(engine)
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        stats = {"writes": 0, "reads": 0, "locked": 0, "latencies": []}
+
+        def record(kind, latency=None):
+            with lock:
+                stats[kind] += 1
+                if latency is not None:
+                    stats["latencies"].append(latency)
+
+        def writer(seed_value):
+            rnd = random.Random(seed_value)
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(text("INSERT INTO task (user_id, name, category, completed, created_at, "
+                                          "priority) VALUES (:u, 'new task', 'Other', 0, :c, 'Normal')"),
+                                     {"u": rnd.randrange(1, USERS + 1), "c": datetime.now()})
+                        conn.execute(text("UPDATE task SET completed = 1, updated_at = :now WHERE id = :id"),
+                                     {"id": rnd.randrange(1, SEED_TASKS), "now": datetime.now()})
+                    record("writes", time.perf_counter() - t0)
+                except OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    record("locked")
+
+        def reminder_thread():
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    with engine.begin() as conn:
+                        ids = conn.execute(text("SELECT id FROM task WHERE reminder_time IS NOT NULL "
+                                                "AND completed = 0 ORDER BY reminder_time LIMIT 50")).scalars().all()
+                        if ids:
+                            conn.execute(text("UPDATE task SET reminder_claimed_by = 'bench', "
+                                              "reminder_claim_until = :until WHERE id = :id"),
+                                         {"id": ids[0], "until": datetime.now() + timedelta(seconds=60)})
+                    record("writes", time.perf_counter() - t0)
+                except OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    record("locked")
+                time.sleep(0.01)
+
+        def reader(seed_value):
+            rnd = random.Random(seed_value)
+            while not stop.is_set():
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(text("SELECT * FROM task WHERE user_id = :u ORDER BY created_at DESC"),
+                                     {"u": rnd.randrange(1, USERS + 1)}).fetchall()
+                    record("reads")
+                except OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    record("locked")
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader, args=(100 + i,)) for i in range(READERS)]
+        threads.append(threading.Thread(target=reminder_thread))
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        journal = engine.connect().exec_driver_sql("PRAGMA journal_mode").scalar()
+        engine.dispose()
+
+    lat = sorted(stats["latencies"]) or [0.0]
+    pct = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] * 1000  # noqa: E731
+    print(f"{profile:<7} journal={journal:<7} writes/s {stats['writes'] / seconds:8.1f}   "
+          f"reads/s {stats['reads'] / seconds:7.1f}   write p50 {pct(0.5):7.2f} ms   "
+          f"p99 {pct(0.99):8.2f} ms   max {lat[-1] * 1000:8.1f} ms   locked errors {stats['locked']}")
+    return stats
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{writers} writers, {READERS} readers, 1 reminder thread, {seconds:.0f}s per profile")
+    with daysavvy.app.app_context():
+        for profile in ("legacy", "wal"):
+            run_profile(profile, seconds, writers)
+
+
+if __name__ == "__main__":
+    main()
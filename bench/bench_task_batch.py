@@ -0,0 +1,103 @@
+"""
+Batch API check and timing.
+
+First replays operations that must fail on their own without touching the
+task: wrongly typed fields, "completed": "false", unparseable due dates and
+times. Then it checks that the rest of the batch is still applied. The
+script exits non-zero if any of these checks fails, so it doubles as a
+regression test for POST /api/tasks/batch. Finally it times N creates sent
+as one batch against N single POST /api/tasks calls.
+
+    python bench/bench_task_batch.py [N]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import app as daysavvy  # noqa: E402
+from app import db, Task, User  # noqa: E402
+
+
+def check_validation(client):
+    """List of failure messages; empty when every case behaves."""
+    seed = client.post("/api/tasks/batch", json=[
+        {"op": "create", "name": "keep my date", "due_date": "2030-01-02", "task_time": "09:30"},
+    ]).get_json()
+    task_id = seed["results"][0]["id"]
+
+    cases = [
+        ({"op": "create", "name": 123}, "name must be a string"),
+        ({"op": "create", "name": "x", "category": {"a": 1}}, "category must be a string"),
+        ({"op": "create", "name": "x", "order_index": "abc"}, "order_index must be an integer"),
+        ({"op": "create", "name": "x", "parent_id": str(task_id)}, "parent_id must be an integer"),
+        ({"op": "create", "name": "x", "completed": "false"}, "completed must be true or false"),
+        ({"op": "create", "name": "x", "due_date": "next tuesday"}, "due_date must be YYYY-MM-DD"),
+        ({"op": "update", "id": task_id, "completed": "false"}, "completed must be true or false"),
+        ({"op": "update", "id": task_id, "due_date": "31/12/2030"}, "due_date must be YYYY-MM-DD"),
+        ({"op": "update", "id": task_id, "task_time": "half past nine"}, "task_time must be HH:MM or HH:MM:SS"),
+    ]
+    ops = [op for op, _ in cases] + [{"op": "create", "name": "good one", "completed": False}]
+    resp = client.post("/api/tasks/batch", json={"operations": ops})
+    failures = []
+    if resp.status_code != 200:
+        return [f"batch returned {resp.status_code}"]
+    results = resp.get_json()["results"]
+    for (op, expected), result in zip(cases, results):
+        if result["ok"] or result.get("error") != expected:
+            failures.append(f"{op}: expected error {expected!r}, got {result}")
+    if not results[-1]["ok"]:
+        failures.append(f"valid op in the same batch was not applied: {results[-1]}")
+
+    db.session.expire_all()
+    task = db.session.get(Task, task_id)
+    if task.completed:
+        failures.append('"completed": "false" marked the task complete')
+    if str(task.due_date) != "2030-01-02" or str(task.task_time) != "09:30:00" or task.reminder_time is None:
+        failures.append(f"failed update changed the task: {task.due_date} {task.task_time} {task.reminder_time}")
+    if Task.query.filter_by(name="x").count():
+        failures.append("an invalid create was inserted")
+    return failures
+
+
+def time_creates(client, n):
+    ops = [{"op": "create", "name": f"batch task {i}", "due_date": "2030-01-01", "task_time": "10:00"}
+           for i in range(n)]
+    t0 = time.perf_counter()
+    resp = client.post("/api/tasks/batch", json={"operations": ops})
+    batch = time.perf_counter() - t0
+    assert resp.status_code == 200 and resp.get_json()["created"] == n, resp.data
+
+    t0 = time.perf_counter()
+    for op in ops:
+        body = {k: v for k, v in op.items() if k != "op"}
+        assert client.post("/api/tasks", json=body).status_code in (200, 201)
+    single = time.perf_counter() - t0
+    print(f"{n} creates: batch {batch * 1000:8.1f} ms   one by one {single * 1000:8.1f} ms   "
+          f"({single / batch:.1f}x)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    daysavvy.app.config["WTF_CSRF_ENABLED"] = False
+    with daysavvy.app.app_context():
+        db.create_all()
+        user = User(username="bench", password="x", onboarding_done=True)
+        db.session.add(user)
+        db.session.commit()
+        client = daysavvy.app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user.id
+
+        failures = check_validation(client)
+        for f in failures:
+            print("FAIL", f)
+        print(f"validation: {'ok' if not failures else f'{len(failures)} failures'}")
+        time_creates(client, n)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Query-count and latency check for task serialization.
+
+Serializes N parent tasks (each with a few subtasks) through tasks_to_dicts()
+and GET /api/tasks and counts the SQL statements issued. The count must not
+grow with N; the script exits non-zero if it does, so it doubles as a
+regression check for the old one-lazy-load-per-task behaviour.
+
+    python bench/bench_task_serialization.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from sqlalchemy import event
+
+import app as daysavvy  # noqa: E402
+from app import db, Task, User  # noqa: E402
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def seed(user_id, parents, children_per_parent=3):
+    db.session.query(Task).delete()
+    db.session.commit()
+    for i in range(parents):
+        p = Task(user_id=user_id, name=f"goal {i}")
+        db.session.add(p)
+        db.session.flush()
+        for j in range(children_per_parent):
+            db.session.add(Task(user_id=user_id, name=f"step {j} of goal {i}", parent_id=p.id,
+                                completed=(j == 0), order_index=j))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def measure(client, user_id, parents):
+    seed(user_id, parents)
+    engine = db.engine
+    results = {}
+
+    tasks = Task.query.filter_by(user_id=user_id).all()
+    with QueryCounter(engine) as qc:
+        t0 = time.perf_counter()
+        out = daysavvy.tasks_to_dicts(tasks)
+        results["tasks_to_dicts"] = (qc.count, time.perf_counter() - t0)
+    assert sum(d["has_subtasks"] for d in out) == parents
+
+    with QueryCounter(engine) as qc:
+        t0 = time.perf_counter()
+        resp = client.get("/api/tasks?limit=500")
+        results["GET /api/tasks"] = (qc.count, time.perf_counter() - t0)
+    assert resp.status_code == 200
+    return results
+
+
+def main():
+    daysavvy.app.config["WTF_CSRF_ENABLED"] = False
+    with daysavvy.app.app_context():
+        db.create_all()
+        user = User(username="bench", password="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        client = daysavvy.app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user_id
+        client.get("/api/tasks?limit=1")  # warm the identity cache
+
+        small = measure(client, user_id, 10)
+        large = measure(client, user_id, 125)  # 500 rows: one full API page
+        failed = False
+        for name in small:
+            (q_small, _), (q_large, t_large) = small[name], large[name]
+            status = "ok" if q_large == q_small else "REGRESSION"
+            failed |= q_large != q_small
+            print(f"{name:<16} queries: {q_small} (40 rows) / {q_large} (500 rows)   "
+                  f"{t_large * 1000:7.2f} ms   {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time-to-first-token for streamed chat replies.
+
+Sends each prompt to POST /voice/chat twice, once as a plain JSON request
+and once with "Accept: text/event-stream", and reports when the first reply
+text reaches the client (the whole body for JSON, the first "token" event
+for the stream) and when the reply is complete.
+
+Needs GROQ_API_KEY; without it /voice/chat only returns its canned reply.
+
+    python bench/bench_voice_stream.py [prompts.txt]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import app as daysavvy  # noqa: E402
+from app import db, User  # noqa: E402
+
+DEFAULT_PROMPTS = [
+    "I have three deadlines this week and I feel like I'm drowning",
+    "tell me something funny, I had a long day",
+    "how do I get started on studying for my exams",
+    "I finished all my tasks today!",
+    "mujhe aaj kuch karne ka mann nahi hai",
+]
+
+
+def timed_json(client, prompt):
+    t0 = time.perf_counter()
+    resp = client.post("/voice/chat", json={"message": prompt})
+    total = time.perf_counter() - t0
+    assert resp.status_code == 200, resp.data
+    return total, total
+
+
+def timed_stream(client, prompt):
+    t0 = time.perf_counter()
+    resp = client.post("/voice/chat", json={"message": prompt},
+                       headers={"Accept": "text/event-stream"}, buffered=False)
+    assert resp.status_code == 200 and resp.mimetype == "text/event-stream", resp.content_type
+    first = None
+    for chunk in resp.response:
+        if first is None and b"event: token" in chunk:
+            first = time.perf_counter() - t0
+    total = time.perf_counter() - t0
+    resp.close()
+    return (first if first is not None else total), total
+
+
+def report(label, samples):
+    firsts = sorted(s[0] for s in samples)
+    totals = sorted(s[1] for s in samples)
+    mid = len(samples) // 2
+    print(f"{label:<7} first text p50 {firsts[mid] * 1000:8.1f} ms  max {firsts[-1] * 1000:8.1f} ms   "
+          f"complete p50 {totals[mid] * 1000:8.1f} ms  max {totals[-1] * 1000:8.1f} ms")
+
+
+def main():
+    prompts = DEFAULT_PROMPTS
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as fh:
+            prompts = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+    if daysavvy._groq is None:
+        print("GROQ_API_KEY not set: nothing to stream")
+        sys.exit(0)
+    daysavvy.app.config["WTF_CSRF_ENABLED"] = False
+
+    with daysavvy.app.app_context():
+        db.create_all()
+        user = User(username="bench", password="x", onboarding_done=True)
+        db.session.add(user)
+        db.session.commit()
+        client = daysavvy.app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user.id
+
+        print(f"{len(prompts)} prompts, model {os.getenv('GROQ_MODEL', 'moonshotai/kimi-k2-instruct-0905')}")
+        results = {"json": [], "stream": []}
+        for prompt in prompts:
+            results["json"].append(timed_json(client, prompt))
+            results["stream"].append(timed_stream(client, prompt))
+        for label, samples in results.items():
+            report(label, samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Split vs combined understanding for voice turns.
+
+Replays recorded transcripts (one per line) through POST /voice/command-legacy
+once with VOICE_UNDERSTAND=split (detect_emotion + nlu_understand) and once
+with VOICE_UNDERSTAND=combined (understand()), and reports Groq calls, tokens,
+turn latency, and how often the combined path agrees with the split one on
+intent and emotion. The LLM cache is cleared before each pass.
+
+Needs GROQ_API_KEY for meaningful numbers; without it both passes exercise
+the heuristic fallbacks only.
+
+    python bench/bench_voice_understand.py [transcripts.txt]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import app as daysavvy  # noqa: E402
+from app import db, User  # noqa: E402
+
+DEFAULT_TRANSCRIPTS = os.path.join(os.path.dirname(__file__), "voice_transcripts.txt")
+
+
+class CountingCompletions:
+    """Wraps the Groq completions client to count calls, tokens and time."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.tokens = 0
+        self.seconds = 0.0
+
+    def create(self, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            resp = self.inner.create(**kwargs)
+        finally:
+            self.calls += 1
+            self.seconds += time.perf_counter() - t0
+        usage = getattr(resp, "usage", None)
+        self.tokens += getattr(usage, "total_tokens", 0) or 0
+        return resp
+
+
+def load_transcripts(path):
+    with open(path, encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+
+
+def run_pass(mode, transcripts, user_id, counter):
+    daysavvy.app.config["VOICE_UNDERSTAND"] = mode
+    daysavvy.llm_cache.clear()
+    if counter:
+        counter.reset()
+    latencies = []
+    for text in transcripts:
+        client = daysavvy.app.test_client()  # fresh conversation per transcript
+        with client.session_transaction() as sess:
+            sess["user_id"] = user_id
+        t0 = time.perf_counter()
+        resp = client.post("/voice/command-legacy", json={"transcript": text})
+        latencies.append(time.perf_counter() - t0)
+        assert resp.status_code == 200, resp.data
+    usage = (counter.calls, counter.tokens) if counter else None
+    return latencies, usage
+
+
+def decisions(mode, transcripts):
+    """(intent, emotion) per transcript, answered from the pass's warm cache."""
+    daysavvy.app.config["VOICE_UNDERSTAND"] = mode
+    out = []
+    for text in transcripts:
+        u = daysavvy.understand(text)
+        out.append((u["intent"], u["emotion"]))
+    return out
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TRANSCRIPTS
+    transcripts = load_transcripts(path)
+    daysavvy.app.config["WTF_CSRF_ENABLED"] = False
+    counter = None
+    if daysavvy._groq is not None:
+        counter = CountingCompletions(daysavvy._groq.chat.completions)
+        daysavvy._groq.chat.completions = counter
+    else:
+        print("GROQ_API_KEY not set: measuring the heuristic fallbacks only")
+
+    with daysavvy.app.app_context():
+        db.create_all()
+        user = User(username="bench", password="x", onboarding_done=True)
+        db.session.add(user)
+        db.session.commit()
+
+        print(f"{len(transcripts)} transcripts from {path}")
+        labels = {}
+        for mode in ("split", "combined"):
+            latencies, usage = run_pass(mode, transcripts, user.id, counter)
+            labels[mode] = decisions(mode, transcripts)
+            lat = sorted(latencies)
+            calls = f"{usage[0]:4d} LLM calls {usage[1]:7d} tokens" if usage else "   - LLM calls"
+            print(f"{mode:<9} {calls}   turn mean {sum(lat) / len(lat) * 1000:8.1f} ms   "
+                  f"p95 {lat[int(0.95 * (len(lat) - 1))] * 1000:8.1f} ms")
+        pairs = list(zip(transcripts, labels["split"], labels["combined"]))
+        intent_ok = sum(s[0] == c[0] for _, s, c in pairs)
+        emotion_ok = sum(s[1] == c[1] for _, s, c in pairs)
+        print(f"agreement with split: intent {intent_ok}/{len(pairs)}, emotion {emotion_ok}/{len(pairs)}")
+        for text, s, c in pairs:
+            if s != c:
+                print(f"  {text!r}: split {s[0]}/{s[1]}, combined {c[0]}/{c[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""add reminder lease columns
+
+Revision ID: 3c5e1f7a9b2d
+Revises: ba77d3f9772b
+Create Date: 2026-10-17 09:12:41.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e1f7a9b2d'
+down_revision = 'ba77d3f9772b'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    existing = _columns('task')
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        if 'reminder_claimed_by' not in existing:
+            batch_op.add_column(sa.Column('reminder_claimed_by', sa.String(length=64), nullable=True))
+        if 'reminder_claim_until' not in existing:
+            batch_op.add_column(sa.Column('reminder_claim_until', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_column('reminder_claim_until')
+        batch_op.drop_column('reminder_claimed_by')
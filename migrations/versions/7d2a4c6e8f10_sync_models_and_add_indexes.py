@@ -0,0 +1,95 @@
+"""sync user, task and emotion_event with the models; add query indexes
+
+Revision ID: 7d2a4c6e8f10
+Revises: 3c5e1f7a9b2d
+Create Date: 2026-10-17 10:03:27.540912
+
+Databases created with db.create_all() already have most of these columns,
+so every step checks the live schema first. Such a database can be brought
+under Alembic with `flask db stamp ba77d3f9772b && flask db upgrade`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a4c6e8f10'
+down_revision = '3c5e1f7a9b2d'
+branch_labels = None
+depends_on = None
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def _columns(table):
+    return {c['name'] for c in _inspector().get_columns(table)}
+
+
+def _indexes(table):
+    return {ix['name'] for ix in _inspector().get_indexes(table)}
+
+
+def upgrade():
+    tables = set(_inspector().get_table_names())
+
+    if 'user' not in tables:
+        op.create_table('user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('password', sa.String(length=200), nullable=False),
+        sa.Column('onboarding_done', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username')
+        )
+
+    if 'emotion_event' not in tables:
+        op.create_table('emotion_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('emotion', sa.String(length=32), nullable=False),
+        sa.Column('score', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    existing = _columns('task')
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        if 'user_id' not in existing:
+            batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_task_user_id_user', 'user', ['user_id'], ['id'])
+        if 'priority' not in existing:
+            batch_op.add_column(sa.Column('priority', sa.String(length=20), nullable=True))
+        if 'reminder_time' not in existing:
+            batch_op.add_column(sa.Column('reminder_time', sa.DateTime(), nullable=True))
+        if 'parent_id' not in existing:
+            batch_op.add_column(sa.Column('parent_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_task_parent_id_task', 'task', ['parent_id'], ['id'])
+        if 'order_index' not in existing:
+            batch_op.add_column(sa.Column('order_index', sa.Integer(), nullable=True))
+
+    task_ix = _indexes('task')
+    if 'ix_task_user_status_due' not in task_ix:
+        op.create_index('ix_task_user_status_due', 'task', ['user_id', 'completed', 'due_date', 'task_time'])
+    if 'ix_task_user_created' not in task_ix:
+        op.create_index('ix_task_user_created', 'task', ['user_id', 'created_at'])
+    if 'ix_task_user_parent' not in task_ix:
+        op.create_index('ix_task_user_parent', 'task', ['user_id', 'parent_id'])
+    if 'ix_task_reminder_pending' not in task_ix:
+        completed = sa.column('completed', sa.Boolean())
+        op.create_index('ix_task_reminder_pending', 'task', ['reminder_time'],
+                        sqlite_where=(completed == sa.false()), postgresql_where=(completed == sa.false()))
+
+    if 'ix_emotion_event_user_created' not in _indexes('emotion_event'):
+        op.create_index('ix_emotion_event_user_created', 'emotion_event', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_emotion_event_user_created', table_name='emotion_event')
+    op.drop_index('ix_task_reminder_pending', table_name='task')
+    op.drop_index('ix_task_user_parent', table_name='task')
+    op.drop_index('ix_task_user_created', table_name='task')
+    op.drop_index('ix_task_user_status_due', table_name='task')
@@ -0,0 +1,44 @@
+"""add task_fts full-text index (SQLite only)
+
+Revision ID: 9e4b2d1c6a73
+Revises: 7d2a4c6e8f10
+Create Date: 2026-10-17 11:26:05.302417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b2d1c6a73'
+down_revision = '7d2a4c6e8f10'
+branch_labels = None
+depends_on = None
+
+
+TASK_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(name, content='task', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF name ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO task_fts(rowid, name) VALUES (new.id, new.name); END",
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for stmt in TASK_FTS_DDL:
+        op.execute(stmt)
+    op.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('task_fts_ai', 'task_fts_ad', 'task_fts_au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS task_fts")
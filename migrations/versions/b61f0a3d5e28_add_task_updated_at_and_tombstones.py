@@ -0,0 +1,44 @@
+"""add task.updated_at and task_tombstone for delta sync
+
+Revision ID: b61f0a3d5e28
+Revises: 9e4b2d1c6a73
+Create Date: 2026-10-17 12:41:52.873160
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b61f0a3d5e28'
+down_revision = '9e4b2d1c6a73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'updated_at' not in {c['name'] for c in inspector.get_columns('task')}:
+        op.add_column('task', sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute("UPDATE task SET updated_at = created_at")
+    if 'ix_task_user_updated' not in {ix['name'] for ix in inspector.get_indexes('task')}:
+        op.create_index('ix_task_user_updated', 'task', ['user_id', 'updated_at'])
+
+    if 'task_tombstone' not in inspector.get_table_names():
+        op.create_table('task_tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_task_tombstone_user_deleted', 'task_tombstone', ['user_id', 'deleted_at'])
+
+
+def downgrade():
+    op.drop_index('ix_task_tombstone_user_deleted', table_name='task_tombstone')
+    op.drop_table('task_tombstone')
+    op.drop_index('ix_task_user_updated', table_name='task')
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
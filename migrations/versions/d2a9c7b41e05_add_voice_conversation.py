@@ -0,0 +1,33 @@
+"""add voice_conversation for server-side voice state
+
+Revision ID: d2a9c7b41e05
+Revises: c4f8e2a7d913
+Create Date: 2026-10-17 15:22:08.118733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a9c7b41e05'
+down_revision = 'c4f8e2a7d913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'voice_conversation' not in inspector.get_table_names():
+        op.create_table('voice_conversation',
+        sa.Column('sid', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sid')
+        )
+        op.create_index('ix_voice_conversation_expires_at', 'voice_conversation', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_voice_conversation_expires_at', table_name='voice_conversation')
+    op.drop_table('voice_conversation')
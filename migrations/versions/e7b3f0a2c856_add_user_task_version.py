@@ -0,0 +1,27 @@
+"""add user.task_version for conditional GETs
+
+Revision ID: e7b3f0a2c856
+Revises: d2a9c7b41e05
+Create Date: 2026-10-17 16:10:44.530912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3f0a2c856'
+down_revision = 'd2a9c7b41e05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'task_version' not in {c['name'] for c in inspector.get_columns('user')}:
+        op.add_column('user', sa.Column('task_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('task_version')
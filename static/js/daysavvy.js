@@ -0,0 +1,403 @@
+// DaySavvy page scripts (index.html)
+
+// Onboarding modal
+function closeOnboarding() {
+    document.getElementById('onboarding-modal').style.display = 'none';
+    fetch('/api/onboarding_done', {method: 'POST'});
+}
+
+// Guest voice prompt
+function showLoginVoiceModal() {
+  document.getElementById('loginVoiceModal').style.display = 'block';
+}
+function closeLoginVoiceModal() {
+  document.getElementById('loginVoiceModal').style.display = 'none';
+}
+
+// Globals
+let csrfToken, isListening = false, recognition = null;
+
+// CSRF + prefs init
+(async () => {
+  try { csrfToken = (await fetch('/csrf-token').then(r=>r.json())).csrf_token; } catch {}
+  try {
+    const p = await fetch('/voice/prefs', {credentials:'same-origin'}).then(r=>r.json());
+    const langSel = document.getElementById('voiceLangSelect');
+    const genSel  = document.getElementById('voiceGenderSelect');
+    if (langSel && p.lang) langSel.value = p.lang;
+    if (genSel && p.gender) genSel.value = p.gender;
+  } catch {}
+})();
+
+// Save prefs on change
+document.getElementById('voiceLangSelect')?.addEventListener('change', async (e) => {
+  await fetch('/voice/prefs', { method:'POST', headers:{'Content-Type':'application/json','X-CSRFToken': csrfToken},
+    credentials:'same-origin', body: JSON.stringify({ lang: e.target.value }) });
+});
+document.getElementById('voiceGenderSelect')?.addEventListener('change', async (e) => {
+  await fetch('/voice/prefs', { method:'POST', headers:{'Content-Type':'application/json','X-CSRFToken': csrfToken},
+    credentials:'same-origin', body: JSON.stringify({ gender: e.target.value }) });
+});
+
+// Ensure all replies use neural TTS
+window.speakText = function(text, cb){ return playTTS(text).then(()=>{ try{cb&&cb();}catch{} }); };
+// STT helpers
+function langToBCP47(v){ return v==='hi' ? 'hi-IN' : (v==='en' ? 'en-US' : 'en-IN'); }
+function createRecognition(){
+  const SR = window.SpeechRecognition || window.webkitSpeechRecognition;
+  if (!SR) return null;
+  const r = new SR();
+  const langSel = document.getElementById('voiceLangSelect');
+  r.lang = langToBCP47(langSel?.value || 'hinglish');
+  r.continuous = false;
+  r.interimResults = false;
+  return r;
+}
+
+// Start/Stop + loop
+async function startVoiceControl(){
+  if (isListening) return;
+  isListening = true;
+  document.getElementById('voiceBtn')?.classList.add('listening');
+  document.getElementById('stopBtn').style.display = 'inline-block';
+  document.getElementById('voiceStatus').textContent = '⏳ Starting…';
+
+  try {
+    const welcome = await fetch('/voice/welcome').then(r=>r.json());
+    await speakText(welcome.message);
+    document.getElementById('voiceStatus').textContent = welcome.message || '🎤 Listening…';
+    if (welcome.continue_listening) listenOnce();
+  } catch (e) {
+    document.getElementById('voiceStatus').textContent = '❌ Could not start voice.';
+    stopVoiceControl();
+  }
+}
+function stopVoiceControl(){
+  isListening = false;
+  try { recognition && recognition.stop(); } catch {}
+  document.getElementById('voiceBtn')?.classList.remove('listening');
+  document.getElementById('stopBtn').style.display = 'none';
+  document.getElementById('voiceStatus').textContent = '🛑 Voice stopped';
+}
+function listenOnce(){
+  if (!isListening) return;
+  recognition = createRecognition();
+  if (!recognition){
+    document.getElementById('voiceStatus').textContent='❌ Speech not supported. Use Chrome.';
+    return stopVoiceControl();
+  }
+  recognition.onstart  = () => document.getElementById('voiceStatus').textContent = '🎤 Listening…';
+  recognition.onerror  = (e) => {
+    document.getElementById('voiceStatus').textContent = '❌ ' + e.error;
+    if (e.error==='no-speech' && isListening){ setTimeout(listenOnce, 400); }
+    else { stopVoiceControl(); }
+  };
+  recognition.onresult = async (ev) => {
+    const transcript = ev.results[0][0].transcript.trim();
+    document.getElementById('voiceStatus').textContent = `⏳ “${transcript}”`;
+    try {
+      // Try command endpoint first
+      let r = await fetch('/voice/command', {
+        method:'POST',
+        headers:{'Content-Type':'application/json','X-CSRFToken': csrfToken, 'Accept': STREAM_ACCEPT},
+        credentials:'same-origin',
+        body: JSON.stringify({ transcript })
+      }).then(x=>readVoiceReply(x, 'message'));
+
+      // If not recognized as a command, fallback to generative chat
+    if (
+      r && r.message &&
+      (
+        r.message.toLowerCase().includes("didn’t catch that") ||
+        r.message.toLowerCase().includes("samajh nahi aaya") ||
+        r.message.toLowerCase().includes("phir bolo") ||
+        r.message.toLowerCase().includes("say it again")
+      )
+    ) {
+        // Fallback to generative AI
+      r = await fetch('/voice/chat', {
+        method:'POST',
+        headers:{'Content-Type':'application/json','X-CSRFToken': csrfToken, 'Accept': STREAM_ACCEPT},
+        credentials:'same-origin',
+        body: JSON.stringify({ message: transcript })
+      }).then(x=>readVoiceReply(x, 'reply'));
+      r.message = r.reply;
+    }
+
+      if (!r.spoken) await speakText(r.message || 'OK');
+      document.getElementById('voiceStatus').textContent = r.message || '✓';
+      if (r.reload_page) { location.reload(); return; }
+      if (r.continue_listening && isListening) setTimeout(listenOnce, 300);
+      else stopVoiceControl();
+    } catch(e) {
+      document.getElementById('voiceStatus').textContent = '❌ Error processing.';
+      stopVoiceControl();
+    }
+  };
+  recognition.start();
+}
+// Expose to buttons
+window.startVoiceControl = startVoiceControl;
+window.stopVoiceControl  = stopVoiceControl;
+
+// Streamed replies
+// Free-form replies arrive as Server-Sent Events ("token" deltas, then one
+// "done" event with the usual JSON body). The text is shown as it grows and
+// every finished sentence goes to TTS straight away, played back in order,
+// so the first sentence is heard while the rest is still being generated.
+const STREAM_ACCEPT = 'text/event-stream, application/json';
+const SENTENCE_END = /[.!?।…]+["')\]]*\s+|\n+/g;
+
+function createSpeechQueue(){
+  let chain = Promise.resolve();
+  return {
+    say(text){
+      text = text.trim();
+      if (!text) return;
+      const audio = fetchTTS(text);              // fetch now, play after the previous sentence
+      chain = chain.then(() => audio).then(playAudioBlob);
+    },
+    finished(){ return chain; }
+  };
+}
+
+async function readVoiceReply(res, key){
+  const type = res.headers.get('Content-Type') || '';
+  if (!type.startsWith('text/event-stream') || !res.body) return res.json();
+
+  const status = document.getElementById('voiceStatus');
+  const speech = createSpeechQueue();
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = '', text = '', spoken = 0, final = null;
+
+  const speakFinished = (all) => {
+    const rest = text.slice(spoken);
+    let cut = all ? rest.length : 0;
+    if (!all) {
+      SENTENCE_END.lastIndex = 0;
+      let m;
+      while ((m = SENTENCE_END.exec(rest))) cut = m.index + m[0].length;
+    }
+    if (cut) { speech.say(rest.slice(0, cut)); spoken += cut; }
+  };
+  const handle = (block) => {
+    let event = 'message', data = '';
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      else if (line.startsWith('data:')) data += line.slice(5).trim();
+    }
+    if (!data) return;
+    const payload = JSON.parse(data);
+    if (event === 'token') {
+      text += payload.text || '';
+      if (status) status.textContent = text;
+      speakFinished(false);
+    } else if (event === 'done') {
+      final = payload;
+      if (!text) text = payload[key] || '';    // nothing streamed: the server sent a fallback
+    }
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buf += decoder.decode(value, { stream: true });
+    let i;
+    while ((i = buf.indexOf('\n\n')) >= 0) {
+      handle(buf.slice(0, i));
+      buf = buf.slice(i + 2);
+    }
+  }
+  speakFinished(true);
+  await speech.finished();
+  final = final || { [key]: text, continue_listening: true };
+  final.spoken = true;
+  return final;
+}
+
+// Neural TTS playback used by speakText()
+async function fetchTTS(text) {
+  try {
+    const langSel = document.getElementById('voiceLangSelect');
+    const genSel  = document.getElementById('voiceGenderSelect');
+    const body = {
+      text: text || "",
+      lang: (langSel?.value || 'hinglish'),
+      gender: (genSel?.value || 'female')
+    };
+    const res = await fetch('/voice/tts', {
+      method: 'POST',
+      headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrfToken},
+      credentials: 'same-origin',
+      body: JSON.stringify(body)
+    });
+    return await res.blob();
+  } catch(e) {
+    console.error('TTS error', e);
+    return null;
+  }
+}
+async function playTTS(text) {
+  return playAudioBlob(await fetchTTS(text));
+}
+async function playAudioBlob(blob) {
+  if (!blob) return;
+  try {
+    const url = URL.createObjectURL(blob);
+    const audio = new Audio(url);
+    await audio.play().catch(()=>{ /* ignore autoplay errors */ });
+    await new Promise(resolve => { audio.onended = resolve; audio.onerror = resolve; });
+    URL.revokeObjectURL(url);
+  } catch(e) {
+    console.error('TTS error', e);
+  }
+}
+
+// Decompose Task Modal
+document.addEventListener('DOMContentLoaded', () => {
+  const btn = document.getElementById('decomposeBtn');
+  if (!btn) return;
+
+  btn.addEventListener('click', async () => {
+    const goalEl = document.querySelector('input[name="task"]');
+    const dueEl  = document.querySelector('input[name="due_date"]');
+    const timeEl = document.getElementById('task_time');
+
+    let goal = goalEl?.value?.trim();
+    let due  = dueEl?.value || '';
+    let time = timeEl?.value || '';
+
+    if (!goal) { alert('Enter a goal in the Task field first.'); return; }
+
+    if (!window.csrfToken) {
+      window.csrfToken = await fetch('/csrf-token', {credentials:'same-origin'})
+        .then(r=>r.json()).then(j=>j.csrf_token);
+    }
+
+    // Try to find an existing parent card with the same name to avoid duplicates
+    let parentId = undefined;
+    const goalLower = goal.toLowerCase();
+    document.querySelectorAll('button[onclick*="decomposeGoalFromBtn"][data-id][data-name]').forEach(b => {
+      if ((b.dataset.name || '').trim().toLowerCase() === goalLower) {
+        parentId = parseInt(b.dataset.id, 10);
+      }
+    });
+
+    if (!due) {
+      const d = prompt('Final due date for the goal? (YYYY-MM-DD) Optional. Leave blank to spread across next days.');
+      if (d !== null) due = d.trim();
+    }
+    if (!time) {
+      const t = prompt('Default time for subtasks? (HH:MM) Optional. Leave blank to stagger times automatically.');
+      if (t !== null) time = t.trim();
+    }
+
+    // Ask for missing inputs so users don’t get “same time” everywhere
+    if (!due) {
+      const d = prompt('Final due date for the goal? (YYYY-MM-DD) Optional. Leave blank to spread across next days.');
+      if (d !== null) due = d.trim();
+    }
+    if (!time) {
+      const t = prompt('Default time for subtasks? (HH:MM) Optional. Leave blank to stagger times automatically.');
+      if (t !== null) time = t.trim();
+    }
+
+    if (!window.csrfToken) {
+      window.csrfToken = await fetch('/csrf-token', {credentials:'same-origin'})
+        .then(r=>r.json()).then(j=>j.csrf_token);
+    }
+
+    // Preview
+    const preview = await fetch('/api/tasks/decompose', {
+      method: 'POST',
+      headers: {'Content-Type':'application/json','X-CSRFToken': window.csrfToken},
+      credentials: 'same-origin',
+      body: JSON.stringify({ goal, due_date: due || undefined, task_time: time || undefined })
+    }).then(r=>r.json());
+
+    const list = (preview.subtasks || [])
+      .map(s => `• ${s.name}${s.suggested_due_date ? ` — ${s.suggested_due_date}` : ''}`)
+      .join('\n') || '(no suggestions)';
+    if (!confirm(`Create these subtasks?\n\n${list}`)) return;
+
+    // Create (also send parent_id)
+    const created = await fetch('/api/tasks/decompose', {
+      method: 'POST',
+      headers: {'Content-Type':'application/json','X-CSRFToken': window.csrfToken},
+      credentials: 'same-origin',
+      body: JSON.stringify({
+        parent_id: parentId,
+        goal,
+        due_date: due || undefined,
+        task_time: time || undefined,
+        create: true
+      })
+    }).then(r=>r.json());
+
+    if (created.created) location.reload();
+    else alert('Could not create subtasks.');
+  });
+});
+
+// Make CSRF available globally too
+if (window.csrfToken == null) {
+  fetch('/csrf-token', {credentials: 'same-origin'})
+    .then(r => r.json())
+    .then(j => { window.csrfToken = j.csrf_token; });
+}
+
+// Bridge: reads data-* from the button
+function decomposeGoalFromBtn(btn) {
+  const id   = parseInt(btn.dataset.id, 10);
+  const name = btn.dataset.name || '';
+  const due  = btn.dataset.due  || undefined;
+  const time = btn.dataset.time || undefined;
+  decomposeGoalFromParent(id, name, due, time);
+}
+
+// Single global function: preview → confirm → create (attaches to existing parent)
+async function decomposeGoalFromParent(id, name, due, time) {
+  try {
+    const csrf = window.csrfToken || await fetch('/csrf-token', {credentials:'same-origin'})
+      .then(r=>r.json()).then(j=>j.csrf_token);
+
+    // Preview
+    const preview = await fetch('/api/tasks/decompose', {
+      method: 'POST',
+      headers: {'Content-Type':'application/json','X-CSRFToken': csrf},
+      credentials: 'same-origin',
+      body: JSON.stringify({
+        parent_id: id,         // attach to existing parent (prevents duplicate)
+        goal: name,
+        due_date: due || undefined,
+        task_time: time || undefined
+      })
+    }).then(r=>r.json());
+
+    const list = (preview.subtasks || [])
+      .map(s => '• ' + s.name + (s.suggested_due_date ? ' — ' + s.suggested_due_date : ''))
+      .join('\n') || '(no suggestions)';
+    if (!confirm(`Create these subtasks under "${name}"?\n\n${list}`)) return;
+
+    // Create
+    const created = await fetch('/api/tasks/decompose', {
+      method: 'POST',
+      headers: {'Content-Type':'application/json','X-CSRFToken': csrf},
+      credentials: 'same-origin',
+      body: JSON.stringify({
+        parent_id: id,         // attach to existing parent (prevents duplicate)
+        goal: name,
+        due_date: due || undefined,
+        task_time: time || undefined,
+        create: true
+      })
+    }).then(r=>r.json());
+
+    if (created.created) location.reload();
+    else alert('Could not create subtasks.');
+  } catch (e) {
+    console.error(e);
+    alert('Error decomposing this goal.');
+  }
+}
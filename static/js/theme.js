@@ -0,0 +1,22 @@
+// Dark mode toggle (index.html, edit_task.html)
+document.addEventListener('DOMContentLoaded', () => {
+  const html  = document.documentElement; 
+  const btn   = document.getElementById('themeToggle');
+  const icon  = document.getElementById('themeIcon');
+
+  // Helper to update icon based on theme
+  const setIcon = theme => { icon.textContent = theme === 'dark' ? '🌙' : '☀️'; };
+
+  // Load stored theme or default to light
+  const saved = localStorage.getItem('theme') || 'light';
+  html.setAttribute('data-bs-theme', saved);
+  setIcon(saved);
+
+  // Toggle theme on click
+  btn.addEventListener('click', () => {
+    const next = (html.getAttribute('data-bs-theme') === 'light') ? 'dark' : 'light';
+    html.setAttribute('data-bs-theme', next);
+    localStorage.setItem('theme', next);
+    setIcon(next);
+  });
+});